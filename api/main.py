@@ -1,17 +1,49 @@
-from fastapi import FastAPI, HTTPException
+import asyncio
+import json
+import os
+from contextlib import asynccontextmanager
+from typing import Literal
+
+from fastapi import FastAPI, HTTPException, Query, Request, Response, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, Field
 import sys
 from pathlib import Path
 
 # Add the parent directory to sys.path to allow imports from root
 sys.path.append(str(Path(__file__).resolve().parent.parent))
 
-from planner import build_selected_courses
-from data_loader import load_courses, load_department
+from catalog import CatalogWatcher, get_catalog, is_ready, pin_catalog, warm_catalog
+from department_views import encode_json, etag_matches, negotiate_encoding, parse_fields
+from metrics import CONTENT_TYPE, REGISTRY
+from planner import CONFIG
+from plan_session import PlanSession
+from replan import replan_for_department
+from scheduler import Overloaded, SolverScheduler, install_scheduler, solve_priority
+from what_if import compare_departments, shutdown_pool
 
-from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Under a pre-forking server the master has already warmed the catalog and
+    # this returns immediately. Otherwise warm in the background so the process
+    # is live straight away and /ready flips once the catalog is loaded.
+    warmup = asyncio.create_task(asyncio.to_thread(warm_catalog))
+    # Reload the catalog when data/ or slotting/ changes (CATALOG_WATCH=0 to disable)
+    watcher = CatalogWatcher().start() if os.environ.get("CATALOG_WATCH", "1") != "0" else None
+    # Solver slots of this worker, shared by interactive and bulk planning
+    install_scheduler(SolverScheduler())
+    yield
+    warmup.cancel()
+    if watcher is not None:
+        watcher.stop()
+    install_scheduler(None)
+    shutdown_pool()
+
+
+app = FastAPI(lifespan=lifespan)
 
 origins = [
     "http://localhost:3000",
@@ -23,20 +55,147 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Catalog-Version", "Retry-After"],
 )
 
+
+@app.middleware("http")
+async def catalog_version_header(request: Request, call_next):
+    # Every handler of this request sees the same catalog, even across a reload
+    if not is_ready():
+        return await call_next(request)
+    with pin_catalog() as catalog:
+        response = await call_next(request)
+    response.headers["X-Catalog-Version"] = catalog.version
+    return response
+
+
+@app.exception_handler(Overloaded)
+async def overloaded(request: Request, e: Overloaded):
+    return JSONResponse(status_code=503, content={"detail": str(e)},
+                        headers={"Retry-After": str(e.retry_after)})
+
 @app.get("/")
 def read_root():
     return {"message": "Degree Planner API"}
 
+@app.get("/ready")
+def readiness():
+    if not is_ready():
+        return JSONResponse(status_code=503, content={"status": "warming"})
+    catalog = get_catalog()
+    return {
+        "status": "ready",
+        "version": catalog.version,
+        "courses": len(catalog.courses),
+        "departments": len(catalog.departments),
+        "views": len(catalog.views),
+    }
+
+@app.get("/metrics")
+def metrics():
+    return Response(content=REGISTRY.render(), media_type=CONTENT_TYPE)
+
 @app.get("/selected-courses/{dept_code}")
-def get_selected_courses(dept_code: str):
+def get_selected_courses(dept_code: str, request: Request, expand: bool = False,
+                         fields: str | None = None, compact: bool = False):
     try:
-        all_courses = load_courses()
-        department = load_department(dept_code)
-        selected_courses = build_selected_courses(department, all_courses, expand=False)
-        return selected_courses
+        view = get_catalog().get_view(dept_code, expand, parse_fields(fields), compact)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except FileNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+    encoding = negotiate_encoding(request.headers.get("accept-encoding"), view.encoded)
+    body, etag = view.representation(encoding)
+    headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
+
+@app.get("/courses/search")
+def search_courses(q: str = Query(..., min_length=1, max_length=200),
+                   dept: str | None = None, level: int | None = Query(None, ge=0, le=9),
+                   credits: float | None = None, limit: int = Query(20, ge=1, le=100)):
+    hits = get_catalog().search.search(q, limit=limit, dept=dept, level=level, credits=credits)
+    return {"query": q, "results": [hit.__dict__ for hit in hits]}
+
+@app.get("/check-semester")
+def check_semester(semester: int = Query(..., ge=1, le=12),
+                   courses: str = Query("", max_length=500),
+                   min_credits: float = 15, max_credits: float = 24):
+    codes = [code.strip().upper() for code in courses.split(",") if code.strip()]
+    return get_catalog().semester_checker.check(semester, codes, min_credits, max_credits).to_dict()
+
+
+class WhatIfRequest(BaseModel):
+    completed: list[str]
+    current_semester: int = Field(ge=1, le=CONFIG["DUAL_DEGREE_SEMESTERS"])  # per department: degree_length
+    departments: list[str] | None = None
+    preferences: dict[str, float] = {}
+    preview: bool = False
+    priority: Literal["interactive", "bulk"] = "interactive"  # bulk for cohort planning
+
+
+@app.post("/what-if")
+def what_if(request: WhatIfRequest):
+    try:
+        with solve_priority(request.priority):
+            results = compare_departments(
+                request.completed, request.current_semester,
+                request.departments, request.preferences or None,
+                preview=request.preview
+            )
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return {"results": results}
+
+
+class ReplanRequest(BaseModel):
+    dept: str
+    completed: list[str]
+    current_semester: int = Field(ge=1, le=CONFIG["DUAL_DEGREE_SEMESTERS"])  # checked against degree_length
+    plan: dict[int, list[str]] | None = None  # current plan; planned from scratch when missing
+    pinned: list[tuple[int, str]] = []
+    window: tuple[int, int]
+    preferences: dict[str, float] = {}
+
+
+@app.post("/replan")
+def replan(request: ReplanRequest):
+    try:
+        return replan_for_department(
+            request.dept, request.completed, request.current_semester, request.plan,
+            request.pinned, request.window, request.preferences or None
+        )
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+
+@app.websocket("/ws/plan")
+async def plan_session(websocket: WebSocket):
+    # The server keeps the student's plan; after the first snapshot each
+    # re-plan is sent as a versioned diff (see plan_session.py)
+    await websocket.accept()
+    session = PlanSession()
+    try:
+        while True:
+            try:
+                message = json.loads(await websocket.receive_text())
+            except ValueError:
+                message = None
+            if isinstance(message, dict):
+                reply = await asyncio.to_thread(session.handle, message)
+            else:
+                reply = {"type": "error", "detail": "Messages must be JSON objects"}
+            await websocket.send_text(encode_json(reply).decode())
+    except WebSocketDisconnect:
+        pass
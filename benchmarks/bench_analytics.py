@@ -0,0 +1,116 @@
+"""
+Co-enrollment analytics on a synthetic enrollment database.
+
+Generates a CourseScraper-schema database with ~50k enrollments, builds the
+aggregate tables, and compares query latency on the precomputed tables
+against the equivalent ad-hoc queries over the raw enrollments table.
+
+Usage:
+    python benchmarks/bench_analytics.py --enrollments 50000
+"""
+
+import argparse
+import logging
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from utils.scrape_ldap import CourseScraper
+from utils import enrollment_analytics as analytics
+
+TERMS = ["2401", "2402", "2501", "2502"]
+DEPARTMENTS = ["CS", "EE", "ME", "CE", "CH", "MT", "PH", "TT"]
+
+
+def make_db(db_name: str, num_enrollments: int, courses_per_term: int = 300,
+            courses_per_student: int = 5, seed: int = 0):
+    """Students take ~courses_per_student courses per term, skewed towards popular ones"""
+    rng = random.Random(seed)
+    CourseScraper(db_name)
+    conn = sqlite3.connect(db_name)
+
+    codes = [f"{d}L{n}" for d in ("CO", "EL", "MC", "MT", "PY", "HU", "CV", "AP") for n in range(100, 100 + courses_per_term // 8)]
+    courses = [(f"{term}-{code}", f"Course {code}", "") for term in TERMS for code in codes]
+    conn.executemany('INSERT INTO courses (course_id, course_name, course_url) VALUES (?, ?, ?)', courses)
+
+    weights = [1 / (i + 1) for i in range(len(codes))]
+    students, enrollments = [], []
+    student = 0
+    while len(enrollments) < num_enrollments:
+        dept = rng.choice(DEPARTMENTS)
+        entry = f"{rng.choice([2021, 2022, 2023, 2024])}{dept}{10000 + student}"
+        student += 1
+        students.append((entry, entry, f"{dept.lower()}{student}", f"Student {student}",
+                         f"{dept.lower()}{student}@iitd.ac.in", f"{dept}1"))
+        term = rng.choice(TERMS)
+        for code in set(rng.choices(codes, weights, k=courses_per_student)):
+            enrollments.append((f"{term}-{code}", entry))
+    conn.executemany('''
+        INSERT INTO students (student_key, entry_number, student_id, student_name, email, department)
+        VALUES (?, ?, ?, ?, ?, ?)
+    ''', students)
+    conn.executemany('INSERT INTO enrollments (course_id, student_key) VALUES (?, ?)',
+                     enrollments[:num_enrollments])
+    conn.commit()
+    conn.close()
+
+
+def time_query(conn, sql, params, repeat=50):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        conn.execute(sql, params).fetchall()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Co-enrollment analytics benchmark")
+    parser.add_argument("--enrollments", type=int, default=50000)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db_name = str(Path(tmpdir) / "analytics.db")
+        make_db(db_name, args.enrollments)
+
+        start = time.perf_counter()
+        summary = analytics.build_analytics(db_name)
+        print(f"build_analytics: {time.perf_counter() - start:.2f}s  {summary}")
+
+        conn = sqlite3.connect(db_name)
+        course = conn.execute('SELECT course_code FROM course_popularity ORDER BY students DESC LIMIT 1').fetchone()[0]
+        term = "2501"
+
+        raw_pairs = time_query(conn, '''
+            SELECT b.course_id, COUNT(*) AS shared
+            FROM enrollments a JOIN enrollments b
+              ON a.student_key = b.student_key AND a.course_id != b.course_id
+            WHERE a.course_id = ? AND b.course_id LIKE ?
+            GROUP BY b.course_id ORDER BY shared DESC LIMIT 10
+        ''', (f"{term}-{course}", f"{term}-%"), repeat=5)
+        pre_pairs = time_query(conn, '''
+            SELECT course_b, students FROM co_enrollment
+            WHERE course_a = ? AND term = ? ORDER BY students DESC LIMIT 10
+        ''', (course, term))
+        raw_pop = time_query(conn, '''
+            SELECT course_id, COUNT(*) AS n FROM enrollments
+            WHERE course_id LIKE ? GROUP BY course_id ORDER BY n DESC LIMIT 10
+        ''', (f"{term}-%",), repeat=5)
+        pre_pop = time_query(conn, '''
+            SELECT course_id, students FROM course_popularity
+            WHERE term = ? ORDER BY students DESC LIMIT 10
+        ''', (term,))
+        conn.close()
+
+        print(f"top co-enrolled with {course} in {term}: raw self-join {raw_pairs:8.2f} ms, "
+              f"precomputed {pre_pairs:6.3f} ms")
+        print(f"most popular in {term}:               raw GROUP BY  {raw_pop:8.2f} ms, "
+              f"precomputed {pre_pop:6.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
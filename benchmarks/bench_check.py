@@ -0,0 +1,55 @@
+"""
+Latency of the semester clash check: SemesterChecker.check on its own and
+GET /check-semester through the ASGI app, for a clean semester and one
+with a slot clash.
+
+Usage:
+    python benchmarks/bench_check.py [--repeat 100000]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from fastapi.testclient import TestClient
+
+from api.main import app
+from catalog import get_catalog
+
+# EE1 semester 5 as recommended, then with ELL202 (slot A, like ELL409) added
+CLEAN = ["ELL302", "ELL304", "ELL305", "ELP225", "ELL409", "HUL212"]
+CLASHING = CLEAN + ["ELL202"]
+
+
+def per_call_us(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Semester clash-check latency")
+    parser.add_argument("--repeat", type=int, default=100000)
+    args = parser.parse_args()
+
+    checker = get_catalog().semester_checker
+    for label, codes in (("clean", CLEAN), ("clashing", CLASHING)):
+        result = checker.check(5, codes, 15, 24)
+        us = per_call_us(lambda: checker.check(5, codes, 15, 24), args.repeat)
+        print(f"check()  {label:9} {us:7.2f} us   ok={result.ok} credits={result.credits:g} "
+              f"clashes={[(c.slot, c.courses) for c in result.clashes]}")
+
+    with TestClient(app) as client:
+        for label, codes in (("clean", CLEAN), ("clashing", CLASHING)):
+            url = f"/check-semester?semester=5&courses={','.join(codes)}"
+            assert client.get(url).status_code == 200
+            us = per_call_us(lambda: client.get(url), max(args.repeat // 100, 100))
+            print(f"endpoint {label:9} {us:7.0f} us   (TestClient round trip)")
+
+
+if __name__ == "__main__":
+    main()
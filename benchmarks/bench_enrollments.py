@@ -0,0 +1,221 @@
+"""
+Enrollment storage: the old per-enrollment students rows against the
+normalized students + enrollments tables, on a synthetic full-institute
+scrape.
+
+  scrape    every course page of one term written through write_courses,
+            in WRITE_BATCH_COURSES-course transactions as DatabaseWriter
+            does
+  rescrape  an add/drop period later: some students swap a course, a few
+            change their e-mail; only the courses whose page changed are
+            rewritten (the page hash skips the rest in both layouts)
+  migrate   the old-layout database converted in place
+            (migrate_enrollment_schema + VACUUM), checked against the
+            database the normalized write path produced
+
+Reports DB size, rows written and WAL bytes (the pages each phase wrote;
+automatic checkpoints are off so the WAL only grows).
+
+Usage:
+    python benchmarks/bench_enrollments.py [--students 12000] [--courses 1500] [--per-student 6]
+"""
+
+import argparse
+import logging
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from utils.scrape_ldap import (
+    CourseScraper, STUDENT_FIELDS, WRITE_BATCH_COURSES, migrate_enrollment_schema, student_key, write_courses,
+)
+
+DEPARTMENTS = ["AM", "BB", "CE", "CH", "CS", "EE", "ES", "ME", "MS", "MT", "PH", "TT"]
+
+
+def create_legacy_tables(conn: sqlite3.Connection):
+    """The layout before students/enrollments: one students row per (course, student)"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS courses (
+            course_id TEXT PRIMARY KEY,
+            course_name TEXT NOT NULL,
+            course_url TEXT,
+            scraped_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS students (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            course_id TEXT NOT NULL,
+            student_name TEXT,
+            student_id TEXT,
+            entry_number TEXT,
+            email TEXT,
+            department TEXT,
+            FOREIGN KEY (course_id) REFERENCES courses(course_id)
+        )
+    ''')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_course_id ON students(course_id)')
+    conn.commit()
+
+
+def legacy_write_courses(cursor: sqlite3.Cursor, batch: list[tuple]) -> int:
+    """The old write path: replace the course, delete and re-insert all its students"""
+    scraped_at = datetime.now()
+    cursor.executemany('''
+        INSERT OR REPLACE INTO courses (course_id, course_name, course_url, scraped_at)
+        VALUES (?, ?, ?, ?)
+    ''', [(course['course_id'], course['course_name'], course['course_url'], scraped_at)
+          for course, _ in batch])
+    cursor.executemany('DELETE FROM students WHERE course_id = ?',
+                       [(course['course_id'],) for course, _ in batch])
+    rows = [(course['course_id'], *(student.get(field) for field in STUDENT_FIELDS))
+            for course, students in batch for student in students]
+    cursor.executemany(f'''
+        INSERT INTO students (course_id, {', '.join(STUDENT_FIELDS)})
+        VALUES (?, {', '.join('?' * len(STUDENT_FIELDS))})
+    ''', rows)
+    return len(rows)
+
+
+def institute(num_students: int, num_courses: int, per_student: int, seed: int):
+    """Students (parsed-page dicts) and each one's courses, skewed towards large core courses"""
+    rng = random.Random(seed)
+    students = []
+    for n in range(num_students):
+        dept = rng.choice(DEPARTMENTS)
+        year = rng.choice([2022, 2023, 2024, 2025])
+        students.append({
+            'student_name': f'Student {n}',
+            'entry_number': f'{year}{dept}1{n:04d}',
+            'student_id': f'{dept.lower()}1{year % 100}{n:04d}',
+            'email': f'{dept.lower()}1{year % 100}{n:04d}@iitd.ac.in',
+            'department': f'{dept}1',
+        })
+    course_ids = [f'2501-{rng.choice(DEPARTMENTS)}L{100 + n}' for n in range(num_courses)]
+    weights = [1 / (i + 1) ** 0.8 for i in range(num_courses)]
+    taking = [set(rng.choices(range(num_courses), weights, k=per_student)) for _ in students]
+    return students, course_ids, taking
+
+
+def pages(students, course_ids, taking, only=None) -> list[tuple[dict, list[dict]]]:
+    """(course, students) pairs as the scraper parses them, for the courses in only (default: all)"""
+    rosters = {j: [] for j in range(len(course_ids))}
+    for i, courses in enumerate(taking):
+        for j in courses:
+            rosters[j].append(students[i])
+    return [({'course_id': course_ids[j], 'course_name': f'Course {course_ids[j]}', 'course_url': ''},
+             rosters[j])
+            for j in range(len(course_ids)) if only is None or j in only]
+
+
+def write(db_name: str, batch: list[tuple], writer) -> dict:
+    """Write pages in DatabaseWriter-sized transactions; rows written, WAL bytes and seconds"""
+    conn = sqlite3.connect(db_name)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    conn.execute('PRAGMA wal_autocheckpoint=0')
+    conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+    cursor = conn.cursor()
+    rows = 0
+    start = time.perf_counter()
+    for i in range(0, len(batch), WRITE_BATCH_COURSES):
+        rows += writer(cursor, batch[i:i + WRITE_BATCH_COURSES])
+        conn.commit()
+    seconds = time.perf_counter() - start
+    wal = Path(db_name + '-wal').stat().st_size
+    conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+    conn.close()
+    return {'rows': rows, 'wal': wal, 'seconds': seconds}
+
+
+def db_size(db_name: str) -> int:
+    conn = sqlite3.connect(db_name)
+    conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+    used = conn.execute('PRAGMA page_count').fetchone()[0] - conn.execute('PRAGMA freelist_count').fetchone()[0]
+    size = used * conn.execute('PRAGMA page_size').fetchone()[0]
+    conn.close()
+    return size
+
+
+def contents(db_name: str) -> tuple[set, set]:
+    """(course, student key) pairs and (key, details...) rows of a normalized database"""
+    conn = sqlite3.connect(db_name)
+    enrollments = set(conn.execute('SELECT course_id, student_key FROM enrollments'))
+    students = set(conn.execute(f'SELECT student_key, {", ".join(STUDENT_FIELDS)} FROM students'))
+    conn.close()
+    return enrollments, students
+
+
+def mb(size: int) -> str:
+    return f"{size / 2 ** 20:7.2f} MB"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Enrollment storage: old vs normalized layout")
+    parser.add_argument("--students", type=int, default=12000)
+    parser.add_argument("--courses", type=int, default=1500)
+    parser.add_argument("--per-student", type=int, default=6)
+    parser.add_argument("--swaps", type=float, default=0.05, help="Share of students swapping a course")
+    parser.add_argument("--emails", type=float, default=0.01, help="Share of students changing e-mail")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    logging.disable(logging.INFO)
+
+    rng = random.Random(args.seed)
+    students, course_ids, taking = institute(args.students, args.courses, args.per_student, args.seed)
+    scrape = pages(students, course_ids, taking)
+    enrollments = sum(len(roster) for _, roster in scrape)
+
+    # Add/drop: some students swap one course for another, a few change e-mail
+    changed = set()
+    for i in rng.sample(range(args.students), int(args.swaps * args.students)):
+        dropped = rng.choice(sorted(taking[i]))
+        added = rng.choice([j for j in range(args.courses) if j not in taking[i]])
+        taking[i] = (taking[i] - {dropped}) | {added}
+        changed |= {dropped, added}
+    for i in rng.sample(range(args.students), int(args.emails * args.students)):
+        students[i] = {**students[i], 'email': students[i]['email'].replace('@', '.new@')}
+        changed |= taking[i]
+    rescrape = pages(students, course_ids, taking, changed)
+
+    print(f"{args.students} students, {args.courses} courses, {enrollments} enrollments; "
+          f"rescrape rewrites {len(changed)} changed courses")
+    print(f"{'':10} {'layout':10} {'rows':>8} {'WAL':>10} {'seconds':>8} {'DB size':>10}")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        legacy_db, normalized_db = str(Path(tmpdir) / "legacy.db"), str(Path(tmpdir) / "normalized.db")
+        create_legacy_tables(sqlite3.connect(legacy_db))
+        CourseScraper(normalized_db)
+
+        for phase, batch in (("scrape", scrape), ("rescrape", rescrape)):
+            for layout, db_name, writer in (("old", legacy_db, legacy_write_courses),
+                                            ("normalized", normalized_db, write_courses)):
+                result = write(db_name, batch, writer)
+                print(f"{phase:10} {layout:10} {result['rows']:8} {mb(result['wal'])} "
+                      f"{result['seconds']:8.2f} {mb(db_size(db_name))}")
+
+        before = db_size(legacy_db)
+        conn = sqlite3.connect(legacy_db)
+        start = time.perf_counter()
+        migrated = migrate_enrollment_schema(conn)
+        conn.execute('VACUUM')
+        seconds = time.perf_counter() - start
+        conn.close()
+        print(f"\nmigrate: {migrated['rows']} old rows -> {migrated['students']} students, "
+              f"{migrated['enrollments']} enrollments in {seconds:.2f}s; "
+              f"{mb(before).strip()} -> {mb(db_size(legacy_db)).strip()}")
+        same = contents(legacy_db) == contents(normalized_db)
+        print(f"migrated database matches the normalized write path: {same}")
+        assert same
+        assert len(contents(normalized_db)[0]) == sum(len(courses) for courses in taking)
+        assert all(student_key(student) for student in students)
+
+
+if __name__ == "__main__":
+    main()
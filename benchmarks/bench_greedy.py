@@ -0,0 +1,116 @@
+"""
+Greedy fast-path planner: how often it is feasible, how fast, and whether
+its plans satisfy the CP-SAT model.
+
+For every department and three students (the sample EE1 student in
+semester 4, a semester-4 student with only four courses done, and a
+first-semester student), in both planning modes (recommended
+semesters / variable horizon), run the greedy planner, then check its plan
+by fixing the model's variables to it and solving. Variable-horizon plans
+must also take every course after its prerequisites.
+
+Usage:
+    python benchmarks/bench_greedy.py
+"""
+
+import contextlib
+import io
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from ortools.sat.python import cp_model
+
+from catalog import get_catalog
+from planner import (
+    CONFIG, build_courses_left, build_greedy_plan, build_plan_model, build_selected_courses,
+    calculate_credits_done, degree_length, filter_courses_by_offering, prerequisite_violations,
+    spread_over_horizon,
+)
+from solver import solve_plan
+from what_if import student_for_department
+
+SAMPLE = [
+    "ELL101", "PYL101", "MCP100", "MTL100", "COL100", "PYP100", "MCP101", "APL100", "CML101",
+    "MTL101", "CMP100", "ELL205", "ELL203", "ELL201", "COL106", "ELL202", "ELP101",
+]
+STUDENTS = {"sem4": (SAMPLE, 4), "sem4-behind": (SAMPLE[:4], 4), "fresh": ([], 1)}
+
+
+def validate(planner, greedy) -> bool:
+    """True if the model accepts the greedy plan with every variable fixed to it."""
+    assignment = greedy.assignment()
+    for key, var in planner.get_course_vars().items():
+        planner.model.Add(var == assignment.get(key, 0))
+    if planner.semester_open:
+        planner.set_horizon(greedy.horizon)
+    _, status = solve_plan(planner, 10.0)
+    return status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+
+
+def main():
+    catalog = get_catalog()
+    outcomes = Counter()
+    reasons = Counter()
+    greedy_times, solver_times = [], []
+
+    for dept_code in sorted(catalog.departments):
+        department = catalog.get_department(dept_code)
+        for student, (completed, semester) in STUDENTS.items():
+            for shortest in (False, True):
+                with contextlib.redirect_stdout(io.StringIO()):
+                    selected = build_selected_courses(department, catalog.courses, catalog.offerings)
+                    user = student_for_department(completed, department, selected, semester)
+                    last = degree_length(department, user)
+                    courses_left = filter_courses_by_offering(build_courses_left(selected, user, last),
+                                                              catalog.offerings)
+                    if shortest:
+                        courses_left = spread_over_horizon(courses_left, last + CONFIG["EXTRA_SEMESTERS"],
+                                                           catalog.offerings)
+                    credits_done = calculate_credits_done(user)
+
+                    start = time.perf_counter()
+                    greedy = build_greedy_plan(user, department, courses_left, credits_done,
+                                               variable_horizon=shortest)
+                    greedy_times.append(time.perf_counter() - start)
+
+                    planner, _ = build_plan_model(user, department, courses_left, variable_horizon=shortest)
+                    start = time.perf_counter()
+                    _, status = solve_plan(planner, 10.0)
+                    solver_times.append(time.perf_counter() - start)
+                    solvable = status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+
+                    if greedy.feasible:
+                        planner, _ = build_plan_model(user, department, courses_left, variable_horizon=shortest,
+                                                      group_electives=False)
+                        valid = validate(planner, greedy)
+                        if shortest:
+                            plan = {sem: [c["code"] for c in courses] for sem, courses in greedy.plan.items()}
+                            violations = prerequisite_violations(plan, catalog.courses, set(completed))
+                            assert not violations, (dept_code, student, violations)
+                        outcomes["greedy valid" if valid else "greedy INVALID"] += 1
+                    else:
+                        outcomes["greedy failed, solver feasible" if solvable else "both infeasible"] += 1
+                        if solvable:
+                            reasons[greedy.reason.split(":")[0]] += 1
+
+    total = sum(outcomes.values())
+    greedy_ok = outcomes["greedy valid"]
+    solver_ok = greedy_ok + outcomes["greedy failed, solver feasible"]
+    print(f"{total} cases ({len(catalog.departments)} departments x {len(STUDENTS)} students x 2 modes)")
+    for outcome, count in outcomes.most_common():
+        print(f"  {outcome:32} {count}")
+    for reason, count in reasons.most_common():
+        print(f"    {reason}: {count}")
+    print(f"greedy feasible in {greedy_ok}/{solver_ok} solver-feasible cases")
+    greedy_times.sort()
+    solver_times.sort()
+    print(f"greedy  median {greedy_times[len(greedy_times) // 2] * 1000:6.1f} ms   max {greedy_times[-1] * 1000:6.1f} ms")
+    print(f"CP-SAT  median {solver_times[len(solver_times) // 2] * 1000:6.1f} ms   max {solver_times[-1] * 1000:6.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Shortest-horizon search: rebuilding a model per horizon vs one incremental model.
+
+For every department and the sample student, search upward from the
+critical-path / credit lower bound for the earliest feasible graduation
+semester.
+  rebuild     - a fresh model (spread up to that horizon) per candidate horizon
+  incremental - one model with horizon literals, re-solved under assumptions
+                with the recommended placement as hint (plan_degree(shortest=True))
+Every plan found must take each course after its prerequisites.
+
+Usage:
+    python benchmarks/bench_horizon.py [--departments EE1,CS5] [--fresh]
+    python benchmarks/bench_horizon.py --semester 3 --completed ELL101,PYL101,MTL100,COL100
+"""
+
+import argparse
+import contextlib
+import io
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from ortools.sat.python import cp_model
+
+from catalog import get_catalog
+from planner import (
+    CONFIG, build_courses_left, build_plan_model, build_selected_courses, degree_length,
+    filter_courses_by_offering, horizon_lower_bound, plan_degree, prerequisite_violations,
+    spread_over_horizon,
+)
+from solver import solve_plan
+from what_if import student_for_department
+
+COMPLETED = [
+    "ELL101", "PYL101", "MCP100", "MTL100", "COL100", "PYP100", "MCP101", "APL100", "CML101",
+    "MTL101", "CMP100", "ELL205", "ELL203", "ELL201", "COL106", "ELL202", "ELP101",
+]
+SEMESTER = 4
+TIME_LIMIT = 10.0
+
+
+def rebuild_search(user, department, selected, offerings) -> tuple[int | None, int]:
+    last_semester = degree_length(department, user)
+    courses_left = filter_courses_by_offering(build_courses_left(selected, user, last_semester), offerings)
+    completed = set(user.completed_corecourses) | set(user.completed_hul) | set(user.completed_DE)
+    _, credits_done = build_plan_model(user, department, courses_left)
+    lower = horizon_lower_bound(courses_left, user, credits_done, completed)
+
+    solves = 0
+    for horizon in range(lower, last_semester + CONFIG["EXTRA_SEMESTERS"] + 1):
+        spread = spread_over_horizon(courses_left, horizon, offerings)
+        spread = {sem: courses for sem, courses in spread.items() if sem <= horizon}
+        planner, _ = build_plan_model(user, department, spread, variable_horizon=True)
+        _, status = solve_plan(planner, TIME_LIMIT)
+        solves += 1
+        if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            return horizon, solves
+    return None, solves
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shortest-horizon search cost")
+    parser.add_argument("--departments", help="Comma-separated department codes (default: all)")
+    parser.add_argument("--fresh", action="store_true", help="Plan for a first-semester student instead")
+    parser.add_argument("--semester", type=int, help="Current semester of the student")
+    parser.add_argument("--completed", help="Comma-separated completed course codes")
+    args = parser.parse_args()
+    completed, semester = ([], 1) if args.fresh else (COMPLETED, SEMESTER)
+    if args.completed is not None:
+        completed = [code for code in args.completed.split(",") if code]
+    semester = args.semester or semester
+
+    catalog = get_catalog()
+    dept_codes = args.departments.split(",") if args.departments else sorted(catalog.departments)
+
+    totals = [0.0, 0.0]
+    print(f"{'dept':6} {'horizon':>7} {'solves':>6} {'rebuild':>9} {'incremental':>12}")
+    for dept_code in dept_codes:
+        department = catalog.get_department(dept_code)
+        with contextlib.redirect_stdout(io.StringIO()):
+            selected = build_selected_courses(department, catalog.courses, catalog.offerings)
+            user = student_for_department(completed, department, selected, semester)
+
+            start = time.perf_counter()
+            horizon, solves = rebuild_search(user, department, selected, catalog.offerings)
+            rebuild = time.perf_counter() - start
+
+            start = time.perf_counter()
+            result = plan_degree(user, department, selected, catalog.offerings,
+                                 time_limit=TIME_LIMIT, shortest=True)
+            incremental = time.perf_counter() - start
+
+        assert result["graduation_semester"] in (horizon, None) or horizon is None, (dept_code, result, horizon)
+        violations = prerequisite_violations(result["plan"], catalog.courses, set(completed))
+        assert not violations, (dept_code, violations)
+        totals[0] += rebuild
+        totals[1] += incremental
+        print(f"{dept_code:6} {str(result['graduation_semester']):>7} {result['solves']:>6} "
+              f"{rebuild:8.2f}s {incremental:11.2f}s")
+
+    print(f"\ntotal  rebuild {totals[0]:.2f}s   incremental {totals[1]:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
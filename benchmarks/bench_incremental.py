@@ -0,0 +1,89 @@
+"""
+Incremental / resumable scraping scenarios against the local LDAP stub.
+
+Runs, against one database:
+  1. a full first scrape
+  2. a re-scrape with validators (every page should come back 304)
+  3. a re-scrape with validators disabled and a few pages edited
+     (unchanged pages are skipped by content hash)
+  4. a scrape killed part-way through, then resumed
+
+Usage:
+    python benchmarks/bench_incremental.py --courses 300 --changed 15
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.ldap_stub import create_app, start_stub, set_page, render_course_page
+from utils.scrape_ldap import CourseScraper
+
+
+async def run_scrape(db_name: str, base_url: str, label: str, app) -> CourseScraper:
+    app["stats"].update({"200": 0, "304": 0})
+    scraper = CourseScraper(db_name, base_url=base_url)
+    start = time.perf_counter()
+    await scraper.scrape_all()
+    elapsed = time.perf_counter() - start
+    stats = scraper.stats
+    skipped = stats['not_modified'] + stats['unchanged'] + stats['resumed']
+    print(f"{label:<34} {elapsed:6.2f}s  fetched={stats['fetched']:<4} skipped={skipped:<4} "
+          f"(304={stats['not_modified']}, same-hash={stats['unchanged']}, resumed={stats['resumed']})  "
+          f"changed={stats['changed']:<4} server 200/304={app['stats']['200']}/{app['stats']['304']}")
+    return scraper
+
+
+async def run_killed(db_name: str, base_url: str, after_seconds: float):
+    scraper = CourseScraper(db_name, base_url=base_url)
+    task = asyncio.create_task(scraper.scrape_all())
+    await asyncio.sleep(after_seconds)
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+    print(f"{'killed run':<34} after {after_seconds:.2f}s  changed={scraper.stats['changed']}")
+
+
+async def main_async(num_courses: int, num_students: int, num_changed: int):
+    app = create_app(num_courses, num_students)
+    runner, base_url = await start_stub(app)
+    try:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            db_name = str(Path(tmpdir) / "incremental.db")
+            await run_scrape(db_name, base_url, "1. first scrape", app)
+            await run_scrape(db_name, base_url, "2. re-scrape (conditional GET)", app)
+
+            app["config"]["validators"] = False
+            for course_id in app["course_ids"][:num_changed]:
+                set_page(app, course_id, render_course_page(course_id + "-v2", num_students))
+            await run_scrape(db_name, base_url, f"3. no validators, {num_changed} edited", app)
+
+            # Fresh database so the killed run has real work to lose
+            db_name = str(Path(tmpdir) / "resume.db")
+            await run_killed(db_name, base_url, after_seconds=0.5)
+            await run_scrape(db_name, base_url, "4. resumed run", app)
+    finally:
+        await runner.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incremental scraping scenarios")
+    parser.add_argument("--courses", type=int, default=300)
+    parser.add_argument("--students", type=int, default=80)
+    parser.add_argument("--changed", type=int, default=15)
+    args = parser.parse_args()
+
+    logging.getLogger("utils.scrape_ldap").setLevel(logging.WARNING)
+    asyncio.run(main_async(args.courses, args.students, args.changed))
+
+
+if __name__ == "__main__":
+    main()
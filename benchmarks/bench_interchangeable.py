@@ -0,0 +1,134 @@
+"""
+Interchangeable-elective classes against one variable per candidate.
+
+For every department, two students (the sample EE1 student in semester 4
+and a first-semester student) and both planning modes, builds the model
+with and without group_interchangeable and compares variables,
+constraints and solve time (the earliest-graduation search in variable
+horizon mode). Every grouped plan is checked against the expanded model
+with its variables fixed to that plan.
+
+Usage:
+    python benchmarks/bench_interchangeable.py [--departments EE1,CS1]
+"""
+
+import argparse
+import contextlib
+import io
+import statistics
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from ortools.sat.python import cp_model
+
+from catalog import get_catalog
+from planner import (
+    CONFIG, build_courses_left, build_plan_model, build_selected_courses, degree_length,
+    filter_courses_by_offering, find_shortest_horizon, horizon_lower_bound,
+    spread_over_horizon,
+)
+from solver import extract_semester_plan, solve_plan
+from what_if import student_for_department
+
+SAMPLE = [
+    "ELL101", "PYL101", "MCP100", "MTL100", "COL100", "PYP100", "MCP101", "APL100", "CML101",
+    "MTL101", "CMP100", "ELL205", "ELL203", "ELL201", "COL106", "ELL202", "ELP101",
+]
+STUDENTS = {"sem4": (SAMPLE, 4), "fresh": ([], 1)}
+TIME_LIMIT = 20.0
+
+
+def solve(user, department, courses_left, shortest: bool, group: bool) -> dict:
+    planner, credits_done = build_plan_model(user, department, courses_left,
+                                             variable_horizon=shortest, group_electives=group)
+    proto = planner.get_model().Proto()
+    start = time.perf_counter()
+    if shortest:
+        completed = set(user.completed_corecourses) | set(user.completed_hul) | set(user.completed_DE)
+        lower = horizon_lower_bound(courses_left, user, credits_done, completed)
+        upper = degree_length(department, user) + CONFIG["EXTRA_SEMESTERS"]
+        solver, status, horizon, _ = find_shortest_horizon(planner, lower, upper, TIME_LIMIT, 1)
+    else:
+        solver, status = solve_plan(planner, TIME_LIMIT, 1)
+        horizon = None
+    seconds = time.perf_counter() - start
+    feasible = status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+    plan = extract_semester_plan(solver, planner, courses_left) if feasible else {}
+    return {
+        "variables": len(proto.variables), "constraints": len(proto.constraints),
+        "seconds": seconds, "status": solver.StatusName(status), "horizon": horizon,
+        "plan": {(sem, course["code"]) for sem, courses in plan.items() for course in courses},
+    }
+
+
+def accepted(user, department, courses_left, shortest: bool, result: dict) -> bool:
+    """True if the expanded model accepts the plan with every variable fixed to it."""
+    planner, _ = build_plan_model(user, department, courses_left, variable_horizon=shortest,
+                                  group_electives=False)
+    for key, var in planner.get_course_vars().items():
+        planner.model.Add(var == int(key in result["plan"]))
+    if shortest:
+        planner.set_horizon(result["horizon"])
+    _, status = solve_plan(planner, TIME_LIMIT, 1)
+    return status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Interchangeable-elective classes vs full expansion")
+    parser.add_argument("--departments", help="Comma-separated department codes (default: all)")
+    args = parser.parse_args()
+
+    catalog = get_catalog()
+    dept_codes = args.departments.split(",") if args.departments else sorted(catalog.departments)
+    outcomes = Counter()
+    variables, constraints, speedups = [], [], []
+    expanded_total = grouped_total = 0.0
+    print(f"{'case':24} {'vars':>11} {'constraints':>13} {'expanded ms':>12} {'grouped ms':>11}  status")
+    for dept_code in dept_codes:
+        department = catalog.get_department(dept_code)
+        for student, (completed, semester) in STUDENTS.items():
+            for shortest in (False, True):
+                with contextlib.redirect_stdout(io.StringIO()):
+                    selected = build_selected_courses(department, catalog.courses, catalog.offerings)
+                    user = student_for_department(completed, department, selected, semester)
+                    last = degree_length(department, user)
+                    courses_left = filter_courses_by_offering(build_courses_left(selected, user, last),
+                                                              catalog.offerings)
+                    if shortest:
+                        courses_left = spread_over_horizon(courses_left, last + CONFIG["EXTRA_SEMESTERS"],
+                                                           catalog.offerings)
+                    expanded = solve(user, department, courses_left, shortest, group=False)
+                    grouped = solve(user, department, courses_left, shortest, group=True)
+                    if grouped["plan"]:
+                        ok = accepted(user, department, courses_left, shortest, grouped)
+                    else:
+                        ok = None
+
+                same = (expanded["status"], expanded["horizon"]) == (grouped["status"], grouped["horizon"])
+                outcomes["same outcome" if same else "DIFFERENT outcome"] += 1
+                if ok is not None:
+                    outcomes["grouped plan valid" if ok else "grouped plan INVALID"] += 1
+                variables.append(grouped["variables"] / expanded["variables"])
+                constraints.append(grouped["constraints"] / expanded["constraints"])
+                speedups.append(expanded["seconds"] / grouped["seconds"])
+                expanded_total += expanded["seconds"]
+                grouped_total += grouped["seconds"]
+                case = f"{dept_code} {student} {'horizon' if shortest else 'fixed'}"
+                print(f"{case:24} {expanded['variables']:5}>{grouped['variables']:5} "
+                      f"{expanded['constraints']:6}>{grouped['constraints']:6} "
+                      f"{expanded['seconds'] * 1000:12.1f} {grouped['seconds'] * 1000:11.1f}  "
+                      f"{grouped['status']}{'' if same else ' (expanded: ' + expanded['status'] + ')'}")
+
+    print(f"\n{len(speedups)} cases: " + ", ".join(f"{count} {name}" for name, count in outcomes.items()))
+    print(f"variables   median {statistics.median(variables):.1%} of expanded, min {min(variables):.1%}")
+    print(f"constraints median {statistics.median(constraints):.1%} of expanded, min {min(constraints):.1%}")
+    print(f"solve time  median speedup {statistics.median(speedups):.2f}x, "
+          f"total {expanded_total:.1f}s -> {grouped_total:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,306 @@
+"""
+Load test for the API: throughput and latency percentiles per endpoint.
+
+Replays a weighted mix of requests, either against the ASGI app in-process
+(httpx's ASGITransport, no sockets) or against uvicorn:
+
+  views    GET /selected-courses/{dept}?compact=true, as the frontend sends it
+  preview  POST /what-if with "preview": true (greedy plans only)
+  plan     POST /what-if, full CP-SAT plan of one department
+
+Planning bodies come from synthetic UserData profiles: a random department
+and semester, with the recommended cores of the earlier semesters completed
+except for a few dropped at random. Everything is seeded, so every
+configuration (and every run with the same arguments) replays the same
+requests.
+
+Each (server workers, client concurrency) combination reports requests/s and
+p50/p95/p99 latency per endpoint. --save writes the results as JSON; a later
+run with --baseline prints the change against such a file.
+
+Usage:
+    python benchmarks/bench_load.py --concurrency 1,8,32 --requests 400
+    python benchmarks/bench_load.py --server-workers 1,2 --save load.json
+    python benchmarks/bench_load.py --url http://127.0.0.1:8000 --baseline load.json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+import httpx
+
+from catalog import get_catalog
+from planner import build_selected_courses
+from user import UserData
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_MIX = "views=0.8,preview=0.15,plan=0.05"
+# Share of a profile's recommended cores left uncompleted
+DROP_RATE = 0.1
+# Seconds to wait for a spawned server to report ready
+STARTUP_TIMEOUT = 120
+
+
+def parse_mix(text: str) -> dict[str, float]:
+    """"views=0.8,plan=0.2" -> {"views": 0.8, "plan": 0.2}"""
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in ("views", "preview", "plan"):
+            raise ValueError(f"Unknown request kind '{name.strip()}' (views, preview, plan)")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+def synthetic_profiles(count: int, rng: random.Random) -> list[UserData]:
+    """Students of random departments and semesters, mostly on track."""
+    catalog = get_catalog()
+    dept_codes = sorted(catalog.departments)
+    selected = {}
+    profiles = []
+    for i in range(count):
+        dept_code = rng.choice(dept_codes)
+        if dept_code not in selected:
+            with contextlib.redirect_stdout(io.StringIO()):
+                selected[dept_code] = build_selected_courses(
+                    catalog.get_department(dept_code), catalog.courses, catalog.offerings
+                )
+        user = UserData(name=f"load-{i}", dept=dept_code, current_semester=rng.randint(2, 7),
+                        core_courses=selected[dept_code])
+        user.completed_corecourses = [
+            code for code in user.completed_corecourses if rng.random() >= DROP_RATE
+        ]
+        profiles.append(user)
+    return profiles
+
+
+def build_requests(mix: dict[str, float], count: int, seed: int) -> list[tuple]:
+    """
+    The request sequence every configuration replays.
+
+    Returns:
+        [(kind, method, path, json body or None)]
+    """
+    rng = random.Random(seed)
+    dept_codes = sorted(get_catalog().departments)
+    kinds = rng.choices(list(mix), weights=list(mix.values()), k=count)
+    profiles = iter(synthetic_profiles(sum(kind != "views" for kind in kinds), rng))
+
+    requests = []
+    for kind in kinds:
+        if kind == "views":
+            requests.append((kind, "GET", f"/selected-courses/{rng.choice(dept_codes)}?compact=true", None))
+            continue
+        user = next(profiles)
+        body = {
+            "completed": user.completed_corecourses + user.completed_hul + user.completed_DE,
+            "current_semester": user.current_semester,
+            "departments": [user.dept],
+            "preview": kind == "preview",
+        }
+        requests.append((kind, "POST", "/what-if", body))
+    return requests
+
+
+async def drive(client: httpx.AsyncClient, requests: list[tuple], concurrency: int) -> tuple[list, float]:
+    """
+    Send requests from `concurrency` concurrent clients.
+
+    Returns:
+        ([(kind, seconds, status code)], wall seconds)
+    """
+    pending = iter(requests)
+    samples = []
+
+    async def worker():
+        for kind, method, path, body in pending:
+            start = time.perf_counter()
+            response = await client.request(method, path, json=body,
+                                            headers={"Accept-Encoding": "br, gzip"})
+            samples.append((kind, time.perf_counter() - start, response.status_code))
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return samples, time.perf_counter() - start
+
+
+def percentile(sorted_values: list[float], q: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    rank = max(1, round(q / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(samples: list, elapsed: float) -> dict:
+    """Per-endpoint (and overall) request count, errors, requests/s and latency percentiles."""
+    groups = {kind: [] for kind in ("views", "preview", "plan") if any(s[0] == kind for s in samples)}
+    for kind, seconds, status in samples:
+        groups[kind].append((seconds, status))
+    groups["all"] = [(seconds, status) for _, seconds, status in samples]
+
+    summary = {}
+    for kind, values in groups.items():
+        latencies = sorted(seconds for seconds, _ in values)
+        summary[kind] = {
+            "requests": len(values),
+            "errors": sum(status >= 400 for _, status in values),
+            "rps": round(len(values) / elapsed, 2),
+            **{f"p{q}_ms": round(percentile(latencies, q) * 1000, 2) for q in (50, 95, 99)},
+        }
+    return summary
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+@contextlib.contextmanager
+def uvicorn_server(workers: int):
+    """Run `uvicorn api.main:app --workers N` on a free port until ready; yields its URL."""
+    port = free_port()
+    url = f"http://127.0.0.1:{port}"
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api.main:app", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        # Each worker warms its own catalog; wait until /ready keeps answering 200
+        deadline = time.monotonic() + STARTUP_TIMEOUT
+        ready = 0
+        while ready < 4 * workers:
+            if time.monotonic() > deadline or process.poll() is not None:
+                raise RuntimeError(f"uvicorn with {workers} workers did not become ready")
+            try:
+                ready = ready + 1 if httpx.get(f"{url}/ready").status_code == 200 else 0
+            except httpx.TransportError:
+                ready = 0
+            if ready == 0:
+                time.sleep(0.5)
+        yield url
+    finally:
+        process.terminate()
+        process.wait()
+
+
+async def run_target(client: httpx.AsyncClient, label, requests: list[tuple],
+                     concurrency_levels: list[int], warmup: int) -> list[dict]:
+    runs = []
+    await drive(client, requests[:warmup], 1)
+    for concurrency in concurrency_levels:
+        samples, elapsed = await drive(client, requests, concurrency)
+        runs.append({"server_workers": label, "concurrency": concurrency,
+                     "seconds": round(elapsed, 3), "endpoints": summarize(samples, elapsed)})
+        print_run(runs[-1])
+    return runs
+
+
+async def run_all(args, requests: list[tuple]) -> list[dict]:
+    timeout = httpx.Timeout(args.timeout)
+    if args.url:
+        async with httpx.AsyncClient(base_url=args.url, timeout=timeout) as client:
+            return await run_target(client, "external", requests, args.concurrency, args.warmup)
+
+    runs = []
+    for workers in args.server_workers:
+        if workers == 0:
+            from api.main import app
+            from what_if import shutdown_pool
+
+            # ASGITransport does not run the lifespan; warm the catalog here instead
+            get_catalog()
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://app", timeout=timeout) as client:
+                runs += await run_target(client, "in-process", requests, args.concurrency, args.warmup)
+            shutdown_pool()
+        else:
+            with uvicorn_server(workers) as url:
+                async with httpx.AsyncClient(base_url=url, timeout=timeout,
+                                             limits=httpx.Limits(max_connections=None)) as client:
+                    runs += await run_target(client, workers, requests, args.concurrency, args.warmup)
+    return runs
+
+
+def print_run(run: dict):
+    print(f"\nserver workers: {run['server_workers']}  concurrency: {run['concurrency']}  "
+          f"({run['seconds']:.2f}s)")
+    print(f"  {'endpoint':9} {'reqs':>5} {'errs':>5} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for kind, s in run["endpoints"].items():
+        print(f"  {kind:9} {s['requests']:5} {s['errors']:5} {s['rps']:9.1f} "
+              f"{s['p50_ms']:9.2f} {s['p95_ms']:9.2f} {s['p99_ms']:9.2f}")
+
+
+def compare(runs: list[dict], baseline: dict):
+    """Print requests/s and p50/p99 of each run next to the matching baseline run."""
+    previous = {(str(r["server_workers"]), r["concurrency"]): r for r in baseline["runs"]}
+    print(f"\nChange against baseline ({baseline['meta']['created']}):")
+    print(f"  {'workers':>10} {'conc':>5} {'endpoint':9} {'req/s':>18} {'p50 ms':>20} {'p99 ms':>20}")
+    for run in runs:
+        old_run = previous.get((str(run["server_workers"]), run["concurrency"]))
+        if old_run is None:
+            continue
+        for kind, new in run["endpoints"].items():
+            old = old_run["endpoints"].get(kind)
+            if old is None:
+                continue
+            cells = []
+            for key in ("rps", "p50_ms", "p99_ms"):
+                change = (new[key] - old[key]) / old[key] * 100 if old[key] else 0.0
+                cells.append(f"{old[key]:8.1f}->{new[key]:<8.1f}{change:+5.0f}%")
+            print(f"  {str(run['server_workers']):>10} {run['concurrency']:5} {kind:9} " + " ".join(cells))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API load test with latency percentiles")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Request mix (default: {DEFAULT_MIX})")
+    parser.add_argument("--requests", type=int, default=400, help="Requests per configuration")
+    parser.add_argument("--concurrency", default="1,8,32", help="Comma-separated client concurrency levels")
+    parser.add_argument("--server-workers", default="0",
+                        help="Comma-separated uvicorn worker counts; 0 drives the app in-process")
+    parser.add_argument("--url", help="Load an already running server instead")
+    parser.add_argument("--warmup", type=int, default=20, help="Unrecorded requests before measuring")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--save", help="Write the results to this JSON file")
+    parser.add_argument("--baseline", help="Compare against results saved with --save")
+    args = parser.parse_args()
+    args.concurrency = [int(c) for c in args.concurrency.split(",")]
+    args.server_workers = [int(w) for w in args.server_workers.split(",")]
+
+    mix = parse_mix(args.mix)
+    requests = build_requests(mix, args.requests, args.seed)
+    runs = asyncio.run(run_all(args, requests))
+
+    results = {
+        "meta": {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "mix": mix,
+            "requests": args.requests,
+            "seed": args.seed,
+            "target": args.url or "local",
+            "cpu_count": os.cpu_count(),
+        },
+        "runs": runs,
+    }
+    if args.baseline:
+        compare(runs, json.loads(Path(args.baseline).read_text()))
+    if args.save:
+        Path(args.save).write_text(json.dumps(results, indent=2))
+        print(f"\nSaved results to {args.save}")
+
+
+if __name__ == "__main__":
+    main()
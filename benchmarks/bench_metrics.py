@@ -0,0 +1,69 @@
+"""
+Cost of the solver metrics against the solves they describe.
+
+Solves one department model, then times solve_stats() + record_solve() for
+that solve (what solve_plan adds to every call) and a /metrics render with
+every department labelled.
+
+Usage:
+    python benchmarks/bench_metrics.py [--department EE1] [--repeat 2000]
+"""
+
+import argparse
+import contextlib
+import io
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from catalog import get_catalog
+from metrics import REGISTRY
+from planner import build_courses_left, build_plan_model, build_selected_courses, filter_courses_by_offering
+from solver import record_solve, solve_plan, solve_stats
+from what_if import student_for_department
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Solver metrics overhead")
+    parser.add_argument("--department", default="EE1")
+    parser.add_argument("--repeat", type=int, default=2000)
+    args = parser.parse_args()
+
+    catalog = get_catalog()
+    department = catalog.get_department(args.department)
+    with contextlib.redirect_stdout(io.StringIO()):
+        selected = build_selected_courses(department, catalog.courses, catalog.offerings)
+        user = student_for_department([], department, selected, 1)
+        courses_left = filter_courses_by_offering(build_courses_left(selected, user), catalog.offerings)
+        planner, _ = build_plan_model(user, department, courses_left)
+
+    start = time.perf_counter()
+    solver, status = solve_plan(planner, 10.0)
+    solve_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        record_solve(solve_stats(planner, solver, status))
+    per_solve = (time.perf_counter() - start) / args.repeat
+
+    stats = solve_stats(planner, solver, status)
+    for dept_code in catalog.departments:
+        record_solve({**stats, "department": dept_code})
+    start = time.perf_counter()
+    for _ in range(100):
+        text = REGISTRY.render()
+    render = (time.perf_counter() - start) / 100
+
+    print(f"{args.department}: {stats['variables']} variables, {stats['constraints']} constraints, "
+          f"{stats['presolve_removed']} removed by presolve, {stats['branches']} branches, "
+          f"{stats['conflicts']} conflicts ({stats['status']})")
+    print(f"solve:                 {solve_seconds * 1000:8.2f} ms")
+    print(f"metrics per solve:     {per_solve * 1e6:8.1f} us  ({per_solve / solve_seconds:.3%} of the solve)")
+    print(f"/metrics render:       {render * 1000:8.2f} ms  ({len(catalog.departments)} departments, "
+          f"{len(text.splitlines())} lines)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Enrollment page parsing throughput.
+
+Compares, on large synthetic enrollment pages:
+  - the BeautifulSoup pattern chain (previous in-loop parser)
+  - the lxml fast path, single process
+  - the lxml fast path spread over the scraper's parse worker pool
+and then runs an end-to-end scrape against the local LDAP stub.
+
+Usage:
+    python benchmarks/bench_parsing.py --pages 200 --students 800
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.ldap_stub import create_app, start_stub, render_course_page
+from utils.scrape_ldap import (
+    CourseScraper, PARSE_WORKERS, parse_students, _parse_students_soup
+)
+
+
+def parse_with_soup(html: bytes):
+    return _parse_students_soup(BeautifulSoup(html, 'lxml'))
+
+
+def timed(label: str, num_pages: int, fn):
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<34} {num_pages / elapsed:8.1f} pages/s")
+
+
+def bench_parsers(num_pages: int, num_students: int):
+    pages = [render_course_page(f"2501-ELL{i:03d}", num_students).encode() for i in range(num_pages)]
+    print(f"Parsing {num_pages} pages x {num_students} students "
+          f"({sum(map(len, pages)) / num_pages / 1024:.0f} KiB/page)")
+
+    timed("BeautifulSoup (single process)", num_pages, lambda: [parse_with_soup(p) for p in pages])
+    timed("lxml fast path (single process)", num_pages, lambda: [parse_students(p) for p in pages])
+    with ProcessPoolExecutor(max_workers=PARSE_WORKERS) as pool:
+        list(pool.map(parse_students, pages[:PARSE_WORKERS]))  # warm up workers
+        timed(f"lxml fast path ({PARSE_WORKERS} workers)", num_pages,
+              lambda: list(pool.map(parse_students, pages, chunksize=4)))
+
+
+async def bench_scrape(num_pages: int, num_students: int):
+    runner, base_url = await start_stub(create_app(num_pages, num_students))
+    try:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            scraper = CourseScraper(str(Path(tmpdir) / "parse.db"), base_url=base_url)
+            start = time.perf_counter()
+            await scraper.scrape_all()
+            elapsed = time.perf_counter() - start
+    finally:
+        await runner.cleanup()
+    print(f"End-to-end scrape: {num_pages / elapsed:.1f} pages/s "
+          f"({scraper.writer.rows_written / elapsed:.0f} rows/s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Enrollment page parsing throughput")
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--students", type=int, default=800)
+    args = parser.parse_args()
+
+    logging.getLogger("utils.scrape_ldap").setLevel(logging.WARNING)
+    bench_parsers(args.pages, args.students)
+    asyncio.run(bench_scrape(args.pages, args.students))
+
+
+if __name__ == "__main__":
+    main()
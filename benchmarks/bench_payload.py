@@ -0,0 +1,66 @@
+"""
+Payload size and serialization time of department views, per department.
+
+  before - expanded view, every course field, stdlib json.dumps
+  after  - ?fields=code,name,credits,type&compact=true, encoded with orjson
+           (when installed), plus its gzip/brotli sizes
+
+Usage:
+    python benchmarks/bench_payload.py --repeat 50
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from catalog import get_catalog
+from department_views import compact_view, encode_json, parse_fields, project
+from planner import build_selected_courses
+
+AFTER_FIELDS = parse_fields("code,name,credits,type")
+
+
+def timed(func, repeat: int) -> tuple[bytes, float]:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        body = func()
+    return body, (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Department view payload size and encode time")
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    catalog = get_catalog()
+    print(f"{'dept':6} {'before':>9} {'ms':>6} | {'after':>8} {'ms':>6} {'gzip':>7} {'br':>7} | {'ratio':>6}")
+    totals = [0, 0, 0]
+    for dept_code in sorted(catalog.departments):
+        full = build_selected_courses(catalog.get_department(dept_code), catalog.courses,
+                                      catalog.offerings, expand=True)
+        full = {sem: [dict(course) for course in courses] for sem, courses in full.items()}
+        projected = compact_view({
+            sem: [project(course, AFTER_FIELDS) for course in courses] for sem, courses in full.items()
+        })
+
+        before, before_ms = timed(lambda: json.dumps(full).encode(), args.repeat)
+        after, after_ms = timed(lambda: encode_json(projected), args.repeat)
+        view = catalog.get_view(dept_code, True, AFTER_FIELDS, True)
+
+        gz = len(view.encoded.get("gzip", view.body))
+        br = len(view.encoded["br"]) if "br" in view.encoded else None
+        totals[0] += len(before)
+        totals[1] += len(after)
+        totals[2] += gz
+        print(f"{dept_code:6} {len(before):9d} {before_ms:6.2f} | {len(after):8d} {after_ms:6.2f} "
+              f"{gz:7d} {br if br is not None else '-':>7} | {len(before) / gz:5.0f}x")
+
+    print(f"total  {totals[0]:9d}        | {totals[1]:8d}        {totals[2]:7d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""
+Plan cache hit rates and latency.
+
+Requests come from cohorts: students of a few departments, on track for
+their semester, some with one course missing. As in real requests the
+completion lists arrive in any order, sometimes with duplicates and with
+courses from outside the programme.
+
+  hit rates  - over the request stream, keying on the raw request, on its
+               sorted and deduplicated completions, and on canonical_state
+  latency    - compare_departments for one department per request through a
+               fresh cache file: misses, hits, and hits after a "restart"
+               (a new PlanCache on the same file)
+
+Usage:
+    python benchmarks/bench_plan_cache.py [--requests 200] [--solve 60]
+"""
+
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+import plan_cache
+from catalog import get_catalog
+from plan_cache import PlanCache, canonical_state, relevant_codes
+from planner import build_selected_courses
+from user import UserData
+from what_if import compare_departments
+
+DEPARTMENTS = ["EE1", "CS1", "ME1", "MT1"]
+MISSING_RATE = 0.3   # students with one recommended core not yet done
+NOISE_RATE = 0.5     # requests with extra out-of-programme courses
+
+
+def cohort_requests(count: int, seed: int) -> list[dict]:
+    """[{"dept", "completed", "semester"}] with the noise described above."""
+    rng = random.Random(seed)
+    catalog = get_catalog()
+    all_codes = sorted(catalog.courses)
+    selected = {}
+    requests = []
+    for _ in range(count):
+        dept_code = rng.choice(DEPARTMENTS)
+        if dept_code not in selected:
+            with contextlib.redirect_stdout(io.StringIO()):
+                selected[dept_code] = build_selected_courses(
+                    catalog.get_department(dept_code), catalog.courses, catalog.offerings
+                )
+        semester = rng.randint(2, 7)
+        completed = UserData(dept=dept_code, current_semester=semester,
+                             core_courses=selected[dept_code]).completed_corecourses
+        if completed and rng.random() < MISSING_RATE:
+            completed.remove(rng.choice(completed))
+        if rng.random() < NOISE_RATE:
+            relevant = relevant_codes(selected[dept_code])
+            completed += [code for code in rng.sample(all_codes, 3) if code not in relevant]
+        if completed and rng.random() < 0.2:
+            completed.append(rng.choice(completed))
+        rng.shuffle(completed)
+        requests.append({"dept": dept_code, "completed": completed, "semester": semester,
+                         "selected": selected[dept_code]})
+    return requests
+
+
+def hit_rate(keys: list[str]) -> float:
+    seen, hits = set(), 0
+    for key in keys:
+        hits += key in seen
+        seen.add(key)
+    return hits / len(keys)
+
+
+def digest(value) -> str:
+    return hashlib.sha256(json.dumps(value, sort_keys=True).encode()).hexdigest()
+
+
+def timed_run(requests: list[dict]) -> list[tuple[bool, float]]:
+    samples = []
+    for request in requests:
+        start = time.perf_counter()
+        [result] = compare_departments(request["completed"], request["semester"], [request["dept"]])
+        samples.append((result["cached"], time.perf_counter() - start))
+    return samples
+
+
+def median_ms(values: list[float]) -> float:
+    values = sorted(values)
+    return values[len(values) // 2] * 1000 if values else float("nan")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Plan cache hit rates and latency")
+    parser.add_argument("--requests", type=int, default=200, help="Requests for the hit-rate comparison")
+    parser.add_argument("--solve", type=int, default=60, help="Requests actually planned for the latency run")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    requests = cohort_requests(args.requests, args.seed)
+    raw = [digest([r["dept"], r["semester"], r["completed"]]) for r in requests]
+    normalized = [digest([r["dept"], r["semester"], sorted(set(r["completed"]))]) for r in requests]
+    canonical = [
+        digest(canonical_state(UserData(dept=r["dept"], current_semester=r["semester"],
+                                        completed_corecourses=r["completed"]),
+                               relevant_codes(r["selected"])))
+        for r in requests
+    ]
+    print(f"{len(requests)} requests, {len(set(canonical))} distinct canonical states")
+    print(f"hit rate, raw request key:       {hit_rate(raw):6.1%}")
+    print(f"hit rate, sorted + deduplicated: {hit_rate(normalized):6.1%}")
+    print(f"hit rate, canonical_state:       {hit_rate(canonical):6.1%}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_file = Path(tmp) / "plans.sqlite"
+        plan_cache._cache = PlanCache(cache_file)
+        plan_cache._cache_pid = plan_cache.os.getpid()
+
+        samples = timed_run(requests[:args.solve])
+        misses = [seconds for cached, seconds in samples if not cached]
+        hits = [seconds for cached, seconds in samples if cached]
+        stats = plan_cache._cache.stats()
+        print(f"\nfirst pass over {len(samples)} requests: hit rate {stats['hit_rate']:.1%}, "
+              f"{stats['entries']} plans, {stats['bytes'] / 1024:.1f} KiB")
+        print(f"  miss (plan + store) median {median_ms(misses):8.2f} ms")
+        print(f"  hit                 median {median_ms(hits):8.2f} ms")
+
+        plan_cache._cache.close()
+        plan_cache._cache = PlanCache(cache_file)
+        samples = timed_run(requests[:args.solve])
+        print(f"after restart: hit rate {plan_cache._cache.stats()['hit_rate']:.1%}, "
+              f"hit median {median_ms([s for _, s in samples]):.2f} ms")
+        plan_cache._cache.close()
+        plan_cache._cache = None
+
+
+if __name__ == "__main__":
+    main()
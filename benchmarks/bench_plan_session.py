@@ -0,0 +1,122 @@
+"""
+Bytes and re-rendered rows per interaction: plan session diffs against
+full refetches.
+
+For a student of each department, opens a /ws/plan session (in-process,
+Starlette's TestClient), then replays the interactions of a planning
+session: in every planned semester swap one elective for another candidate
+of the same type (a re-plan of that semester and the next, as in
+bench_replan), then mark the first planned semester completed and move on.
+Per interaction it compares
+
+  diff      the session's diff message
+  snapshot  the whole plan with its course details (a resync message)
+  refetch   the /selected-courses/{dept}?compact=true body the frontend
+            fetches today
+
+(all uncompressed), and the semester rows a diff touches against all rows of the old and
+new plan. Every diff is applied to the previous plan and checked against the
+snapshot.
+
+Usage:
+    python benchmarks/bench_plan_session.py [--departments EE1,CS1,ME1,MT1] [--semester 4]
+"""
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("CATALOG_WATCH", "0")
+
+from fastapi.testclient import TestClient
+
+from api.main import app
+from benchmarks.bench_replan import swaps
+from catalog import get_catalog
+from planner import build_selected_courses
+from plan_session import apply_diff
+
+
+def exchange(ws, message: dict) -> tuple[dict, int]:
+    """Send a message; the reply and its size in bytes."""
+    ws.send_json(message)
+    text = ws.receive_text()
+    return json.loads(text), len(text.encode())
+
+
+def plan_of(message: dict) -> dict[int, list[str]]:
+    return {int(sem): codes for sem, codes in message["plan"].items()}
+
+
+def same(a: dict, b: dict) -> bool:
+    return {s: sorted(c) for s, c in a.items()} == {s: sorted(c) for s, c in b.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Plan session diffs against full refetches")
+    parser.add_argument("--departments", default="EE1,CS1,ME1,MT1")
+    parser.add_argument("--semester", type=int, default=4)
+    args = parser.parse_args()
+
+    catalog = get_catalog()
+    totals = {"diff": 0, "snapshot": 0, "refetch": 0, "rows": 0, "all_rows": 0, "interactions": 0}
+    print(f"{'dept':5} {'interaction':22} {'diff B':>7} {'snapshot B':>10} {'refetch B':>9} {'rows':>6}")
+    with TestClient(app) as client:
+        for dept_code in args.departments.split(","):
+            refetch = len(client.get(f"/selected-courses/{dept_code}?compact=true",
+                                     headers={"Accept-Encoding": "identity"}).content)
+            selected = build_selected_courses(catalog.get_department(dept_code), catalog.courses,
+                                              catalog.offerings)
+            with client.websocket_connect("/ws/plan") as ws:
+                snapshot, size = exchange(ws, {"type": "start", "dept": dept_code, "completed": [],
+                                               "current_semester": args.semester})
+                if snapshot["type"] != "snapshot":
+                    print(f"{dept_code:5} no plan to start from ({snapshot.get('status') or snapshot})")
+                    continue
+                plan = plan_of(snapshot)
+                print(f"{dept_code:5} {'start':22} {'-':>7} {size:10} {refetch:9} {len(plan):3}/{len(plan):<2}")
+
+                completed, semester = [], args.semester
+                interactions = [(f"swap {dropped}->{pinned}", {"type": "replan", "pinned": [[sem, pinned]],
+                                                              "window": [sem, sem + 1]})
+                                for sem, dropped, pinned in swaps(plan, selected)]
+                interactions.append(("complete a semester", None))
+                for name, message in interactions:
+                    if message is None:
+                        completed += plan[min(plan)]
+                        semester += 1
+                        message = {"type": "update", "completed": completed, "current_semester": semester}
+                    diff, diff_size = exchange(ws, message)
+                    if diff["type"] != "diff":
+                        print(f"{dept_code:5} {name:22} {diff['type']}: {diff.get('status') or diff['detail']}")
+                        continue
+                    semesters = set(plan)
+                    plan = apply_diff(plan, diff)
+                    semesters |= set(plan)
+                    snapshot, snapshot_size = exchange(ws, {"type": "resync"})
+                    assert same(plan, plan_of(snapshot)), (dept_code, name)
+                    rows = {int(s) for s in diff["add"]} | {int(s) for s in diff["remove"]} \
+                        | {s for _, a, b in diff["move"] for s in (a, b)}
+                    print(f"{dept_code:5} {name:22} {diff_size:7} {snapshot_size:10} {refetch:9} "
+                          f"{len(rows):3}/{len(semesters):<2}")
+                    totals["diff"] += diff_size
+                    totals["snapshot"] += snapshot_size
+                    totals["refetch"] += refetch
+                    totals["rows"] += len(rows)
+                    totals["all_rows"] += len(semesters)
+                    totals["interactions"] += 1
+
+    n = totals["interactions"]
+    if n:
+        print(f"\n{n} interactions, mean bytes: diff {totals['diff'] / n:.0f}, "
+              f"snapshot {totals['snapshot'] / n:.0f} ({totals['snapshot'] / totals['diff']:.1f}x), "
+              f"refetch {totals['refetch'] / n:.0f} ({totals['refetch'] / totals['diff']:.1f}x); "
+              f"rows re-rendered {totals['rows']} of {totals['all_rows']} "
+              f"({totals['rows'] / totals['all_rows']:.0%})")
+
+
+if __name__ == "__main__":
+    main()
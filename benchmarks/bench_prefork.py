@@ -0,0 +1,97 @@
+"""
+Per-worker memory of the API: independently loading workers vs pre-forked.
+
+  spawn   - every worker is a fresh interpreter that imports the app and
+            warms its own catalog (what `uvicorn --workers N` does)
+  prefork - the parent warms the catalog once, then forks the workers
+            (what `gunicorn -c gunicorn.conf.py api.main:app` does)
+
+Each worker then serves a few department views. RSS, PSS (shared pages split
+between the processes sharing them) and USS (private pages) are read from
+/proc/<pid>/smaps_rollup, so this is Linux-only.
+
+Usage:
+    python benchmarks/bench_prefork.py --workers 4
+"""
+
+import argparse
+import multiprocessing as mp
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.append(str(ROOT))
+
+
+def memory_kib(pid: int) -> dict:
+    fields = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[1].isdigit():
+                fields[parts[0].rstrip(":")] = int(parts[1])
+    return {
+        "rss": fields["Rss"],
+        "pss": fields["Pss"],
+        "uss": fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0),
+    }
+
+
+def worker(ready, stop, warm: bool):
+    sys.path.append(str(ROOT))
+    import api.main  # noqa: F401  (the import cost is part of a worker's footprint)
+    from catalog import get_catalog, warm_catalog
+
+    if warm:
+        warm_catalog()
+    catalog = get_catalog()
+    for dept_code in ("EE1", "CS1", "ME1"):
+        catalog.get_view(dept_code, False)
+    ready.set()
+    stop.wait()
+
+
+def measure(context_name: str, num_workers: int) -> list[dict]:
+    ctx = mp.get_context(context_name)
+    stop = ctx.Event()
+    readies, procs = [], []
+    for _ in range(num_workers):
+        ready = ctx.Event()
+        proc = ctx.Process(target=worker, args=(ready, stop, context_name == "spawn"))
+        proc.start()
+        readies.append(ready)
+        procs.append(proc)
+    for ready in readies:
+        ready.wait()
+    stats = [memory_kib(proc.pid) for proc in procs]
+    stop.set()
+    for proc in procs:
+        proc.join()
+    return stats
+
+
+def report(label: str, stats: list[dict]):
+    n = len(stats)
+    avg = {key: sum(s[key] for s in stats) / n / 1024 for key in ("rss", "pss", "uss")}
+    print(f"{label:<8} per worker: RSS {avg['rss']:6.1f} MiB  PSS {avg['pss']:6.1f} MiB  "
+          f"USS {avg['uss']:6.1f} MiB   total PSS for {n} workers: {avg['pss'] * n:6.1f} MiB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API per-worker memory")
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    report("spawn", measure("spawn", args.workers))
+
+    # Pre-fork: warm once in this process, then fork
+    import api.main  # noqa: F401
+    from catalog import warm_catalog
+    warm_catalog()
+    parent = memory_kib(mp.current_process().pid)
+    report("prefork", measure("fork", args.workers))
+    print(f"(prefork parent after warm-up: RSS {parent['rss'] / 1024:.1f} MiB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+"""
+Catalog hot reload: what a reload costs the requests running beside it.
+
+Against the ASGI app in-process (httpx's ASGITransport):
+
+  idle     request latency with no reload going on
+  reload   the same requests while reload_catalog(force=True) rebuilds the
+           catalog in a background thread and swaps it in
+  pinned   a request context that pinned the old snapshot keeps seeing it
+           after the swap; new requests get the new one
+  watcher  time from touching courses.json (mtime only, same content) to
+           CatalogWatcher deciding nothing changed
+
+Usage:
+    python benchmarks/bench_reload.py [--requests 300] [--concurrency 4]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+import httpx
+
+import catalog as catalog_module
+from api.main import app
+from catalog import CatalogWatcher, RELOADS, get_catalog, pin_catalog, reload_catalog, warm_catalog
+from data_loader import DATA_DIR
+
+PATHS = ["/selected-courses/EE1?compact=true", "/check-semester?semester=5&courses=ELL311,ELL305,ELP225",
+         "/courses/search?q=signals"]
+
+
+def percentile(values: list[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))] * 1000
+
+
+async def hammer(client: httpx.AsyncClient, until, concurrency: int) -> tuple[list[float], set[int]]:
+    """Requests from `concurrency` clients while until() is False; latencies and catalog snapshots seen."""
+    latencies, snapshots = [], set()
+
+    async def one_client(offset: int):
+        i = offset
+        while not until(len(latencies)):
+            start = time.perf_counter()
+            response = await client.get(PATHS[i % len(PATHS)])
+            latencies.append(time.perf_counter() - start)
+            assert response.status_code == 200, response.text
+            assert response.headers["x-catalog-version"] == get_catalog().version
+            snapshots.add(id(catalog_module._catalog))
+            i += 1
+
+    await asyncio.gather(*(one_client(n) for n in range(concurrency)))
+    return latencies, snapshots
+
+
+async def run(requests: int, concurrency: int):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        idle, _ = await hammer(client, lambda done: done >= requests, concurrency)
+
+        reloader = threading.Thread(target=reload_catalog, kwargs={"force": True})
+        start = time.perf_counter()
+        reloader.start()
+        during, snapshots = await hammer(client, lambda done: not reloader.is_alive(), concurrency)
+        reloader.join()
+        reload_seconds = time.perf_counter() - start
+
+    print(f"reload (build + swap) in the background: {reload_seconds:.2f}s, "
+          f"{len(during)} requests served meanwhile across {len(snapshots)} snapshots")
+    print(f"{'':8} {'requests':>8} {'p50 ms':>8} {'p99 ms':>8} {'max ms':>8}")
+    for name, values in (("idle", idle), ("reload", during)):
+        print(f"{name:8} {len(values):8} {percentile(values, 0.5):8.2f} {percentile(values, 0.99):8.2f} "
+              f"{max(values) * 1000:8.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Catalog hot reload under load")
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=4)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    warm_catalog()
+    print(f"initial load: {time.perf_counter() - start:.2f}s")
+    asyncio.run(run(args.requests, args.concurrency))
+
+    with pin_catalog() as pinned:
+        reload_catalog(force=True)
+        kept = get_catalog() is pinned
+    print(f"pinned:  old snapshot kept across a swap: {kept}; "
+          f"outside the pin a new one is served: {get_catalog() is not pinned}")
+
+    watcher = CatalogWatcher(interval=0.2).start()
+    courses_file = DATA_DIR / "courses.json"
+    stat = courses_file.stat()
+    unchanged = RELOADS.value("unchanged")
+    try:
+        start = time.perf_counter()
+        os.utime(courses_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        while RELOADS.value("unchanged") == unchanged and time.perf_counter() - start < 10:
+            time.sleep(0.01)
+        print(f"watcher: touch noticed and found unchanged after {time.perf_counter() - start:.2f}s "
+              f"(poll interval {watcher.interval}s, plus one interval to settle)")
+    finally:
+        os.utime(courses_file, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+        watcher.stop()
+
+
+if __name__ == "__main__":
+    main()
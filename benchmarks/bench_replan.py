@@ -0,0 +1,99 @@
+"""
+Window re-plans against unrestricted re-solves.
+
+For a student of each department, plans from scratch, then in every planned
+semester swaps one elective for another candidate of the same type and
+pins it. Each swap is re-planned twice with the same pins: with only that
+semester (and the next) free, and with the whole horizon free.
+
+Usage:
+    python benchmarks/bench_replan.py [--departments EE1,CS1,ME1,MT1] [--semester 4]
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from catalog import get_catalog
+from planner import (
+    CONFIG, build_courses_left, build_selected_courses, degree_length, filter_courses_by_offering,
+    plan_degree,
+)
+from replan import replan
+from user import UserData
+
+
+def swaps(plan: dict, courses_left: dict) -> list[tuple[int, str, str]]:
+    """(semester, elective dropped, elective pinned instead), one per semester with an elective."""
+    types = {}
+    for courses in courses_left.values():
+        for course in courses:
+            types.setdefault(course["code"], course.get("type"))
+    planned = {code for codes in plan.values() for code in codes}
+    result = []
+    for sem, codes in plan.items():
+        for code in codes:
+            if types.get(code) == "Core":
+                continue
+            others = sorted(c for c, t in types.items() if t == types[code] and c not in planned)
+            if others:
+                result.append((sem, code, others[sem % len(others)]))
+                break
+    return result
+
+
+def timed(user, department, selected, offerings, plan, pinned, window) -> tuple[dict, float]:
+    start = time.perf_counter()
+    result = replan(user, department, selected, offerings, plan, pinned, window, num_workers=1)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Window re-plan speedup")
+    parser.add_argument("--departments", default="EE1,CS1,ME1,MT1")
+    parser.add_argument("--semester", type=int, default=4)
+    args = parser.parse_args()
+
+    catalog = get_catalog()
+    print(f"{'dept':5} {'sem':>3} {'window':>7} {'widen':>5} {'free':>5} {'all':>5} "
+          f"{'window ms':>10} {'full ms':>9} {'speedup':>8}  status")
+    speedups, solve_speedups = [], []
+    for dept_code in args.departments.split(","):
+        department = catalog.get_department(dept_code)
+        selected = build_selected_courses(department, catalog.courses, catalog.offerings)
+        user = UserData(dept=dept_code, current_semester=args.semester, core_courses=selected)
+        base = plan_degree(user, department, selected, catalog.offerings, num_workers=1, shortest=True)
+        if not base["feasible"]:
+            print(f"{dept_code:5} no plan to start from ({base['status']})")
+            continue
+        last = degree_length(department, user) + CONFIG["EXTRA_SEMESTERS"]
+        # Only courses replan() has as candidates can be pinned
+        courses_left = filter_courses_by_offering(
+            build_courses_left(selected, user, degree_length(department, user)), catalog.offerings
+        )
+        for sem, dropped, pinned in swaps(base["plan"], courses_left):
+            plan = {s: [c for c in codes if c != dropped] for s, codes in base["plan"].items()}
+            pins = [(sem, pinned)]
+            local, local_seconds = timed(user, department, selected, catalog.offerings,
+                                         plan, pins, (sem, sem + 1))
+            full, full_seconds = timed(user, department, selected, catalog.offerings,
+                                       plan, pins, (args.semester, last))
+            speedups.append(full_seconds / local_seconds)
+            if local["solve_seconds"]:
+                solve_speedups.append(full["solve_seconds"] / local["solve_seconds"])
+            window = "-".join(map(str, local["window"])) if local["window"] else "-"
+            print(f"{dept_code:5} {sem:3} {window:>7} {local['widenings']:5} {local['free_variables']:5} "
+                  f"{full['free_variables']:5} {local_seconds * 1000:10.1f} {full_seconds * 1000:9.1f} "
+                  f"{full_seconds / local_seconds:7.1f}x  {local['status']}/{full['status']}")
+
+    if speedups:
+        print(f"\n{len(speedups)} swaps: median speedup {statistics.median(speedups):.1f}x end to end "
+              f"(model build + solve), {statistics.median(solve_speedups):.1f}x in the solver")
+
+
+if __name__ == "__main__":
+    main()
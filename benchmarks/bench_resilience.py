@@ -0,0 +1,72 @@
+"""
+Scraper behaviour under injected latency and failures.
+
+Each scenario scrapes a fresh database from the local LDAP stub, once with
+retries disabled and once with the default retry policy, and reports
+completed/failed courses, retries, the final adaptive concurrency limit and
+the peak concurrency the server saw.
+
+Usage:
+    python benchmarks/bench_resilience.py --courses 300
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.ldap_stub import create_app, start_stub
+from utils.scrape_ldap import CourseScraper, MAX_RETRIES
+
+SCENARIOS = {
+    "healthy, 20ms": {"latency": 0.02},
+    "10% 503s, 2% hangs": {"latency": 0.02, "failure_rate": 0.10, "hang_rate": 0.02, "hang_seconds": 3.0},
+    "overloaded past 8 in flight": {"latency": 0.02, "capacity": 8},
+}
+
+
+async def run(num_courses: int, num_students: int, fault_config: dict, max_retries: int, tmpdir: str):
+    app = create_app(num_courses, num_students)
+    app["config"].update(fault_config)
+    runner, base_url = await start_stub(app)
+    try:
+        db_name = str(Path(tmpdir) / f"resilience-{time.monotonic_ns()}.db")
+        scraper = CourseScraper(db_name, base_url=base_url, max_retries=max_retries, request_timeout=1.0)
+        start = time.perf_counter()
+        await scraper.scrape_all()
+        elapsed = time.perf_counter() - start
+    finally:
+        await runner.cleanup()
+
+    stats = scraper.stats
+    completed = stats['changed'] + stats['unchanged'] + stats['not_modified']
+    print(f"    retries<={max_retries}: {elapsed:6.2f}s  completed={completed:<4} failed={stats['failed']:<3} "
+          f"retries={stats['retries']:<4} final limit={scraper.limiter.limit:5.1f} "
+          f"decreases={scraper.limiter.decreases:<3} server peak in-flight={app['stats']['peak_in_flight']}")
+
+
+async def main_async(num_courses: int, num_students: int):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for name, fault_config in SCENARIOS.items():
+            print(f"{name}:")
+            await run(num_courses, num_students, fault_config, 0, tmpdir)
+            await run(num_courses, num_students, fault_config, MAX_RETRIES, tmpdir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scraper resilience scenarios")
+    parser.add_argument("--courses", type=int, default=300)
+    parser.add_argument("--students", type=int, default=40)
+    args = parser.parse_args()
+
+    logging.getLogger("utils.scrape_ldap").setLevel(logging.CRITICAL)
+    asyncio.run(main_async(args.courses, args.students))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Solver scheduler under synthetic load.
+
+Jobs are threads that hold a slot for a random "solve" (lognormal work,
+cut short at the granted time limit, as CP-SAT would be), so the scheduler
+is exercised at real concurrency without the solver's CPU cost.
+
+  mixed     a cohort of bulk jobs arrives at once, while interactive
+            requests keep arriving at a steady rate; run with the default
+            priority classes and with a single FIFO class for comparison
+  overload  interactive requests alone, arriving faster than the slots can
+            serve them: the bounded queue turns the excess away with a
+            retry-after instead of letting waits grow
+
+Usage:
+    python benchmarks/bench_scheduler.py [--capacity 4] [--bulk 400] [--rate 10] [--seconds 8]
+"""
+
+import argparse
+import random
+import sys
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from scheduler import Overloaded, PriorityClass, SolverScheduler, default_classes
+
+WORK_MEDIAN = 0.1   # seconds of solver work per job (lognormal)
+WORK_SIGMA = 1.0
+TIME_LIMITS = {"interactive": 2.0, "bulk": 5.0}  # what the callers ask for
+
+
+def percentile(values: list[float], q: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))] * 1000 if values else float("nan")
+
+
+def run(scheduler: SolverScheduler, arrivals: list[tuple[float, str]], seed: int) -> dict:
+    """Start a job per (offset seconds, priority) and collect waits, budget cuts and rejections."""
+    rng = random.Random(seed)
+    works = [rng.lognormvariate(0, WORK_SIGMA) * WORK_MEDIAN for _ in arrivals]
+    waits, truncated, rejected, retry_after = defaultdict(list), defaultdict(int), defaultdict(int), []
+    lock = threading.Lock()
+
+    def job(priority: str, work: float):
+        arrived = time.monotonic()
+        try:
+            ticket = scheduler.acquire(scheduler_class(priority), TIME_LIMITS[priority])
+        except Overloaded as e:
+            with lock:
+                rejected[priority] += 1
+                retry_after.append(e.retry_after)
+            return
+        try:
+            time.sleep(min(work, ticket.time_limit))
+        finally:
+            scheduler.release(ticket)
+        with lock:
+            waits[priority].append(ticket.granted - arrived)
+            truncated[priority] += work > ticket.time_limit
+
+    def scheduler_class(priority: str) -> str:
+        return priority if priority in scheduler.classes else "all"
+
+    start = time.monotonic()
+    threads = []
+    for (offset, priority), work in zip(arrivals, works):
+        delay = start + offset - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        thread = threading.Thread(target=job, args=(priority, work))
+        thread.start()
+        threads.append(thread)
+    for thread in threads:
+        thread.join()
+    return {"waits": waits, "truncated": truncated, "rejected": rejected, "retry_after": retry_after,
+            "seconds": time.monotonic() - start}
+
+
+def report(name: str, result: dict, arrivals: list[tuple[float, str]]):
+    print(f"\n{name} ({result['seconds']:.1f}s)")
+    print(f"  {'class':12} {'jobs':>5} {'done':>5} {'rejected':>8} {'wait p50':>9} {'wait p99':>9} {'cut short':>9}")
+    for priority in ("interactive", "bulk"):
+        jobs = sum(1 for _, p in arrivals if p == priority)
+        if not jobs:
+            continue
+        waits = result["waits"][priority]
+        print(f"  {priority:12} {jobs:5} {len(waits):5} {result['rejected'][priority]:8} "
+              f"{percentile(waits, 0.5):7.0f}ms {percentile(waits, 0.99):7.0f}ms "
+              f"{result['truncated'][priority] / max(len(waits), 1):9.1%}")
+    if result["retry_after"]:
+        values = sorted(result["retry_after"])
+        print(f"  retry-after: {values[0]}-{values[-1]}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Solver scheduler under synthetic load")
+    parser.add_argument("--capacity", type=int, default=4, help="Solver slots")
+    parser.add_argument("--bulk", type=int, default=400, help="Bulk jobs arriving at the start")
+    parser.add_argument("--rate", type=float, default=10, help="Interactive requests per second")
+    parser.add_argument("--seconds", type=float, default=8, help="How long interactive requests arrive")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    interactive, t = [], 0.0
+    while True:
+        t += rng.expovariate(args.rate)
+        if t >= args.seconds:
+            break
+        interactive.append((t, "interactive"))
+    mixed = sorted([(i * 0.001, "bulk") for i in range(args.bulk)] + interactive)
+
+    fifo = SolverScheduler(args.capacity, {"all": PriorityClass(
+        "all", 0, args.capacity, max_queue=10 ** 6, max_wait=10 ** 6, min_budget=1.0, time_limit=10.0,
+    )})
+    report("mixed, single FIFO class", run(fifo, mixed, args.seed), mixed)
+    report("mixed, priority classes", run(SolverScheduler(args.capacity), mixed, args.seed), mixed)
+
+    # Arrivals at three times what the slots serve at the median work
+    overload_rate = 3 * args.capacity / WORK_MEDIAN
+    flood, t = [], 0.0
+    while t < args.seconds / 2:
+        t += rng.expovariate(overload_rate)
+        flood.append((t, "interactive"))
+    classes = default_classes(args.capacity)
+    print(f"\n(interactive queue bound {classes['interactive'].max_queue}, "
+          f"{overload_rate:.0f} requests/s for {args.seconds / 2:.0f}s)")
+    report("overload, priority classes", run(SolverScheduler(args.capacity), flood, args.seed), flood)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Scraper write-path benchmark against the local LDAP stub.
+
+Measures:
+  - end-to-end scrape throughput (student rows/sec) through CourseScraper
+  - raw DB write throughput: one connection + per-row execute per course
+    (the old save_course path) vs the batched single DatabaseWriter
+
+Usage:
+    python benchmarks/bench_scraper.py --courses 400 --students 150
+"""
+
+import argparse
+import asyncio
+import logging
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.bench_enrollments import create_legacy_tables
+from benchmarks.ldap_stub import create_app, start_stub
+from utils.scrape_ldap import CourseScraper, DatabaseWriter
+
+
+def legacy_save_course(db_name: str, course: dict, students: list[dict]):
+    """The pre-batching write path (old table layout): fresh connection, one execute per row"""
+    conn = sqlite3.connect(db_name)
+    cursor = conn.cursor()
+    cursor.execute(
+        'INSERT OR REPLACE INTO courses (course_id, course_name, course_url, scraped_at) VALUES (?, ?, ?, ?)',
+        (course['course_id'], course['course_name'], course['course_url'], datetime.now())
+    )
+    cursor.execute('DELETE FROM students WHERE course_id = ?', (course['course_id'],))
+    for student in students:
+        cursor.execute(
+            'INSERT INTO students (course_id, student_name, student_id, entry_number, email, department) '
+            'VALUES (?, ?, ?, ?, ?, ?)',
+            (course['course_id'], student.get('student_name'), student.get('student_id'),
+             student.get('entry_number'), student.get('email'), student.get('department'))
+        )
+    conn.commit()
+    conn.close()
+
+
+def synthetic_batch(num_courses: int, num_students: int) -> list[tuple[dict, list[dict]]]:
+    batch = []
+    for i in range(num_courses):
+        course = {'course_id': f'2501-XXL{i:03d}', 'course_name': f'Course {i}', 'course_url': ''}
+        students = [
+            {'student_name': f'S{j}', 'entry_number': f'2023EE{j:05d}', 'student_id': f'ee{j}',
+             'email': f'ee{j}@iitd.ac.in', 'department': 'EE1'}
+            for j in range(num_students)
+        ]
+        batch.append((course, students))
+    return batch
+
+
+def bench_db_writes(num_courses: int, num_students: int, tmpdir: str):
+    batch = synthetic_batch(num_courses, num_students)
+    rows = num_courses * num_students
+
+    legacy_db = str(Path(tmpdir) / "legacy.db")
+    create_legacy_tables(sqlite3.connect(legacy_db))
+    start = time.perf_counter()
+    for course, students in batch:
+        legacy_save_course(legacy_db, course, students)
+    legacy = time.perf_counter() - start
+
+    writer_db = str(Path(tmpdir) / "writer.db")
+    CourseScraper(writer_db)
+    writer = DatabaseWriter(writer_db)
+    writer.start()
+    start = time.perf_counter()
+    for item in batch:
+        writer.queue.put((*item, None))
+    writer.close()
+    batched = time.perf_counter() - start
+
+    print(f"DB writes ({num_courses} courses x {num_students} students = {rows} rows)")
+    print(f"  per-course connection + execute: {rows / legacy:>10.0f} rows/s ({legacy:.2f}s)")
+    print(f"  single writer + executemany:     {rows / batched:>10.0f} rows/s "
+          f"({batched:.2f}s, {writer.transactions} transactions)")
+
+
+async def bench_scrape(num_courses: int, num_students: int, tmpdir: str):
+    runner, base_url = await start_stub(create_app(num_courses, num_students))
+    try:
+        db_name = str(Path(tmpdir) / "scrape.db")
+        scraper = CourseScraper(db_name, base_url=base_url)
+        start = time.perf_counter()
+        await scraper.scrape_all()
+        elapsed = time.perf_counter() - start
+    finally:
+        await runner.cleanup()
+
+    rows = scraper.writer.rows_written
+    print(f"End-to-end scrape against stub ({num_courses} courses)")
+    print(f"  {rows} rows in {elapsed:.2f}s -> {rows / elapsed:.0f} rows/s, "
+          f"{num_courses / elapsed:.0f} pages/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scraper write-path benchmark")
+    parser.add_argument("--courses", type=int, default=400)
+    parser.add_argument("--students", type=int, default=150)
+    args = parser.parse_args()
+
+    logging.getLogger("utils.scrape_ldap").setLevel(logging.WARNING)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        bench_db_writes(args.courses, args.students, tmpdir)
+        asyncio.run(bench_scrape(args.courses, args.students, tmpdir))
+
+
+if __name__ == "__main__":
+    main()
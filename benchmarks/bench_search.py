@@ -0,0 +1,67 @@
+"""
+Latency of course search: linear scan of courses.json vs the BM25 index.
+
+  scan  - substring match of every query term over name + description
+          (what the client did before /courses/search existed)
+  index - SearchIndex.search, with and without filters
+
+Usage:
+    python benchmarks/bench_search.py --rounds 200
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from course_search import load_search_index
+from data_loader import load_courses
+
+QUERIES = [
+    "stochastic", "machine learning", "power electronics", "signal processing",
+    "thermodynamics", "optimization", "control systems", "fluid mechanics",
+    "quantum", "data structures algorithms", "finance", "polymer materials",
+]
+FILTERS = [{}, {"dept": "ELL"}, {"level": 7}, {"credits": 3}]
+
+
+def percentiles(samples: list[float]) -> str:
+    p50, p99 = np.percentile(np.array(samples) * 1e6, [50, 99])
+    return f"p50 {p50:8.1f} us   p99 {p99:8.1f} us"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Course search latency")
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    courses = load_courses()
+    start = time.perf_counter()
+    index = load_search_index()
+    print(f"index load: {(time.perf_counter() - start) * 1000:.1f} ms "
+          f"({len(index)} courses, {len(index.postings)} terms)")
+
+    scan, indexed = [], []
+    for _ in range(args.rounds):
+        for n, query in enumerate(QUERIES):
+            terms = query.lower().split()
+            start = time.perf_counter()
+            [code for code, course in courses.items()
+             if all(term in (course.get("name", "") + " " + (course.get("description") or "")).lower()
+                    for term in terms)]
+            scan.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            index.search(query, **FILTERS[n % len(FILTERS)])
+            indexed.append(time.perf_counter() - start)
+
+    print(f"scan:  {percentiles(scan)}")
+    print(f"index: {percentiles(indexed)}")
+
+
+if __name__ == "__main__":
+    main()
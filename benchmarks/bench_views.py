@@ -0,0 +1,60 @@
+"""
+Throughput of /selected-courses/{dept_code}: uncached vs cached vs 304.
+
+Drives the ASGI app in-process with FastAPI's TestClient.
+  uncached - a runtime variant (?compact=true) re-rendered for every
+             request, its LRU cleared before each one (what every request
+             cost before views were precomputed)
+  cached   - precomputed view, full 200 body
+  304      - client revalidates with If-None-Match
+
+Usage:
+    python benchmarks/bench_views.py --requests 300
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from fastapi.testclient import TestClient
+
+from api.main import app
+from catalog import get_catalog
+
+DEPARTMENTS = ["EE1", "CS1", "ME1", "MT1"]
+
+
+def run(client: TestClient, num_requests: int, before=None, headers=None, query: str = "") -> float:
+    start = time.perf_counter()
+    for i in range(num_requests):
+        if before:
+            before()
+        dept = DEPARTMENTS[i % len(DEPARTMENTS)]
+        response = client.get(f"/selected-courses/{dept}{query}", headers=(headers or {}).get(dept))
+        assert response.status_code in (200, 304)
+    return num_requests / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Department view throughput")
+    parser.add_argument("--requests", type=int, default=300)
+    args = parser.parse_args()
+
+    with TestClient(app) as client:
+        etags = {d: {"If-None-Match": client.get(f"/selected-courses/{d}").headers["etag"]} for d in DEPARTMENTS}
+
+        uncached = run(client, max(20, args.requests // 10),
+                       before=get_catalog().rendered.clear, query="?compact=true")
+        cached = run(client, args.requests)
+        not_modified = run(client, args.requests, headers=etags)
+
+    print(f"uncached: {uncached:8.1f} req/s")
+    print(f"cached:   {cached:8.1f} req/s  ({cached / uncached:.0f}x)")
+    print(f"304:      {not_modified:8.1f} req/s  ({not_modified / uncached:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
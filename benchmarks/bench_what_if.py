@@ -0,0 +1,79 @@
+"""
+Wall-clock time of a cross-department what-if comparison.
+
+  serial - one fresh process per department that loads the catalog and
+           plans that department (running planner.py once per department)
+  pool   - compare_departments: one catalog load per pool worker, departments planned
+           concurrently in the process pool
+
+Usage:
+    python benchmarks/bench_what_if.py [--departments EE1,EE3,CS1]
+"""
+
+import argparse
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from catalog import get_catalog
+from what_if import compare_departments, shutdown_pool
+
+ROOT = Path(__file__).resolve().parent.parent
+COMPLETED = [
+    "ELL101", "PYL101", "MCP100", "MTL100", "COL100", "PYP100", "MCP101", "APL100", "CML101",
+    "MTL101", "CMP100", "ELL205", "ELL203", "ELL201", "COL106", "ELL202", "ELP101",
+]
+SEMESTER = 4
+
+SINGLE_RUN = """
+import sys
+from data_loader import load_courses, load_department
+from planner import build_selected_courses, plan_degree
+from slotting.offerings import load_offering_index
+from what_if import student_for_department
+department = load_department(sys.argv[1])
+offerings = load_offering_index()
+selected = build_selected_courses(department, load_courses(), offerings)
+user = student_for_department(sys.argv[2].split(","), department, selected, int(sys.argv[3]))
+plan_degree(user, department, selected, offerings, time_limit=10.0, shortest=True)
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description="What-if planning: serial runs vs process pool")
+    parser.add_argument("--departments", help="Comma-separated department codes (default: all)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    catalog = get_catalog()
+    catalog_load = time.perf_counter() - start
+    dept_codes = args.departments.split(",") if args.departments else sorted(catalog.departments)
+
+    serial = {}
+    for dept_code in dept_codes:
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "-c", SINGLE_RUN, dept_code, ",".join(COMPLETED), str(SEMESTER)],
+            cwd=ROOT, check=True, stdout=subprocess.DEVNULL,
+        )
+        serial[dept_code] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = compare_departments(COMPLETED, SEMESTER, dept_codes, use_cache=False)
+    pooled = time.perf_counter() - start
+    shutdown_pool()
+
+    for r in results:
+        print(f"{r['dept']:6} {r['status']:10} serial run {serial[r['dept']]:6.2f}s   "
+              f"in pool {r['wall_seconds']:6.2f}s")
+    print(f"\nsum of serial runs: {sum(serial.values()):6.2f}s")
+    print(f"pool, all depts:    {pooled:6.2f}s  ({sum(serial.values()) / pooled:.1f}x)")
+    print(f"  + one catalog load: {catalog_load:6.2f}s  "
+          f"({sum(serial.values()) / (pooled + catalog_load):.1f}x overall)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+Local stand-in for the LDAP course website, used by the scraper benchmarks.
+
+Serves a course listing page and one synthetic enrollment page per course in
+the same table layout the real site uses. Course pages carry ETag and
+Last-Modified validators and answer conditional requests with 304, which can
+be switched off through app["config"]["validators"].
+
+Fault injection (app["config"]): "latency" seconds added per request,
+"failure_rate" fraction answered 503, "hang_rate" fraction that stall for
+"hang_seconds", and "capacity" concurrent requests beyond which latency
+grows linearly and excess requests may get 503s.
+
+Usage:
+    python benchmarks/ldap_stub.py --courses 500 --students 120
+"""
+
+import argparse
+import asyncio
+import hashlib
+import random
+import time
+from email.utils import formatdate
+
+from aiohttp import web
+
+DEPARTMENTS = ["CS", "EE", "ME", "CE", "CH", "MT", "PH", "TT"]
+
+
+def make_course_ids(num_courses: int, seed: int = 0) -> list[str]:
+    """Synthetic course ids in the LDAP format, e.g. 2501-ELL205"""
+    rng = random.Random(seed)
+    prefixes = ["ELL", "COL", "MCL", "MTL", "PYL", "HUL", "CVL", "CLL", "APL", "ELP"]
+    ids = set()
+    while len(ids) < num_courses:
+        term = rng.choice(["2401", "2402", "2501", "2502"])
+        ids.add(f"{term}-{rng.choice(prefixes)}{rng.randint(100, 899)}")
+    return sorted(ids)
+
+
+def render_course_list(course_ids: list[str]) -> str:
+    rows = "\n".join(
+        f'<tr><td><a href="course/{cid}">{cid} Course {cid[-6:]}</a></td></tr>'
+        for cid in course_ids
+    )
+    return f"<html><body><table>\n{rows}\n</table></body></html>"
+
+
+def render_course_page(course_id: str, num_students: int) -> str:
+    rng = random.Random(course_id)
+    rows = []
+    for i in range(num_students):
+        dept = rng.choice(DEPARTMENTS)
+        year = rng.choice([2021, 2022, 2023, 2024])
+        entry = f"{year}{dept}{10000 + rng.randint(0, 9999)}"
+        uid = f"{dept.lower()}{year % 100}{rng.randint(1000, 9999)}"
+        rows.append(
+            f"<tr><td>Student {i}</td><td>{entry}</td><td>{uid}</td>"
+            f"<td>{uid}@iitd.ac.in</td><td>{dept}1</td></tr>"
+        )
+    body = "\n".join(rows)
+    return (
+        "<html><body><table>\n"
+        "<tr><th>Name</th><th>Entry No</th><th>User Id</th><th>Email</th><th>Dept</th></tr>\n"
+        f"{body}\n</table></body></html>"
+    )
+
+
+def set_page(app: web.Application, course_id: str, html: str):
+    """Replace a course page, refreshing its validators"""
+    app["pages"][course_id] = html
+    app["etags"][course_id] = '"' + hashlib.sha1(html.encode()).hexdigest()[:16] + '"'
+    app["modified"][course_id] = formatdate(time.time(), usegmt=True)
+
+
+def create_app(num_courses: int = 200, num_students: int = 100) -> web.Application:
+    """Build the stub application. Page bodies are pre-rendered once."""
+    course_ids = make_course_ids(num_courses)
+    listing = render_course_list(course_ids)
+
+    @web.middleware
+    async def inject_faults(request: web.Request, handler):
+        config, stats = app["config"], app["stats"]
+        stats["in_flight"] += 1
+        stats["peak_in_flight"] = max(stats["peak_in_flight"], stats["in_flight"])
+        try:
+            rng = app["rng"]
+            overload = max(0, stats["in_flight"] - config["capacity"]) if config["capacity"] else 0
+            await asyncio.sleep(config["latency"] * (1 + overload))
+            if rng.random() < config["hang_rate"]:
+                await asyncio.sleep(config["hang_seconds"])
+            if (rng.random() < config["failure_rate"]
+                    or (overload and rng.random() < overload / stats["in_flight"])):
+                stats["503"] += 1
+                return web.Response(status=503, text="injected failure")
+            return await handler(request)
+        finally:
+            stats["in_flight"] -= 1
+
+    app = web.Application(middlewares=[inject_faults])
+    app["course_ids"] = course_ids
+    app["pages"], app["etags"], app["modified"] = {}, {}, {}
+    app["rng"] = random.Random(42)
+    app["config"] = {
+        "validators": True,
+        "latency": 0.0,
+        "failure_rate": 0.0,
+        "hang_rate": 0.0,
+        "hang_seconds": 5.0,
+        "capacity": 0,  # 0 = unlimited
+    }
+    app["stats"] = {"200": 0, "304": 0, "503": 0, "in_flight": 0, "peak_in_flight": 0}
+    for cid in course_ids:
+        set_page(app, cid, render_course_page(cid, num_students))
+
+    async def course_list(request: web.Request) -> web.Response:
+        return web.Response(text=listing, content_type="text/html")
+
+    async def course_page(request: web.Request) -> web.Response:
+        course_id = request.match_info["course_id"]
+        page = app["pages"].get(course_id)
+        if page is None:
+            raise web.HTTPNotFound()
+
+        headers = {}
+        if app["config"]["validators"]:
+            etag, modified = app["etags"][course_id], app["modified"][course_id]
+            headers = {"ETag": etag, "Last-Modified": modified}
+            # If-None-Match takes precedence over If-Modified-Since
+            if_none_match = request.headers.get("If-None-Match")
+            if (if_none_match == etag
+                    or (if_none_match is None
+                        and request.headers.get("If-Modified-Since") == modified)):
+                app["stats"]["304"] += 1
+                return web.Response(status=304, headers=headers)
+
+        app["stats"]["200"] += 1
+        return web.Response(text=page, content_type="text/html", headers=headers)
+
+    app.router.add_get("/", course_list)
+    app.router.add_get("/course/{course_id}", course_page)
+    return app
+
+
+async def start_stub(app: web.Application, port: int = 0) -> tuple[web.AppRunner, str]:
+    """Start the app on localhost and return (runner, base_url)"""
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", port)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}/"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--courses", type=int, default=200)
+    parser.add_argument("--students", type=int, default=100)
+    parser.add_argument("--port", type=int, default=8081)
+    args = parser.parse_args()
+    web.run_app(create_app(args.courses, args.students), host="127.0.0.1", port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,331 @@
+"""
+Process-wide, read-only catalog snapshot for the API.
+
+Holds everything the request path needs — course catalog, department
+structures, offering history, slot index, search index and rendered
+department views — loaded once. Under a pre-forking server (see
+gunicorn.conf.py) the master warms it before forking, so workers share those
+pages copy-on-write instead of each importing pandas/ortools and parsing the
+CSVs themselves.
+
+A CatalogWatcher polls the source files and, when one changes, builds a new
+snapshot in the background and publishes it with a single reference swap.
+A request pins the snapshot it started with (pin_catalog), so it finishes
+on that version even if a reload lands meanwhile.
+"""
+
+import contextlib
+import contextvars
+import gc
+import hashlib
+import sys
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import MappingProxyType
+from typing import Mapping
+
+from course_search import SearchIndex, load_search_index
+from data_loader import DATA_DIR, PROGRAMME_STRUCTURES_DIR, load_courses, load_department, get_available_departments
+from course_neighbours import load_neighbour_table
+from department_views import DepartmentView, render_view
+from metrics import REGISTRY
+from planner import CONFIG
+from semester_check import SemesterChecker
+from slotting.offerings import OfferingIndex, find_offering_files, load_offering_index
+from slotting.slotparsing import load_slot_index
+
+# Bound on view variants rendered at request time (field projections x compact x expand per department)
+MAX_CACHED_VIEWS = 1024
+# How often CatalogWatcher looks at the source files, in seconds
+POLL_SECONDS = 2.0
+
+RELOADS = REGISTRY.counter(
+    "degree_planner_catalog_reloads_total", "Catalog reloads by result (swapped, unchanged, error)",
+    ("result",),
+)
+
+
+def _read_only(records: dict) -> MappingProxyType:
+    """Wrap a dict of dicts in read-only proxies (two levels)."""
+    return MappingProxyType({key: MappingProxyType(value) for key, value in records.items()})
+
+
+class ViewCache:
+    """
+    Thread-safe LRU of department view variants rendered at request time.
+
+    Each worker process fills its own; only the precomputed Catalog.views
+    are shared between workers.
+    """
+
+    def __init__(self, max_views: int = MAX_CACHED_VIEWS):
+        self.max_views = max_views
+        self._views: OrderedDict[tuple, DepartmentView] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> DepartmentView | None:
+        with self._lock:
+            view = self._views.get(key)
+            if view is not None:
+                self._views.move_to_end(key)
+            return view
+
+    def put(self, key: tuple, view: DepartmentView):
+        with self._lock:
+            self._views[key] = view
+            self._views.move_to_end(key)
+            while len(self._views) > self.max_views:
+                self._views.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._views.clear()
+
+    def __len__(self) -> int:
+        return len(self._views)
+
+
+@dataclass(frozen=True)
+class Catalog:
+    """Immutable snapshot of all catalog-derived data."""
+    courses: Mapping[str, Mapping]
+    departments: Mapping[str, Mapping]
+    offerings: OfferingIndex
+    slot_index: Mapping[int, Mapping[str, tuple]]
+    search: SearchIndex
+    semester_checker: SemesterChecker
+    version: str  # catalog_version() of the files it was built from
+    loaded_at: float
+    # (dept_code, expand, fields, compact) -> DepartmentView, the default views
+    # rendered at build time; read-only, so pre-forked workers share them
+    views: Mapping[tuple, DepartmentView] = field(default_factory=lambda: MappingProxyType({}))
+    # Every other variant, rendered on first request
+    rendered: ViewCache = field(default_factory=ViewCache, compare=False, repr=False)
+
+    def get_department(self, dept_code: str) -> Mapping:
+        """Department structure; raises FileNotFoundError like load_department."""
+        if dept_code not in self.departments:
+            raise FileNotFoundError(
+                f"Department '{dept_code}' not found. Available: {sorted(self.departments)}"
+            )
+        return self.departments[dept_code]
+
+    def get_view(self, dept_code: str, expand: bool = False,
+                 fields: tuple[str, ...] | None = None, compact: bool = False) -> DepartmentView:
+        """
+        Rendered department view; raises FileNotFoundError for unknown departments.
+
+        fields must already be normalized with department_views.parse_fields.
+        Variants other than the precomputed defaults are kept in an LRU of
+        MAX_CACHED_VIEWS views.
+        """
+        key = (dept_code, expand, fields, compact)
+        view = self.views.get(key) or self.rendered.get(key)
+        if view is None:
+            view = render_view(self.get_department(dept_code), self.courses, self.offerings,
+                               expand, fields, compact)
+            self.rendered.put(key, view)
+        return view
+
+
+def source_files() -> list[Path]:
+    """Every file a catalog is built from: courses.json, the programme structures and the offering CSVs."""
+    files = [DATA_DIR / "courses.json", *sorted(PROGRAMME_STRUCTURES_DIR.glob("*.json"))]
+    return files + [csv_file for _, _, csv_file in find_offering_files()]
+
+
+def catalog_version() -> str:
+    """Content hash of source_files(); changes whenever one of them does."""
+    digest = hashlib.sha256()
+    for path in source_files():
+        digest.update(path.name.encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def build_catalog() -> Catalog:
+    """Load every catalog source and render all department views."""
+    departments = {
+        dept_code: load_department(dept_code) for dept_code in get_available_departments()
+    }
+    courses = load_courses()
+    slot_index = load_slot_index()
+    read_only_courses = _read_only(courses)
+    offerings = load_offering_index()
+    views = {
+        (dept_code, expand, None, False): render_view(department, read_only_courses, offerings, expand)
+        for dept_code, department in departments.items() for expand in (False, True)
+    }
+    return Catalog(
+        courses=read_only_courses,
+        departments=_read_only(departments),
+        offerings=offerings,
+        slot_index=slot_index,
+        search=load_search_index(),
+        semester_checker=SemesterChecker(courses, slot_index, CONFIG["CREDIT_SCALE"],
+                                         CONFIG["MAX_HUL_PER_SEM"]),
+        version=catalog_version(),
+        loaded_at=time.time(),
+        views=MappingProxyType(views),
+    )
+
+
+_catalog: Catalog | None = None
+_lock = threading.Lock()
+_reload_lock = threading.Lock()
+# Snapshot pinned by the current request (see pin_catalog)
+_pinned: contextvars.ContextVar[Catalog | None] = contextvars.ContextVar("pinned_catalog", default=None)
+
+
+def get_catalog() -> Catalog:
+    """The catalog pinned by the current request, else the latest one (loading it on first use)."""
+    pinned = _pinned.get()
+    return pinned if pinned is not None else latest_catalog()
+
+
+def latest_catalog() -> Catalog:
+    """The most recently published catalog, ignoring pins (what a forked process inherits)."""
+    global _catalog
+    if _catalog is None:
+        with _lock:
+            if _catalog is None:
+                _catalog = build_catalog()
+    return _catalog
+
+
+@contextlib.contextmanager
+def pin_catalog():
+    """
+    Make get_catalog() return the current snapshot for the rest of this
+    context (and threads/tasks started from it), whatever reloads happen.
+
+    Yields:
+        The pinned Catalog
+    """
+    catalog = get_catalog()
+    token = _pinned.set(catalog)
+    try:
+        yield catalog
+    finally:
+        _pinned.reset(token)
+
+
+def reload_catalog(force: bool = False) -> bool:
+    """
+    Rebuild the catalog from the source files and swap it in.
+
+    The old snapshot stays untouched, so requests that pinned it finish on
+    it; the swap itself is one reference assignment. Nothing is swapped if
+    the sources hash to the loaded version (unless force is set) or the
+    build fails - a half-written file is picked up on the next change.
+
+    Returns:
+        Whether a new catalog was published
+    """
+    global _catalog
+    with _reload_lock:
+        current = _catalog
+        if not force and current is not None and catalog_version() == current.version:
+            RELOADS.inc("unchanged")
+            return False
+        try:
+            # Loaders cached by process; the old snapshot keeps its own references
+            load_offering_index.cache_clear()
+            load_slot_index.cache_clear()
+            load_neighbour_table.cache_clear()
+            catalog = build_catalog()
+        except Exception as e:
+            RELOADS.inc("error")
+            print(f"⚠ Catalog reload failed, keeping {current.version if current else 'none'}: {e}",
+                  file=sys.stderr)
+            return False
+        _catalog = catalog
+    RELOADS.inc("swapped")
+    return True
+
+
+class CatalogWatcher:
+    """
+    Background thread that reloads the catalog when its source files change.
+
+    Polls the (mtime, size) of source_files() - and so also notices added
+    or removed programme structures and offering CSVs. A change is only
+    acted on once it has stayed the same for a whole interval, so a file
+    still being copied in isn't loaded half-written.
+
+    Args:
+        interval: Seconds between polls
+    """
+
+    def __init__(self, interval: float = POLL_SECONDS):
+        self.interval = interval
+        self._seen = ()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="catalog-watcher", daemon=True)
+
+    @staticmethod
+    def signature() -> tuple:
+        files = []
+        for path in source_files():
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            files.append((str(path), stat.st_mtime_ns, stat.st_size))
+        return tuple(files)
+
+    def start(self) -> "CatalogWatcher":
+        self._seen = self.signature()
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread.is_alive():
+            self._thread.join()
+
+    def _run(self):
+        seen = self._seen
+        while not self._stop.wait(self.interval):
+            current = self.signature()
+            if current == seen:
+                continue
+            # Wait for the writer to finish
+            while not self._stop.wait(self.interval):
+                settled = self.signature()
+                if settled == current:
+                    break
+                current = settled
+            else:
+                return
+            seen = current
+            reload_catalog()
+
+
+def warm_catalog() -> Catalog:
+    """
+    Load the catalog and move everything allocated so far into the GC's
+    permanent generation, so collections in forked workers don't write to
+    (and un-share) those pages.
+    """
+    catalog = get_catalog()
+    gc.collect()
+    gc.freeze()
+    return catalog
+
+
+def is_ready() -> bool:
+    """True once the catalog has been loaded in this process."""
+    return _catalog is not None
+
+
+def reset_catalog():
+    """Forget the loaded catalog (tests/benchmarks); the next access reloads it."""
+    global _catalog
+    with _lock:
+        _catalog = None
+    load_offering_index.cache_clear()
+    load_slot_index.cache_clear()
@@ -2,19 +2,20 @@
 Constraint model builder for degree planning using OR-Tools CP-SAT solver.
 """
 
+import logging
+
 from ortools.sat.python import cp_model
 from data_loader import parse_prereqs
-from slotting.slotparsing import load_slot_dataframe
-
-slot_df=load_slot_dataframe()
-print(slot_df.head())
+from slotting.slotparsing import load_slot_index
+from slotting.offerings import slot_semester
 
+logger = logging.getLogger(__name__)
 
 
 class DegreePlannerModel:
     """Builds and manages the constraint satisfaction model for degree planning."""
     
-    def __init__(self, config: dict):
+    def __init__(self, config: dict, department: str = ""):
         """
         Initialize the planner model.
         
@@ -23,27 +24,102 @@ class DegreePlannerModel:
                 - TOTAL_TARGET_CREDITS: Total credits required for degree
                 - CREDIT_SCALE: Scale factor for credits (to avoid floats)
                 - MAX_HUL_PER_SEM: Maximum HUL courses per semester
+            department: Department code the model plans for (metrics label)
         """
         self.config = config
+        self.department = department
         self.model = cp_model.CpModel()
         self.course_vars = {}  # (sem, code) -> BoolVar
+        self.semester_open = {}  # sem -> BoolVar, only when planning with a variable horizon
+        self.fixed = {}  # (sem, code) -> 0/1 for courses created as constants
+        self.classes = {}  # (sem, class code) -> member course dicts, for count variables
+        self._taken_before = {}  # (code, sem) -> BoolVar "taken in some semester < sem"
     
-    def create_course_variables(self, courses_left: dict):
+    def create_course_variables(self, courses_left: dict, fixed: dict | None = None):
         """
         Create boolean variables for all remaining courses.
         
         Args:
             courses_left: Dict mapping semester -> list of course dicts
+            fixed: Optional dict mapping (sem, code) -> 0/1; these courses
+                get a constant instead of a variable, so the solver does not
+                search over them (see replan.py)
+        
+        A class of interchangeable electives (an entry with "members", see
+        planner.group_interchangeable) gets an integer variable counting
+        how many of its members are taken that semester.
         """
+        self.fixed = dict(fixed or {})
         for sem, courses in courses_left.items():
             for course in courses:
-                code = course["code"]
-                self.course_vars[(sem, code)] = self.model.NewBoolVar(f"{code}_sem{sem}")
+                key = (sem, course["code"])
+                if "members" in course:
+                    self.classes[key] = course["members"]
+                    self.course_vars[key] = self.model.NewIntVar(
+                        0, len(course["members"]), f"{course['code']}_sem{sem}"
+                    )
+                elif key in self.fixed:
+                    self.course_vars[key] = self.model.NewConstant(self.fixed[key])
+                else:
+                    self.course_vars[key] = self.model.NewBoolVar(f"{course['code']}_sem{sem}")
+    
+    def add_horizon_literals(self, courses_left: dict):
+        """
+        Create one "semester is used" literal per semester, so the planning
+        horizon can be chosen per solve with assumptions (see set_horizon)
+        instead of rebuilding the model.
+        
+        A closed semester takes no courses and is exempt from the minimum
+        credit load; semesters close from the end (open[s + 1] => open[s]).
+        Call before add_semester_credit_constraints.
+        
+        Args:
+            courses_left: Remaining courses by semester
+        """
+        semesters = sorted(courses_left)
+        for sem in semesters:
+            self.semester_open[sem] = self.model.NewBoolVar(f"open_sem{sem}")
+            for course in courses_left[sem]:
+                key = (sem, course["code"])
+                if key in self.classes:
+                    self.model.Add(self.course_vars[key] == 0).OnlyEnforceIf(self.semester_open[sem].Not())
+                else:
+                    self.model.AddImplication(self.course_vars[key], self.semester_open[sem])
+        
+        for sem, next_sem in zip(semesters, semesters[1:]):
+            self.model.AddImplication(self.semester_open[next_sem], self.semester_open[sem])
+    
+    def set_horizon(self, last_semester: int):
+        """Restrict the next solve to semesters <= last_semester (via assumptions)."""
+        self.model.ClearAssumptions()
+        self.model.AddAssumptions([
+            self.semester_open[sem].Not() for sem in self.semester_open if sem > last_semester
+        ])
+    
+    def set_hints(self, assignment: dict):
+        """
+        Replace the solution hint.
+        
+        Args:
+            assignment: Dict mapping (sem, code) -> 0/1; missing course
+                variables are hinted 0 (fixed courses are not hinted). A
+                class is hinted with its own count if given, else with the
+                number of its members assigned
+        """
+        self.model.ClearHints()
+        for key, var in self.course_vars.items():
+            if key in self.classes and key not in assignment:
+                sem = key[0]
+                self.model.AddHint(var, sum(assignment.get((sem, m["code"]), 0) for m in self.classes[key]))
+            elif key not in self.fixed:
+                self.model.AddHint(var, assignment.get(key, 0))
     
     def add_semester_credit_constraints(self, courses_left: dict, min_credits: float, max_credits: float):
         """
         Add min/max credit constraints for each semester.
         
+        With horizon literals, the minimum only applies to open semesters.
+        
         Args:
             courses_left: Remaining courses by semester
             min_credits: Minimum credits per semester
@@ -57,7 +133,9 @@ class DegreePlannerModel:
                 code = course["code"]
                 total_credits += self.course_vars[(sem, code)] * int(course["credits"] * scale)
             
-            self.model.Add(total_credits >= int(min_credits * scale))
+            minimum = self.model.Add(total_credits >= int(min_credits * scale))
+            if sem in self.semester_open:
+                minimum.OnlyEnforceIf(self.semester_open[sem])
             self.model.Add(total_credits <= int(max_credits * scale))
     
     def add_total_credit_constraint(self, courses_left: dict, credits_done: float):
@@ -100,14 +178,24 @@ class DegreePlannerModel:
             if hul_vars:
                 self.model.Add(sum(hul_vars) <= max_hul)
     
-    def add_prerequisite_constraints(self, courses_left: dict, completed_courses: set):
+    def add_prerequisite_constraints(self, courses_left: dict, completed_courses: set,
+                                     strict: bool = False):
         """
         Add prerequisite ordering constraints.
         
+        A course needs one prerequisite path whose courses are all completed
+        or taken in an earlier semester. Prerequisites the model never plans
+        (outside the programme) are left to the student; a path through a
+        planned course with no earlier semester can't be met.
+        
         Args:
             courses_left: Remaining courses by semester
             completed_courses: Set of already completed course codes
+            strict: Keep a course out of semesters where no path can be met.
+                Otherwise such a course is left as the curriculum places it
+                (some pair a course with its prerequisite in one semester)
         """
+        planned = {code for _, code in self.course_vars}
         for (sem, code), var in self.course_vars.items():
             course_data = None
             for c in courses_left[sem]:
@@ -129,17 +217,13 @@ class DegreePlannerModel:
                 all_prereqs_satisfiable = True
                 
                 for prereq_code in prereq_path:
-                    if prereq_code in completed_courses:
+                    if prereq_code in completed_courses or prereq_code not in planned:
                         continue
                     
-                    prereq_found = False
-                    for sem_p in range(1, sem):
-                        if (sem_p, prereq_code) in self.course_vars:
-                            prereq_vars_in_path.append(self.course_vars[(sem_p, prereq_code)])
-                            prereq_found = True
-                            break
-                    
-                    if not prereq_found:
+                    taken_before = self.taken_before(prereq_code, sem)
+                    if taken_before is not None:
+                        prereq_vars_in_path.append(taken_before)
+                    else:
                         all_prereqs_satisfiable = False
                         break
                 
@@ -155,6 +239,31 @@ class DegreePlannerModel:
             
             if path_constraints:
                 self.model.Add(sum(path_constraints) >= var)
+            elif strict:
+                self.model.Add(var == 0)
+    
+    def taken_before(self, code: str, sem: int):
+        """
+        Literal for "code is taken in some semester before sem", or None if
+        it cannot be.
+        
+        A course offered in several semesters is taken at most once (core
+        and elective constraints), so the sum of its earlier variables is
+        itself 0/1.
+        """
+        earlier = [
+            var for (sem_p, code_p), var in self.course_vars.items()
+            if code_p == code and sem_p < sem
+        ]
+        if len(earlier) <= 1:
+            return earlier[0] if earlier else None
+        
+        key = (code, sem)
+        if key not in self._taken_before:
+            literal = self.model.NewBoolVar(f"{code}_before_sem{sem}")
+            self.model.Add(literal == sum(earlier))
+            self._taken_before[key] = literal
+        return self._taken_before[key]
     
     def add_core_course_constraint(self, courses_left: dict):
         """
@@ -198,6 +307,47 @@ class DegreePlannerModel:
                             self.course_vars[(sem, course1)] + self.course_vars[(sem, course2)] <= 1
                         )
     
+    def add_elective_once_constraint(self, courses_left: dict):
+        """
+        Add constraint that each elective candidate is taken at most once
+        (and each class of interchangeable electives at most once per member).
+        
+        Args:
+            courses_left: Remaining courses by semester
+        """
+        elective_vars, bounds = {}, {}
+        for sem, courses in courses_left.items():
+            for course in courses:
+                if course.get("type") != "Core":
+                    elective_vars.setdefault(course["code"], []).append(self.course_vars[(sem, course["code"])])
+                    bounds[course["code"]] = len(course.get("members", [course]))
+        
+        for code, vars_ in elective_vars.items():
+            if len(vars_) > 1:
+                self.model.Add(sum(vars_) <= bounds[code])
+    
+    def add_elective_preference_objective(self, courses_left: dict, scores: dict):
+        """
+        Maximize the preference score of the electives taken.
+        
+        Args:
+            courses_left: Remaining courses by semester
+            scores: Dict mapping course code -> preference score (>= 0),
+                e.g. from NeighbourTable.preference_scores
+        """
+        scale = self.config.get("PREFERENCE_SCALE", 100)
+        terms = []
+        for sem, courses in courses_left.items():
+            for course in courses:
+                if course.get("type") == "Core":
+                    continue
+                weight = int(round(scores.get(course["code"], 0) * scale))
+                if weight > 0:
+                    terms.append(self.course_vars[(sem, course["code"])] * weight)
+        
+        if terms:
+            self.model.Maximize(sum(terms))
+    
     def get_model(self) -> cp_model.CpModel:
         """Return the underlying OR-Tools model."""
         return self.model
@@ -206,64 +356,59 @@ class DegreePlannerModel:
         """Return the course variable mapping."""
         return self.course_vars
     
-    def add_slotting_constraints(self, courses_left: dict):
+    def add_slotting_constraints(self, courses_left: dict, slot_index=None):
         """
         Add slotting constraints:
         - No two courses with the same slot can be taken in the same semester.
         - EXCEPTION: Lab courses (XXP) and Lecture courses (XXL etc) are treated separately.
           - Sum(Labs in Slot X) <= 1
           - Sum(Lectures in Slot X) <= 1
-        Also prints debug information.
+        A class of interchangeable electives takes its members' slots, so
+        its count is bounded by 1 there too. Each constraint is logged at DEBUG level.
         
         Args:
             courses_left: Remaining courses by semester
+            slot_index: load_slot_index() output (default), or the one of
+                the catalog snapshot being planned against
         """
-        print("\n[DEBUG] Adding slotting constraints")
+        logger.debug("Adding slotting constraints")
+        if slot_index is None:
+            slot_index = load_slot_index()
 
         for sem, courses in courses_left.items():
-            print(f"\n[DEBUG] Semester {sem}")
-
-            # Filter slot_df for this semester
             # Map planner semester to slot semester
-            slot_sem = 1 if sem % 2 == 1 else 2
+            slot_sem = slot_semester(sem)
+            logger.debug("Planner sem %s -> slot sem %s", sem, slot_sem)
 
-            print(f"[DEBUG] Planner sem {sem} -> Slot sem {slot_sem}")
-
-            sem_slot_df = slot_df[
-                slot_df["Semester"].astype(int) == slot_sem
-            ] #if odd sem using sem1 data- winter sem and if even sem using sem 2 data - summer sem 
-
-            # Build mapping: slot -> list of course codes
-            slot_to_courses = (
-                sem_slot_df.groupby("Slot Name")["Course Code"]
-                .apply(list)
-                .to_dict()
-            )
+            # slot -> course codes; if odd sem using sem1 data- winter sem and if even sem using sem 2 data - summer sem
+            slot_to_courses = slot_index.get(slot_sem, {})
+            # member code -> its class entry's code
+            class_of = {
+                member["code"]: course["code"]
+                for course in courses for member in course.get("members", ())
+            }
 
             for slot, codes_in_slot in slot_to_courses.items():
                 # Filter for active courses in this semester
                 active_codes = [
                     code for code in codes_in_slot
-                    if (sem, code) in self.course_vars
+                    if (sem, class_of.get(code, code)) in self.course_vars
                 ]
                 
                 if not active_codes:
                     continue
 
-                # Split into Labs (XXP) and Lectures (Others)
-                lab_codes = [c for c in active_codes if len(c) > 2 and c[2] == 'P'] # Assuming format ELP123
-                lecture_codes = [c for c in active_codes if len(c) <= 2 or c[2] != 'P']
-                
-                # Apply constraints for Labs
-                if len(lab_codes) > 1:
-                    print(f"  Slot {slot} (Labs): {lab_codes}")
-                    print(f"    -> Constraint: sum(vars) <= 1")
-                    lab_vars = [self.course_vars[(sem, code)] for code in lab_codes]
-                    self.model.Add(sum(lab_vars) <= 1)
+                # Split into Labs (XXP) and Lectures (Others), then replace members by their class
+                lab_codes = list(dict.fromkeys(
+                    class_of.get(c, c) for c in active_codes if len(c) > 2 and c[2] == 'P'
+                )) # Assuming format ELP123
+                lecture_codes = list(dict.fromkeys(
+                    class_of.get(c, c) for c in active_codes if len(c) <= 2 or c[2] != 'P'
+                ))
                 
-                # Apply constraints for Lectures
-                if len(lecture_codes) > 1:
-                    print(f"  Slot {slot} (Lectures): {lecture_codes}")
-                    print(f"    -> Constraint: sum(vars) <= 1")
-                    lecture_vars = [self.course_vars[(sem, code)] for code in lecture_codes]
-                    self.model.Add(sum(lecture_vars) <= 1)
+                # At most one lab and one lecture per slot; a single course needs
+                # no constraint, but a class's count could otherwise exceed 1
+                for kind, codes in (("labs", lab_codes), ("lectures", lecture_codes)):
+                    if len(codes) > 1 or any((sem, code) in self.classes for code in codes):
+                        logger.debug("Sem %s slot %s (%s): at most one of %s", sem, slot, kind, codes)
+                        self.model.Add(sum(self.course_vars[(sem, code)] for code in codes) <= 1)
@@ -0,0 +1,221 @@
+"""
+Similar-course neighbour table for elective recommendations.
+
+Offline stage: TF-IDF vectors over course name + description, cosine
+similarity between every pair, and the top-k neighbours of each course kept
+in a (num_courses x k) array saved as data/courses.neighbours.npy. The codes
+it is indexed by, a fingerprint of courses.json and a digest of the array sit
+next to it in data/courses.neighbours.json, which is written last; a table
+whose digest doesn't match is rebuilt.
+
+At run time the array is memory-mapped, so "courses like X" is a dictionary
+lookup plus a k-element slice, and ranking a candidate pool against a
+student's preferences costs O(len(preferences) * k).
+
+Usage:
+    python course_neighbours.py            # (re)build the table
+    python course_neighbours.py ELL409     # show neighbours of a course
+"""
+
+import hashlib
+import json
+import os
+import sys
+import tempfile
+from functools import lru_cache
+from typing import Iterable, Mapping
+
+import numpy as np
+
+from course_search import catalog_fingerprint
+from data_loader import DATA_DIR
+
+TABLE_FILE = DATA_DIR / "courses.neighbours.npy"
+META_FILE = DATA_DIR / "courses.neighbours.json"
+
+NUM_NEIGHBOURS = 32
+# Rows of the similarity matrix computed at once while building
+BUILD_BLOCK = 512
+
+# One record per (course, rank); index is -1 past the last real neighbour
+NEIGHBOUR_DTYPE = np.dtype([("index", "<i4"), ("score", "<f4")])
+
+
+def build_neighbour_table(courses: Mapping[str, Mapping], k: int = NUM_NEIGHBOURS) -> tuple[list[str], np.ndarray]:
+    """
+    Compute the top-k most similar courses of every course.
+
+    Args:
+        courses: {code: course dict} as returned by load_courses()
+        k: neighbours kept per course
+
+    Returns:
+        (codes, table) where table[i] holds the neighbours of codes[i],
+        most similar first
+    """
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    codes = sorted(courses)
+    texts = [
+        f"{courses[code].get('name', '')} {courses[code].get('description') or ''}"
+        for code in codes
+    ]
+    # Rows are L2-normalized, so X @ X.T is cosine similarity
+    vectors = TfidfVectorizer(stop_words="english", sublinear_tf=True).fit_transform(texts)
+    vectors = vectors.astype(np.float32)
+
+    k = min(k, len(codes) - 1)
+    table = np.zeros((len(codes), k), dtype=NEIGHBOUR_DTYPE)
+    for start in range(0, len(codes), BUILD_BLOCK):
+        stop = min(start + BUILD_BLOCK, len(codes))
+        similarity = (vectors[start:stop] @ vectors.T).toarray()
+        similarity[np.arange(stop - start), np.arange(start, stop)] = 0  # not its own neighbour
+
+        top = np.argpartition(-similarity, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(similarity, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind="stable")
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+
+        rows = table[start:stop]
+        rows["index"] = np.where(top_scores > 0, top, -1)
+        rows["score"] = np.where(top_scores > 0, top_scores, 0)
+
+    return codes, table
+
+
+def table_digest(table: np.ndarray) -> str:
+    """Digest of a table's contents, recorded in the metadata to pair the two files."""
+    return hashlib.sha256(np.ascontiguousarray(table).tobytes()).hexdigest()
+
+
+def _write_replace(path, write):
+    """Write a file through a temp file of its own in the same directory, then rename it into place."""
+    with tempfile.NamedTemporaryFile(dir=path.parent, prefix=path.name + ".", suffix=".tmp",
+                                     delete=False) as f:
+        try:
+            write(f)
+        except BaseException:
+            f.close()
+            os.unlink(f.name)
+            raise
+    os.replace(f.name, path)
+
+
+def save_neighbour_table(codes: list[str], table: np.ndarray, fingerprint: str):
+    """
+    Write the table, then its metadata, each through its own temp file.
+
+    Readers go by the metadata, so until it is replaced they see the old
+    pair; a table replaced meanwhile fails the digest check in
+    load_neighbour_table rather than being read against the wrong codes.
+    """
+    meta = {"fingerprint": fingerprint, "table": table_digest(table), "k": table.shape[1], "codes": codes}
+    _write_replace(TABLE_FILE, lambda f: np.save(f, table))
+    _write_replace(META_FILE, lambda f: f.write(json.dumps(meta).encode()))
+
+
+class NeighbourTable:
+    """
+    Read-only view of a neighbour table.
+
+    Args:
+        codes: course codes, in table row order
+        table: (num_courses x k) NEIGHBOUR_DTYPE array, usually memory-mapped
+    """
+
+    def __init__(self, codes: list[str], table: np.ndarray):
+        self.codes = codes
+        self.table = table
+        self.row = {code: i for i, code in enumerate(codes)}
+
+    def __contains__(self, code: str) -> bool:
+        return code in self.row
+
+    def similar(self, code: str, k: int | None = None) -> list[tuple[str, float]]:
+        """
+        Courses most similar to code.
+
+        Returns:
+            Up to k (code, cosine similarity) pairs, most similar first;
+            empty for unknown courses
+        """
+        row = self.row.get(code)
+        if row is None:
+            return []
+        neighbours = self.table[row, :k]
+        return [
+            (self.codes[index], score)
+            for index, score in zip(neighbours["index"].tolist(), neighbours["score"].tolist())
+            if index >= 0
+        ]
+
+    def preference_scores(self, preferences: Mapping[str, float],
+                          candidates: Iterable[str]) -> dict[str, float]:
+        """
+        Score candidates against a student's preferences.
+
+        A candidate scores its own preference weight plus, for every
+        preferred course it neighbours, weight x similarity.
+
+        Args:
+            preferences: {course code: weight}, as in UserData.preferences
+            candidates: course codes to score
+
+        Returns:
+            {candidate: score} for every candidate (0 when unrelated)
+        """
+        scores = {code: float(preferences.get(code, 0)) for code in candidates}
+        for preferred, weight in preferences.items():
+            for code, similarity in self.similar(preferred):
+                if code in scores:
+                    scores[code] += weight * similarity
+        return scores
+
+    def rank(self, preferences: Mapping[str, float], candidates: list[str]) -> list[tuple[str, float]]:
+        """Candidates ordered by preference_scores, highest first (stable)."""
+        scores = self.preference_scores(preferences, candidates)
+        return sorted(((code, scores[code]) for code in candidates), key=lambda item: -item[1])
+
+
+@lru_cache(maxsize=1)
+def load_neighbour_table(rebuild: bool = False) -> NeighbourTable:
+    """
+    Memory-map the neighbour table, rebuilding it if courses.json changed or
+    the table on disk isn't the one its metadata describes.
+
+    Args:
+        rebuild: ignore any saved table
+
+    Returns:
+        NeighbourTable matching the current courses.json
+    """
+    courses_bytes = (DATA_DIR / "courses.json").read_bytes()
+    fingerprint = catalog_fingerprint(courses_bytes)
+
+    if not rebuild and META_FILE.exists() and TABLE_FILE.exists():
+        try:
+            meta = json.loads(META_FILE.read_text())
+            if meta.get("fingerprint") == fingerprint:
+                table = np.load(TABLE_FILE, mmap_mode="r")
+                if table_digest(table) == meta.get("table") and len(table) == len(meta["codes"]):
+                    return NeighbourTable(meta["codes"], table)
+        except (OSError, ValueError, KeyError):
+            pass  # stale, unreadable or mid-rewrite; rebuild below
+
+    codes, table = build_neighbour_table(json.loads(courses_bytes))
+    save_neighbour_table(codes, table, fingerprint)
+    return NeighbourTable(codes, table)
+
+
+def main():
+    table = load_neighbour_table(rebuild=len(sys.argv) == 1)
+    print(f"Neighbour table: {len(table.codes)} courses x {table.table.shape[1]} neighbours")
+    for code in sys.argv[1:]:
+        print(f"\n{code}:")
+        for other, score in table.similar(code, 10):
+            print(f"  {other}  {score:.3f}")
+
+
+if __name__ == "__main__":
+    main()
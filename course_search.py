@@ -0,0 +1,208 @@
+"""
+Full-text course search over data/courses.json.
+
+A BM25 inverted index over course names and descriptions. Because the
+catalog is static between edits, each posting stores its final BM25 impact
+(idf x saturated, length-normalized term frequency), so a query is a sum of
+precomputed scores over a few posting lists followed by a top-k selection.
+
+Documents are ordered by course code, which turns a department-prefix filter
+into a contiguous slice; level and credits filters are vectorized masks.
+
+The index is persisted next to the catalog (data/courses.search.pkl) together
+with a fingerprint of courses.json and is rebuilt only when that changes.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import re
+import tempfile
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import Mapping
+
+import numpy as np
+
+from data_loader import DATA_DIR
+
+INDEX_FILE = DATA_DIR / "courses.search.pkl"
+INDEX_FORMAT = 1  # bump when the on-disk layout or scoring changes
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+# Name tokens count this many times towards a document's term frequencies
+NAME_WEIGHT = 3
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from in into is it its of on or the this "
+    "to with via etc their such these those".split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase alphanumeric tokens, without stopwords or single characters."""
+    return [
+        token for token in TOKEN_PATTERN.findall(text.lower())
+        if len(token) > 1 and token not in STOPWORDS
+    ]
+
+
+def course_level(code: str) -> int:
+    """Course level from its code: ELL365 -> 3."""
+    return int(code[3]) if len(code) > 3 and code[3].isdigit() else 0
+
+
+def catalog_fingerprint(courses_bytes: bytes) -> str:
+    """Fingerprint of the raw courses.json the index was built from."""
+    return hashlib.sha256(courses_bytes).hexdigest()
+
+
+@dataclass(frozen=True)
+class SearchHit:
+    code: str
+    name: str
+    credits: float
+    score: float
+
+
+class SearchIndex:
+    """
+    BM25 index over course name + description.
+
+    Args:
+        courses: {code: course dict} as returned by load_courses()
+        fingerprint: catalog fingerprint recorded with the persisted index
+    """
+
+    def __init__(self, courses: Mapping[str, Mapping], fingerprint: str = ""):
+        self.fingerprint = fingerprint
+        self.codes = sorted(courses)
+        self.names = [courses[code].get("name", "") for code in self.codes]
+        self.credits = np.array(
+            [float(courses[code].get("credits") or 0) for code in self.codes], dtype=np.float32
+        )
+        self.levels = np.array([course_level(code) for code in self.codes], dtype=np.int8)
+
+        term_freqs = []
+        for code, name in zip(self.codes, self.names):
+            tokens = tokenize(name) * NAME_WEIGHT + tokenize(courses[code].get("description") or "")
+            counts: dict[str, int] = {}
+            for token in tokens:
+                counts[token] = counts.get(token, 0) + 1
+            term_freqs.append((counts, len(tokens)))
+
+        num_docs = len(self.codes)
+        avg_length = sum(length for _, length in term_freqs) / max(num_docs, 1)
+
+        postings: dict[str, tuple[list[int], list[float]]] = {}
+        for doc, (counts, length) in enumerate(term_freqs):
+            norm = K1 * (1 - B + B * length / avg_length) if avg_length else K1
+            for term, tf in counts.items():
+                docs, weights = postings.setdefault(term, ([], []))
+                docs.append(doc)
+                weights.append(tf * (K1 + 1) / (tf + norm))
+
+        # term -> (doc ids, BM25 impacts); doc ids are unique within a posting list
+        self.postings: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+        for term, (docs, weights) in postings.items():
+            idf = np.log(1 + (num_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+            self.postings[term] = (
+                np.array(docs, dtype=np.int32),
+                np.array(weights, dtype=np.float32) * np.float32(idf),
+            )
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def _prefix_range(self, prefix: str) -> tuple[int, int]:
+        """[start, stop) of codes starting with prefix (codes are sorted)."""
+        prefix = prefix.upper()
+        start = bisect_left(self.codes, prefix)
+        stop = bisect_left(self.codes, prefix + "\uffff", lo=start)
+        return start, stop
+
+    def search(self, query: str, limit: int = 20, dept: str | None = None,
+               level: int | None = None, credits: float | None = None) -> list[SearchHit]:
+        """
+        Top courses for a free-text query.
+
+        Args:
+            query: free text, e.g. "stochastic processes"
+            limit: maximum number of hits
+            dept: course-code prefix, e.g. "ELL" or "EL"
+            level: course level (first digit of the number), e.g. 3 for ELL3xx
+            credits: exact credit count
+
+        Returns:
+            Hits ordered by descending score, then code
+        """
+        terms = [term for term in set(tokenize(query)) if term in self.postings]
+        if not terms or limit <= 0:
+            return []
+
+        scores = np.zeros(len(self.codes), dtype=np.float32)
+        for term in terms:
+            docs, impacts = self.postings[term]
+            scores[docs] += impacts
+
+        if dept:
+            start, stop = self._prefix_range(dept)
+            scores[:start] = 0
+            scores[stop:] = 0
+        if level is not None:
+            scores[self.levels != level] = 0
+        if credits is not None:
+            scores[self.credits != np.float32(credits)] = 0
+
+        matched = np.flatnonzero(scores)
+        if len(matched) > limit:
+            matched = matched[np.argpartition(-scores[matched], limit - 1)[:limit]]
+        # Ties broken by code for stable results
+        ranked = sorted(matched, key=lambda doc: (-scores[doc], doc))
+
+        return [
+            SearchHit(self.codes[doc], self.names[doc], float(self.credits[doc]), round(float(scores[doc]), 4))
+            for doc in ranked
+        ]
+
+
+def load_search_index(rebuild: bool = False) -> SearchIndex:
+    """
+    Load the persisted index, rebuilding it if courses.json has changed.
+
+    Args:
+        rebuild: ignore any persisted index
+
+    Returns:
+        SearchIndex matching the current courses.json
+    """
+    courses_bytes = (DATA_DIR / "courses.json").read_bytes()
+    fingerprint = catalog_fingerprint(courses_bytes)
+
+    if not rebuild and INDEX_FILE.exists():
+        try:
+            with open(INDEX_FILE, "rb") as f:
+                stored_format, index = pickle.load(f)
+            if stored_format == INDEX_FORMAT and index.fingerprint == fingerprint:
+                return index
+        except (OSError, pickle.UnpicklingError, EOFError, ValueError, AttributeError):
+            pass  # stale or unreadable; rebuild below
+
+    index = SearchIndex(json.loads(courses_bytes), fingerprint)
+
+    # Write to a temp file of our own, then rename, so concurrent readers never
+    # see a partial file and concurrent rebuilds never write into each other's
+    with tempfile.NamedTemporaryFile(dir=INDEX_FILE.parent, prefix=INDEX_FILE.name + ".",
+                                     suffix=".tmp", delete=False) as f:
+        try:
+            pickle.dump((INDEX_FORMAT, index), f, protocol=pickle.HIGHEST_PROTOCOL)
+        except BaseException:
+            f.close()
+            os.unlink(f.name)
+            raise
+    os.replace(f.name, INDEX_FILE)
+    return index
@@ -0,0 +1,174 @@
+"""
+Rendered department views served by the API.
+
+A department view is the output of build_selected_courses for one
+department, serialized to JSON once. Views only change when the catalog
+does, so they are rendered when the catalog snapshot is built (see
+catalog.py) and served with a strong ETag derived from the serialized bytes.
+
+Views can be narrowed to a subset of course fields and/or emitted in a
+compact form where every course appears once in a shared dictionary and
+semesters hold references (codes). gzip and brotli encodings are computed
+once per view alongside the identity body.
+"""
+
+import gzip
+import hashlib
+import json
+from dataclasses import dataclass, field
+from typing import Mapping
+
+try:
+    import orjson
+except ImportError:  # fall back to the stdlib encoder
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+from planner import build_selected_courses
+from slotting.offerings import OfferingIndex
+
+# Fields a client may request with ?fields=; "code" is always included
+COURSE_FIELDS = (
+    "code", "name", "credits", "type", "prereqs", "prereqs_parsed",
+    "overlap", "hours", "description", "placeholder", "candidates",
+)
+
+# Bodies smaller than this are not worth compressing
+MIN_COMPRESS_SIZE = 512
+# Quality 11 is ~45x slower than 5 for ~15% smaller bodies; views render at warm-up
+BROTLI_QUALITY = 5
+
+
+@dataclass(frozen=True)
+class DepartmentView:
+    """A serialized department view, its pre-compressed variants and its strong ETag."""
+    dept_code: str
+    expand: bool
+    body: bytes
+    etag: str
+    encoded: Mapping[str, bytes] = field(default_factory=dict)  # content-encoding -> body
+
+    def representation(self, encoding: str | None) -> tuple[bytes, str]:
+        """(body, etag) for a negotiated content-encoding; each encoding has its own strong ETag."""
+        if encoding in self.encoded:
+            return self.encoded[encoding], f'{self.etag[:-1]}-{encoding}"'
+        return self.body, self.etag
+
+
+def parse_fields(fields: str | None) -> tuple[str, ...] | None:
+    """
+    Normalize a ?fields= value ("code,name,credits") into a sorted tuple.
+
+    Raises:
+        ValueError: for unknown field names
+    """
+    if not fields:
+        return None
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested - set(COURSE_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {sorted(unknown)}. Allowed: {list(COURSE_FIELDS)}")
+    return tuple(sorted(requested | {"code"}))
+
+
+def project(course: Mapping, fields: tuple[str, ...] | None) -> dict:
+    """Keep only the requested fields of a course dict."""
+    if fields is None:
+        return dict(course)
+    return {name: course[name] for name in fields if name in course}
+
+
+def compact_view(selected_courses: dict) -> dict:
+    """
+    Deduplicate courses across semesters.
+
+    The same code can be listed with different types (a core course of one
+    semester can be an elective candidate in another), so the type stays
+    with each occurrence instead of on the shared course record.
+
+    Returns:
+        {"courses": {code: course without "type"}, "semesters": {sem: [[code, type], ...]}}
+    """
+    courses = {}
+    semesters = {}
+    for sem, sem_courses in selected_courses.items():
+        refs = []
+        for course in sem_courses:
+            code = course["code"]
+            if code not in courses:
+                courses[code] = {name: value for name, value in course.items() if name != "type"}
+            refs.append([code, course.get("type")])
+        semesters[sem] = refs
+    return {"courses": courses, "semesters": semesters}
+
+
+def encode_json(data) -> bytes:
+    """Serialize to compact JSON bytes (orjson when installed)."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, separators=(",", ":")).encode()
+
+
+def compress(body: bytes) -> dict[str, bytes]:
+    """Pre-compressed variants of a body, keyed by content-encoding."""
+    if len(body) < MIN_COMPRESS_SIZE:
+        return {}
+    encoded = {"gzip": gzip.compress(body, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        encoded["br"] = brotli.compress(body, quality=BROTLI_QUALITY)
+    return encoded
+
+
+def negotiate_encoding(accept_encoding: str | None, available: Mapping[str, bytes]) -> str | None:
+    """
+    Pick br over gzip over identity according to Accept-Encoding.
+
+    An encoding's own q-value overrides the "*" wildcard, so "*, br;q=0"
+    gets gzip.
+    """
+    if not accept_encoding:
+        return None
+    qualities = {}
+    for part in accept_encoding.split(","):
+        name, *params = part.split(";")
+        quality = 1.0
+        for param in params:
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[name.strip().lower()] = quality
+    for encoding in ("br", "gzip"):
+        if encoding in available and qualities.get(encoding, qualities.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+def render_view(department: Mapping, all_courses: Mapping, offerings: OfferingIndex,
+                expand: bool, fields: tuple[str, ...] | None = None,
+                compact: bool = False) -> DepartmentView:
+    """Build, project and serialize one department view."""
+    selected_courses = build_selected_courses(department, all_courses, offerings, expand=expand)
+    selected_courses = {
+        sem: [project(course, fields) for course in courses]
+        for sem, courses in selected_courses.items()
+    }
+    data = compact_view(selected_courses) if compact else selected_courses
+
+    body = encode_json(data)
+    etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+    return DepartmentView(department["code"], expand, body, etag, compress(body))
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Evaluate an If-None-Match header against a strong ETag."""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
@@ -1,17 +1,22 @@
 const API_BASE_URL = 'http://localhost:8000';
 
+// Course fields the plan views render (DegreeMatrix, SemesterColumn)
+const PLAN_FIELDS = 'code,name,credits,type,hours';
+
 export const fetchDegreePlan = async (deptCode) => {
     try {
-        const response = await fetch(`${API_BASE_URL}/selected-courses/${deptCode}`);
+        const response = await fetch(`${API_BASE_URL}/selected-courses/${deptCode}?compact=true&fields=${PLAN_FIELDS}`);
         if (!response.ok) {
             throw new Error(`Error fetching data: ${response.statusText}`);
         }
         const data = await response.json();
 
-        // Transform object { "1": [...], "2": [...] } to array [{ number: 1, courses: [...] }]
-        const semesters = Object.keys(data).map(key => ({
+        // Compact form: { courses: { code: {...} }, semesters: { "1": [[code, type], ...] } }
+        // (a course's type can differ between semesters, so it comes per occurrence)
+        // Transform to array [{ number: 1, courses: [...] }]
+        const semesters = Object.keys(data.semesters).map(key => ({
             number: parseInt(key),
-            courses: data[key]
+            courses: data.semesters[key].map(([code, type]) => ({ ...data.courses[code], type }))
         })).sort((a, b) => a.number - b.number);
 
         return { semesters };
@@ -20,3 +25,122 @@ export const fetchDegreePlan = async (deptCode) => {
         throw error;
     }
 };
+
+const WS_BASE_URL = API_BASE_URL.replace(/^http/, 'ws');
+
+// Rebuild { semesters } from a plan ({ number: [code, ...] }), reusing the
+// previous semester objects the change didn't touch so their rows can skip
+// re-rendering.
+const toSemesters = (plan, courses, previous, touched) => {
+    const before = new Map((previous || []).map(sem => [sem.number, sem]));
+    return Object.keys(plan).map(key => {
+        const number = parseInt(key);
+        if (before.has(number) && !touched.has(number)) {
+            return before.get(number);
+        }
+        return { number, courses: plan[key].map(code => courses[code]) };
+    }).filter(sem => sem.courses.length > 0).sort((a, b) => a.number - b.number);
+};
+
+// Live plan session over /ws/plan: the server keeps the plan and, after the
+// first snapshot, sends versioned diffs (courses added, removed or moved per
+// semester) that are applied here in order.
+//
+//   const session = openPlanSession({ dept: 'EE1', completed: [], current_semester: 4 },
+//                                   { onPlan: setDegreePlan, onError: console.error });
+//   session.update({ completed: [...], current_semester: 5 });
+//   session.replan([[5, 'ELL409']], [5, 6]);
+//   session.close();
+//
+// onPlan gets { semesters, version, status }; onStatus gets messages that
+// leave the plan as it was (e.g. an infeasible re-plan).
+export const openPlanSession = (student, { onPlan, onStatus, onError } = {}) => {
+    const socket = new WebSocket(`${WS_BASE_URL}/ws/plan`);
+    const queue = [];
+    let plan = {};
+    let courses = {};
+    let version = 0;
+    let semesters = [];
+    let resyncing = false;
+
+    const send = (message) => {
+        if (socket.readyState === WebSocket.OPEN) {
+            socket.send(JSON.stringify(message));
+        } else {
+            queue.push(message);
+        }
+    };
+
+    const publish = (touched, status) => {
+        semesters = toSemesters(plan, courses, semesters, touched);
+        if (onPlan) onPlan({ semesters, version, status });
+    };
+
+    const applyDiff = (diff) => {
+        const touched = new Set();
+        const edit = (sem) => {
+            const number = parseInt(sem);
+            touched.add(number);
+            plan[number] = [...(plan[number] || [])];
+            return number;
+        };
+        Object.entries(diff.remove).forEach(([sem, codes]) => {
+            const number = edit(sem);
+            plan[number] = plan[number].filter(code => !codes.includes(code));
+        });
+        diff.move.forEach(([code, from, to]) => {
+            plan[edit(from)] = plan[from].filter(c => c !== code);
+            plan[edit(to)].push(code);
+        });
+        Object.entries(diff.add).forEach(([sem, codes]) => {
+            plan[edit(sem)].push(...codes);
+        });
+        Object.keys(plan).forEach(sem => {
+            if (plan[sem].length === 0) delete plan[sem];
+        });
+        return touched;
+    };
+
+    socket.onopen = () => {
+        socket.send(JSON.stringify({ type: 'start', ...student }));
+        queue.splice(0).forEach(message => socket.send(JSON.stringify(message)));
+    };
+
+    socket.onmessage = (event) => {
+        const message = JSON.parse(event.data);
+        if (message.type === 'snapshot') {
+            plan = message.plan;
+            courses = message.courses;
+            version = message.version;
+            resyncing = false;
+            semesters = [];
+            publish(new Set(), message.status);
+        } else if (message.type === 'diff') {
+            if (resyncing) return;
+            if (message.base !== version) {
+                // Missed a version: start again from a snapshot
+                resyncing = true;
+                send({ type: 'resync' });
+                return;
+            }
+            Object.assign(courses, message.courses);
+            version = message.version;
+            publish(applyDiff(message), message.status);
+        } else if (message.type === 'status') {
+            if (onStatus) onStatus(message);
+        } else if (message.type === 'error') {
+            if (onError) onError(message);
+        }
+    };
+
+    socket.onerror = () => {
+        if (onError) onError({ type: 'error', detail: 'Plan session connection failed' });
+    };
+
+    return {
+        update: (changes) => send({ type: 'update', ...changes }),
+        replan: (pinned, window) => send({ type: 'replan', pinned, window }),
+        resync: () => send({ type: 'resync' }),
+        close: () => socket.close(),
+    };
+};
@@ -1,5 +1,53 @@
 import React from 'react';
 
+// One semester's row. Memoized: a plan session (openPlanSession in api.js)
+// keeps the semester objects a diff didn't touch, so only changed rows render.
+const SemesterRow = React.memo(({ semester, maxCourses }) => {
+    const courses = semester.courses || [];
+    const totalCredits = courses.reduce((sum, c) => sum + (c.credits || 0), 0);
+    const filledCount = courses.length;
+
+    return (
+        <React.Fragment>
+            {/* Semester Indicator */}
+            <div className="semester-row-header">
+                {semester.number}
+            </div>
+
+            {/* Course Cards */}
+            {courses.map((course, idx) => {
+                const hours = course.hours || {};
+                const title = course.title || course.name || "Unknown Course";
+                const code = course.code || "N/A";
+                const credits = course.credits || 0;
+                const l = course.l || hours.lecture || 0;
+                const t = course.t || hours.tutorial || 0;
+                const p = course.p || hours.practical || 0;
+
+                return (
+                    <div key={`crs-${semester.number}-${course.code || idx}`} className="course-card">
+                        <div className="course-code">{code}</div>
+                        <div className="course-title" title={title}>{title}</div>
+                        <div className="course-credits">
+                            {credits} ({l}-{t}-{p})
+                        </div>
+                    </div>
+                );
+            })}
+
+            {/* Empty Placeholders */}
+            {Array.from({ length: maxCourses - filledCount }).map((_, idx) => (
+                <div key={`empty-${semester.number}-${idx}`} className="course-card empty-card"></div>
+            ))}
+
+            {/* Total Credits */}
+            <div className="total-credits-cell">
+                <span className="total-value">{totalCredits}</span>
+            </div>
+        </React.Fragment>
+    );
+});
+
 const DegreeMatrix = ({ planData }) => {
     // Safety check for data
     if (!planData || !planData.semesters) {
@@ -33,50 +81,9 @@ const DegreeMatrix = ({ planData }) => {
                 <div className="grid-header-cell">Credits</div>
 
                 {/* Data Rows */}
-                {planData.semesters.map((semester) => {
-                    const courses = semester.courses || [];
-                    const totalCredits = courses.reduce((sum, c) => sum + (c.credits || 0), 0);
-                    const filledCount = courses.length;
-
-                    return (
-                        <React.Fragment key={semester.number}>
-                            {/* Semester Indicator */}
-                            <div className="semester-row-header">
-                                {semester.number}
-                            </div>
-
-                            {/* Course Cards */}
-                            {courses.map((course, idx) => {
-                                const title = course.title || "Unknown Course";
-                                const code = course.code || "N/A";
-                                const credits = course.credits || 0;
-                                const l = course.l || 0;
-                                const t = course.t || 0;
-                                const p = course.p || 0;
-
-                                return (
-                                    <div key={`crs-${semester.number}-${idx}`} className="course-card">
-                                        <div className="course-code">{code}</div>
-                                        <div className="course-title" title={title}>{title}</div>
-                                        <div className="course-credits">
-                                            {credits} ({l}-{t}-{p})
-                                        </div>
-                                    </div>
-                                );
-                            })}
-
-                            {/* Empty Placeholders */}
-                            {Array.from({ length: maxCourses - filledCount }).map((_, idx) => (
-                                <div key={`empty-${semester.number}-${idx}`} className="course-card empty-card"></div>
-                            ))}
-
-                            {/* Total Credits */}
-                            <div className="total-credits-cell">
-                                <span className="total-value">{totalCredits}</span>
-                            </div>
-                        </React.Fragment>
-                    );
-                })}
+                {planData.semesters.map((semester) => (
+                    <SemesterRow key={semester.number} semester={semester} maxCourses={maxCourses} />
+                ))}
             </div>
         </div>
     );
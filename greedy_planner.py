@@ -0,0 +1,349 @@
+"""
+Greedy fast-path planner over the same courses_left structure as the CP-SAT model.
+
+Core courses are list-scheduled in prerequisite order (longest remaining
+chain first), as early as the per-semester credit cap, slot clashes, the HUL
+cap and the overlap list allow, then moved into later semesters left below
+the minimum load. Electives are then chosen to hit the remaining credit
+target exactly (checked with a bitset subset-sum) and placed where the
+semester loads are lowest, for the shortest horizon where that works.
+
+The result is either a plan that satisfies every constraint of the CP-SAT
+model or a failure with a reason. It is used for interactive previews, as
+the solver's hint, and as the answer when the solver runs out of time.
+"""
+
+from dataclasses import dataclass, field
+from typing import Mapping
+
+from slotting.offerings import slot_semester
+
+# Electives dropped from the pool before giving up on a credit target
+MAX_ELECTIVE_BACKTRACKS = 16
+
+@dataclass
+class GreedyPlan:
+    """Outcome of greedy_plan."""
+    feasible: bool
+    plan: dict = field(default_factory=dict)  # sem -> list of course dicts
+    horizon: int | None = None                 # last semester with courses
+    reason: str = ""                           # why it failed, if it did
+
+    def assignment(self) -> dict:
+        """{(sem, code): 1} for every placed course (CP-SAT hint format)."""
+        return {(sem, course["code"]): 1 for sem, courses in self.plan.items() for course in courses}
+
+
+def slot_map(slot_index: Mapping) -> dict:
+    """{slot semester: {code: [(slot, is_lab), ...]}} from load_slot_index()."""
+    by_code = {}
+    for slot_sem, slots in slot_index.items():
+        codes = by_code.setdefault(slot_sem, {})
+        for slot, slot_codes in slots.items():
+            for code in slot_codes:
+                codes.setdefault(code, []).append((slot, len(code) > 2 and code[2] == "P"))
+    return by_code
+
+
+class _Schedule:
+    """Mutable per-semester state while placing courses."""
+
+    def __init__(self, semesters, completed, available_before, scale, max_load, max_hul,
+                 overlap, slots, strict=True):
+        self.completed = completed
+        self.available_before = available_before  # code -> earliest semester it has a variable
+        self.strict = strict  # as add_prerequisite_constraints(strict=...)
+        self.scale = scale
+        self.max_load = max_load
+        self.max_hul = max_hul
+        self.overlap = overlap
+        self.slots = slots
+        self.courses = {sem: [] for sem in semesters}
+        self.load = dict.fromkeys(semesters, 0)
+        self.hul = dict.fromkeys(semesters, 0)
+        self.used_slots = {sem: set() for sem in semesters}
+        self.has_overlap = dict.fromkeys(semesters, False)
+        self.placed = {}  # code -> sem
+
+    def credits(self, course) -> int:
+        return int(course["credits"] * self.scale)
+
+    def prereqs_met(self, course, sem) -> bool:
+        # Mirrors add_prerequisite_constraints: prerequisites never planned are
+        # left to the student, and a path counts only if every other one is
+        # completed or could be taken before sem; if no path counts, the course
+        # can't be taken in sem (strict) or is left unconstrained
+        paths = course.get("prereqs_parsed") or []
+        if not paths:
+            return True
+        satisfiable = False
+        for path in paths:
+            pending = [p for p in path if p not in self.completed and p in self.available_before]
+            if all(self.available_before[p] < sem for p in pending):
+                satisfiable = True
+                if all(self.placed.get(p, sem) < sem for p in pending):
+                    return True
+        return not satisfiable and not self.strict
+
+    def fits(self, course, sem) -> bool:
+        code = course["code"]
+        if self.load[sem] + self.credits(course) > self.max_load:
+            return False
+        if course.get("type", "").startswith("HUL") and self.hul[sem] >= self.max_hul:
+            return False
+        if code in self.overlap and self.has_overlap[sem]:
+            return False
+        if any(slot in self.used_slots[sem] for slot in self.slots.get(slot_semester(sem), {}).get(code, ())):
+            return False
+        return self.prereqs_met(course, sem)
+
+    def place(self, course, sem):
+        code = course["code"]
+        self.courses[sem].append(course)
+        self.load[sem] += self.credits(course)
+        if course.get("type", "").startswith("HUL"):
+            self.hul[sem] += 1
+        if code in self.overlap:
+            self.has_overlap[sem] = True
+        self.used_slots[sem].update(self.slots.get(slot_semester(sem), {}).get(code, ()))
+        self.placed[code] = sem
+
+    def remove(self, course):
+        code = course["code"]
+        sem = self.placed.pop(code)
+        self.courses[sem].remove(course)
+        self.load[sem] -= self.credits(course)
+        if course.get("type", "").startswith("HUL"):
+            self.hul[sem] -= 1
+        if code in self.overlap:
+            self.has_overlap[sem] = False
+        self.used_slots[sem].difference_update(self.slots.get(slot_semester(sem), {}).get(code, ()))
+
+    def consistent(self) -> bool:
+        """Whether every placed course still has its prerequisites met."""
+        return all(self.prereqs_met(course, sem) for sem, courses in self.courses.items() for course in courses)
+
+
+def _chain_lengths(cores: dict, completed: set) -> dict:
+    """Longest chain of remaining cores that depends on each core (itself included)."""
+    successors = {code: [] for code in cores}
+    for code, course in cores.items():
+        for path in course.get("prereqs_parsed") or []:
+            for prereq in path:
+                if prereq in successors and prereq not in completed and prereq != code:
+                    successors[prereq].append(code)
+
+    lengths = {}
+
+    def length(code, visiting=frozenset()):
+        if code in visiting:
+            return 0
+        if code not in lengths:
+            lengths[code] = 1 + max(
+                (length(s, visiting | {code}) for s in successors[code]), default=0
+            )
+        return lengths[code]
+
+    for code in cores:
+        length(code)
+    return lengths
+
+
+def greedy_plan(courses_left: dict, completed: set, remaining_credits: float,
+                min_credits: float, max_credits: float, max_hul: int, scale: int = 10,
+                overlap_list: list[str] = (), slot_index: Mapping | None = None,
+                scores: Mapping[str, float] | None = None,
+                variable_horizon: bool = True) -> GreedyPlan:
+    """
+    Build a plan without the solver.
+
+    Args:
+        courses_left: Remaining courses by semester (recommended or spread)
+        completed: Set of already completed course codes
+        remaining_credits: Credits still to earn (the model's exact total)
+        min_credits, max_credits: Per-semester credit bounds
+        max_hul: Maximum HUL courses per semester
+        scale: Credit scale, as CONFIG["CREDIT_SCALE"]
+        overlap_list: Courses of which at most one may be taken per semester
+        slot_index: load_slot_index() output; slot clashes ignored when None
+        scores: Optional elective preference scores (higher is picked first)
+        variable_horizon: Semesters after the plan's last one may stay empty
+            (as with add_horizon_literals); otherwise every semester must
+            meet the minimum load
+
+    Returns:
+        GreedyPlan; with a variable horizon, plans end at the earliest
+        semester the cores and the credit target allow
+    """
+    semesters = sorted(courses_left)
+    if not semesters:
+        return GreedyPlan(False, reason="no semesters to plan")
+
+    allowed = {}
+    courses = {}
+    available_before = {}  # code -> earliest semester it has a variable
+    for sem in semesters:
+        codes = [course["code"] for course in courses_left[sem]]
+        for course in courses_left[sem]:
+            code = course["code"]
+            courses.setdefault(code, course)
+            available_before.setdefault(code, sem)
+            # An elective listed twice in one semester shares one model variable
+            # counted twice by add_elective_once_constraint, so it cannot be taken there
+            if course.get("type") != "Core" and codes.count(code) > 1:
+                continue
+            if sem not in allowed.setdefault(code, []):
+                allowed[code].append(sem)
+    cores = {code: c for code, c in courses.items() if c.get("type") == "Core"}
+    electives = {code: c for code, c in courses.items() if c.get("type") != "Core"}
+    scores = scores or {}
+
+    target = int(round(remaining_credits * scale))
+    min_load, max_load = int(min_credits * scale), int(max_credits * scale)
+    schedule = _Schedule(semesters, completed, available_before, scale, max_load, max_hul,
+                         set(overlap_list), slot_map(slot_index) if slot_index else {},
+                         strict=variable_horizon)
+
+    # 1. Cores, as early as possible, most urgent / longest chain first
+    chains = _chain_lengths(cores, completed)
+    for sem in semesters:
+        ready = [code for code in cores if code not in schedule.placed and sem in allowed.get(code, ())]
+        ready.sort(key=lambda code: (
+            sum(1 for s in allowed[code] if s >= sem),  # fewest remaining chances first
+            -chains[code],
+            -schedule.credits(cores[code]),
+        ))
+        for code in ready:
+            if schedule.fits(cores[code], sem):
+                schedule.place(cores[code], sem)
+
+    unplaced = [code for code in cores if code not in schedule.placed]
+    if unplaced:
+        return GreedyPlan(False, reason=f"could not place core courses: {sorted(unplaced)}")
+
+    core_load = sum(schedule.load.values())
+    if core_load > target:
+        return GreedyPlan(False, reason="core courses alone exceed the credit target")
+
+    # 2. Electives summing exactly to what is left, over the shortest horizon that works
+    last_core = max((sem for sem in semesters if schedule.courses[sem]), default=semesters[0])
+    reason = "credit target does not fit the semester bounds"
+    for horizon in semesters:
+        if horizon < last_core or (not variable_horizon and horizon < semesters[-1]):
+            continue
+        open_sems = [s for s in semesters if s <= horizon]
+        if len(open_sems) * min_load > target:
+            break
+        if len(open_sems) * max_load < target:
+            continue
+
+        trial = _Schedule(semesters, completed, available_before, scale, max_load, max_hul,
+                          schedule.overlap, schedule.slots, schedule.strict)
+        for sem in semesters:
+            for course in schedule.courses[sem]:
+                trial.place(course, sem)
+
+        _balance_cores(trial, cores, allowed, set(open_sems), min_load)
+        reason = _fill_electives(trial, electives, allowed, set(open_sems), target - core_load,
+                                 min_load, scores)
+        if reason is None:
+            plan = {sem: trial.courses[sem] for sem in semesters if trial.courses[sem]}
+            return GreedyPlan(True, plan, max(plan))
+
+    return GreedyPlan(False, reason=reason)
+
+
+def _reachable(credits: list[int], target: int) -> bool:
+    """Whether some subset of credits sums exactly to target (bitset subset-sum)."""
+    reach = 1
+    mask = (1 << (target + 1)) - 1
+    for value in credits:
+        reach = (reach | (reach << value)) & mask
+    return bool(reach >> target & 1)
+
+
+def _balance_cores(trial: _Schedule, cores: dict, allowed: dict, open_sems: set, min_load: int):
+    """
+    Move cores into open semesters below the minimum load.
+
+    Cores are placed as early as possible, which can leave later semesters
+    with too few credits and no electives to make them up. A core moves only
+    from a semester that stays at or above the minimum, and only if every
+    placed course still has its prerequisites met afterwards.
+    """
+    for sem in sorted(open_sems):
+        moved = True
+        while moved and trial.load[sem] < min_load:
+            moved = False
+            candidates = sorted(
+                (code for code in cores
+                 if trial.placed[code] != sem and sem in allowed[code]
+                 and trial.load[trial.placed[code]] - trial.credits(cores[code]) >= min_load),
+                key=lambda code: -trial.credits(cores[code]),
+            )
+            for code in candidates:
+                course, origin = cores[code], trial.placed[code]
+                trial.remove(course)
+                if trial.fits(course, sem):
+                    trial.place(course, sem)
+                    if trial.consistent():
+                        moved = True
+                        break
+                    trial.remove(course)
+                trial.place(course, origin)
+
+
+def _fill_electives(trial: _Schedule, electives: dict, allowed: dict, open_sems: set,
+                    remaining: int, min_load: int, scores: Mapping[str, float]) -> str | None:
+    """
+    Place electives until exactly `remaining` scaled credits are added.
+
+    Electives that can go into a semester still below the minimum load are
+    tried first, each group in preference order (ties: fewest semesters they
+    could go in, then most credits), and each goes to the open semester
+    furthest below the minimum (then the emptiest). An elective is only taken
+    if the rest of the pool can still make up the exact remainder; when
+    nothing left fits, the latest elective is dropped from the pool instead.
+
+    Returns:
+        None on success, otherwise the reason for failure
+    """
+    pool = sorted(
+        (code for code in electives
+         if trial.credits(electives[code]) > 0 and any(s in open_sems for s in allowed.get(code, ()))),
+        key=lambda code: (-scores.get(code, 0), sum(s in open_sems for s in allowed[code]),
+                          -trial.credits(electives[code]), code),
+    )
+
+    placed, backtracks = [], 0
+    while remaining > 0:
+        short = {s for s in open_sems if trial.load[s] < min_load}
+        for code in sorted(pool, key=lambda code: not short.intersection(allowed[code])):
+            course = electives[code]
+            credits = trial.credits(course)
+            if credits > remaining:
+                continue
+            options = [s for s in allowed[code] if s in open_sems and trial.fits(course, s)]
+            if not options:
+                continue
+            rest = [trial.credits(electives[other]) for other in pool if other != code]
+            if credits != remaining and not _reachable(rest, remaining - credits):
+                continue
+            trial.place(course, min(options, key=lambda s: (trial.load[s] - min_load, s)))
+            pool.remove(code)
+            placed.append(course)
+            remaining -= credits
+            break
+        else:
+            # Stuck: drop the latest elective for good and carry on without it
+            if not placed or backtracks == MAX_ELECTIVE_BACKTRACKS:
+                return "no placeable combination of electives meets the credit target exactly"
+            course = placed.pop()
+            trial.remove(course)
+            remaining += trial.credits(course)
+            backtracks += 1
+
+    short = sorted(s for s in open_sems if trial.load[s] < min_load)
+    if short:
+        return f"semesters below the minimum load: {short}"
+    return None
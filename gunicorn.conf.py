@@ -0,0 +1,28 @@
+"""
+Pre-fork deployment of the API:
+
+    gunicorn -c gunicorn.conf.py api.main:app
+
+The master imports the app (preload_app) and warms the catalog before
+forking, so pandas/ortools, the slot CSVs, the course catalog and all
+department views are loaded once and shared copy-on-write by the workers.
+(`uvicorn --workers N` spawns fresh interpreters instead, so every worker
+loads its own copy; /ready reports 503 until that worker is warm.)
+"""
+
+import os
+
+bind = os.environ.get("BIND", "0.0.0.0:8000")
+workers = int(os.environ.get("WEB_CONCURRENCY", "4"))
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+
+
+def on_starting(server):
+    from catalog import warm_catalog
+
+    catalog = warm_catalog()
+    server.log.info(
+        f"Catalog warm: {len(catalog.courses)} courses, "
+        f"{len(catalog.departments)} departments, {len(catalog.views)} views"
+    )
@@ -0,0 +1,275 @@
+"""
+Persistent plan cache keyed by a canonical student state.
+
+Students of the same department and semester often send the same (or
+nearly the same) completion sets. canonical_state reduces a request to what
+can change its plan: completions are deduplicated, sorted and restricted to
+the codes the department's plan can see (its candidate courses and their
+prerequisites), together with the semester, credit limits and preferences.
+plan_key hashes that with the catalog version and the solver profile.
+
+Plans are stored in SQLite (data/plans.cache.sqlite) so they survive
+restarts and are shared by the workers of a pre-forked server, as JSON, so
+a tampered file can only yield a wrong plan, never run code. The file is
+an LRU bounded by MAX_CACHE_BYTES: every hit refreshes an entry's last use
+and the least recently used entries are evicted once the bound is passed.
+
+Usage:
+    python plan_cache.py            # entries and size on disk
+    python plan_cache.py --clear
+"""
+
+import argparse
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Iterable, Mapping
+
+import orjson
+
+from data_loader import DATA_DIR
+from metrics import REGISTRY
+from planner import CONFIG
+from user import UserData
+
+CACHE_FILE = DATA_DIR / "plans.cache.sqlite"
+MAX_CACHE_BYTES = 64 * 1024 * 1024
+# Eviction trims the file to this share of the bound, so it doesn't run on every insert
+EVICT_TO = 0.9
+CACHE_FORMAT = 5  # bump when plan results (or how they are planned) or the key change
+# Result fields keyed by semester; JSON stores the keys as strings
+SEMESTER_KEYED = ("plan", "horizons")
+
+# Only these outcomes are the same on every solve; a FEASIBLE (time-limited)
+# or UNKNOWN result is left out so a later solve can improve on it
+CACHEABLE_STATUSES = frozenset({"OPTIMAL", "INFEASIBLE", "GREEDY", "GREEDY_FAILED"})
+
+LOOKUPS = REGISTRY.counter(
+    "degree_planner_plan_cache_lookups_total", "Plan cache lookups by result (hit, miss, error)",
+    ("result",),
+)
+EVICTIONS = REGISTRY.counter("degree_planner_plan_cache_evictions_total", "Plans evicted from the cache")
+
+
+def relevant_codes(selected_courses: Mapping[int, list]) -> frozenset[str]:
+    """
+    Course codes whose completion can change a plan for this department:
+    every candidate course and every prerequisite of one.
+
+    A completed course outside this set earns no credit in
+    calculate_credits_done, removes nothing from courses_left and
+    satisfies no prerequisite, so it can be dropped from the key.
+    """
+    codes = set()
+    for courses in selected_courses.values():
+        for course in courses:
+            codes.add(course["code"])
+            for path in course.get("prereqs_parsed") or []:
+                codes.update(path)
+    return frozenset(codes)
+
+
+def canonical_state(user: UserData, relevant: Iterable[str]) -> dict:
+    """
+    The parts of a student's state that can change their plan, in a canonical form.
+
+    Args:
+        user: Student, with completions in any order or category
+        relevant: relevant_codes() of the student's department
+
+    Returns:
+        JSON-serializable dict; equal for students that get the same plan
+    """
+    relevant = relevant if isinstance(relevant, (set, frozenset)) else set(relevant)
+    completed = set(user.completed_corecourses) | set(user.completed_hul) | set(user.completed_DE)
+    return {
+        "dept": user.dept,
+        "semester": user.current_semester,
+        "num_semesters": user.num_semesters,
+        "completed": sorted(completed & relevant),
+        "credits": [float(user.min_credits), float(user.max_credits)],
+        "preferences": sorted(
+            (code, round(float(weight), 6)) for code, weight in user.preferences.items() if weight
+        ),
+    }
+
+
+def plan_key(state: dict, catalog_version: str, profile: Mapping) -> str:
+    """
+    Cache key of a canonical state under one catalog and solver profile.
+
+    Args:
+        state: canonical_state() result
+        catalog_version: Catalog.version
+        profile: solver settings that change the result (mode, time limit, ...)
+    """
+    payload = {
+        "format": CACHE_FORMAT,
+        "catalog": catalog_version,
+        "config": CONFIG,
+        "profile": dict(profile),
+        "state": state,
+    }
+    return hashlib.sha256(orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)).hexdigest()
+
+
+def cacheable(result: dict) -> bool:
+    """
+    Whether a plan result is what every solve of the same state gives: its
+    status is in CACHEABLE_STATUSES and, for a shortest-horizon search,
+    every horizon before the last one tried was proven INFEASIBLE. A result
+    whose search was cut short (e.g. by a time budget shrunk under load) is
+    left out, so it is never served after the load has passed.
+    """
+    if result.get("status") not in CACHEABLE_STATUSES:
+        return False
+    horizons = result.get("horizons") or {}
+    last = max(horizons, default=None)
+    return all(status == "INFEASIBLE" for horizon, status in horizons.items() if horizon != last)
+
+
+def decode_result(value: bytes) -> dict:
+    """A stored plan result, with its semester keys back as ints."""
+    result = orjson.loads(value)
+    for field in SEMESTER_KEYED:
+        if isinstance(result.get(field), dict):
+            result[field] = {int(sem): entry for sem, entry in result[field].items()}
+    return result
+
+
+class PlanCache:
+    """
+    Disk-backed LRU of plan results.
+
+    Args:
+        path: SQLite file
+        max_bytes: bound on the total size of the stored (JSON) plans
+    """
+
+    def __init__(self, path=CACHE_FILE, max_bytes: int = MAX_CACHE_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, timeout=5.0, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS plans "
+            "(key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, used REAL NOT NULL)"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS plans_used ON plans (used)")
+
+    def get(self, key: str) -> dict | None:
+        """The cached result for key (refreshing its last use), or None."""
+        try:
+            with self._lock:
+                row = self._db.execute("SELECT value FROM plans WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    self._db.execute("UPDATE plans SET used = ? WHERE key = ?", (time.time(), key))
+            result = decode_result(row[0]) if row is not None else None
+        except (sqlite3.Error, ValueError, TypeError, AttributeError):  # orjson.JSONDecodeError is a ValueError
+            LOOKUPS.inc("error")
+            return None
+
+        if result is None:
+            self.misses += 1
+            LOOKUPS.inc("miss")
+        else:
+            self.hits += 1
+            LOOKUPS.inc("hit")
+        return result
+
+    def put(self, key: str, result: dict) -> bool:
+        """
+        Store a plan result if it is deterministic (see cacheable).
+
+        Returns:
+            Whether it was stored
+        """
+        if not cacheable(result):
+            return False
+        try:
+            value = orjson.dumps(result, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            return False
+        try:
+            with self._lock:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO plans (key, value, size, used) VALUES (?, ?, ?, ?)",
+                    (key, value, len(value), time.time()),
+                )
+                self._evict()
+        except sqlite3.Error:
+            return False
+        return True
+
+    def _evict(self):
+        total = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM plans").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        target = total - self.max_bytes * EVICT_TO
+        evicted = freed = 0
+        for key, size in self._db.execute("SELECT key, size FROM plans ORDER BY used").fetchall():
+            if freed >= target:
+                break
+            self._db.execute("DELETE FROM plans WHERE key = ?", (key,))
+            freed += size
+            evicted += 1
+        EVICTIONS.inc(amount=evicted)
+
+    def stats(self) -> dict:
+        """Entries and bytes on disk, plus this process's hits, misses and hit rate."""
+        with self._lock:
+            entries, size = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM plans").fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "bytes": size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+        }
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM plans")
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+_cache: PlanCache | None = None
+_cache_pid: int | None = None
+_cache_lock = threading.Lock()
+
+
+def get_plan_cache() -> PlanCache:
+    """This process's PlanCache; a forked child opens its own connection."""
+    global _cache, _cache_pid
+    with _cache_lock:
+        if _cache is None or _cache_pid != os.getpid():
+            _cache, _cache_pid = PlanCache(), os.getpid()
+    return _cache
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Plan cache statistics")
+    parser.add_argument("--clear", action="store_true", help="Remove every cached plan")
+    args = parser.parse_args()
+
+    cache = get_plan_cache()
+    if args.clear:
+        cache.clear()
+    stats = cache.stats()
+    print(f"{CACHE_FILE}: {stats['entries']} plans, {stats['bytes'] / 1024:.1f} KiB "
+          f"of {stats['max_bytes'] / 1024 / 1024:.0f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+Server-side plan sessions, pushed to the frontend as diffs.
+
+A session (one WebSocket connection, see /ws/plan in api/main.py) keeps a
+student's state and current plan. The first plan is sent as a snapshot;
+after every later re-plan only the courses added, removed or moved per
+semester are sent, with the version they apply to, plus the details of
+courses the client hasn't been sent yet. A client that sees a diff whose
+base isn't its version asks for a snapshot again ("resync"). A plan made on a
+new catalog version is sent as a snapshot too, since the course details the
+client holds may have changed with it.
+
+Messages from the client:
+    {"type": "start", "dept": "EE1", "completed": [...], "current_semester": 4, "preferences": {}}
+    {"type": "update", ...any of the start fields}    re-plan from scratch
+    {"type": "replan", "pinned": [[5, "ELL409"]], "window": [5, 6]}
+    {"type": "resync"}
+
+Messages to the client:
+    {"type": "snapshot", "version": 1, "plan": {sem: [codes]}, "courses": {...}, "status": ...}
+    {"type": "diff", "base": 1, "version": 2, "add": {sem: [codes]}, "remove": {sem: [codes]},
+     "move": [[code, from, to]], "courses": {...}, "status": ...}
+    {"type": "status", "version": 2, "status": "INFEASIBLE", ...}   no plan; the current one stands
+    {"type": "error", "detail": ..., "retry_after": ...}
+"""
+
+from catalog import get_catalog, pin_catalog
+from department_views import project
+from replan import replan_for_department
+from scheduler import Overloaded
+from what_if import compare_departments
+
+# Course fields sent with a plan (the rest is on /selected-courses)
+SESSION_FIELDS = ("code", "credits", "hours", "name")
+STATE_FIELDS = ("dept", "completed", "current_semester", "preferences")
+
+
+def plan_diff(old: dict[int, list[str]], new: dict[int, list[str]]) -> dict:
+    """
+    Courses added, removed and moved between two plans (order within a semester is ignored).
+
+    Returns:
+        {"add": {sem: [codes]}, "remove": {sem: [codes]}, "move": [[code, from, to]]}
+    """
+    old_at = {code: sem for sem, codes in old.items() for code in codes}
+    new_at = {code: sem for sem, codes in new.items() for code in codes}
+    add, remove, move = {}, {}, []
+    for code, sem in new_at.items():
+        if code not in old_at:
+            add.setdefault(sem, []).append(code)
+        elif old_at[code] != sem:
+            move.append([code, old_at[code], sem])
+    for code, sem in old_at.items():
+        if code not in new_at:
+            remove.setdefault(sem, []).append(code)
+    return {"add": add, "remove": remove, "move": move}
+
+
+def apply_diff(plan: dict[int, list[str]], diff: dict) -> dict[int, list[str]]:
+    """The plan after a plan_diff, as the frontend client applies it (order within a semester aside)."""
+    patched = {sem: list(codes) for sem, codes in plan.items()}
+    for sem, codes in diff["remove"].items():
+        patched[int(sem)] = [code for code in patched[int(sem)] if code not in codes]
+    for code, source, target in diff["move"]:
+        patched[source].remove(code)
+        patched.setdefault(target, []).append(code)
+    for sem, codes in diff["add"].items():
+        patched.setdefault(int(sem), []).extend(codes)
+    return {sem: codes for sem, codes in sorted(patched.items()) if codes}
+
+
+class PlanSession:
+    """One student's state and current plan, versioned for diff updates."""
+
+    def __init__(self):
+        self.state: dict | None = None
+        self.plan: dict[int, list[str]] = {}
+        self.version = 0
+        self.catalog_version: str | None = None
+        self._sent: set[str] = set()  # codes whose details the client has
+
+    def handle(self, message: dict) -> dict:
+        """Answer one client message (see the module docstring), all of it on one catalog snapshot."""
+        kind = message.get("type")
+        try:
+            with pin_catalog():
+                return self._handle(kind, message)
+        except Overloaded as e:
+            return {"type": "error", "detail": str(e), "retry_after": e.retry_after}
+        except (FileNotFoundError, KeyError, TypeError, ValueError) as e:
+            return {"type": "error", "detail": str(e)}
+
+    def _handle(self, kind: str | None, message: dict) -> dict:
+        if kind == "start":
+            self.state = {"completed": [], "preferences": {}}
+            self.state.update(self._state_fields(message))
+            self.version, self.plan, self._sent = 0, {}, set()
+            return self.plan_from_scratch()
+        if self.state is None:
+            raise ValueError("Send a start message first")
+        if kind == "update":
+            self.state.update(self._state_fields(message))
+            return self.plan_from_scratch()
+        if kind == "replan":
+            return self.replan(message.get("pinned", []), message["window"])
+        if kind == "resync":
+            return self.snapshot()
+        raise ValueError(f"Unknown message type {kind!r}")
+
+    @staticmethod
+    def _state_fields(message: dict) -> dict:
+        state = {name: message[name] for name in STATE_FIELDS if name in message}
+        if "current_semester" in state:
+            state["current_semester"] = int(state["current_semester"])
+        return state
+
+    def plan_from_scratch(self) -> dict:
+        """Plan the student's current state (through the plan cache) and publish it."""
+        state = self.state
+        [result] = compare_departments(state["completed"], state["current_semester"], [state["dept"]],
+                                       state["preferences"] or None)
+        return self.publish(result)
+
+    def replan(self, pinned: list, window: list) -> dict:
+        """Re-plan a window of the current plan around pinned courses (see replan.py) and publish it."""
+        state = self.state
+        result = replan_for_department(
+            state["dept"], state["completed"], state["current_semester"], self.plan or None,
+            [(int(sem), code) for sem, code in pinned], (int(window[0]), int(window[1])),
+            state["preferences"] or None,
+        )
+        return self.publish(result)
+
+    def publish(self, result: dict) -> dict:
+        """
+        Adopt a plan result: a snapshot for the first plan and for one made on
+        a new catalog version, else a diff against the current plan.
+        """
+        if not result["feasible"]:
+            return {"type": "status", "version": self.version, "status": result["status"], "feasible": False}
+
+        catalog = get_catalog()
+        new_catalog = catalog.version != self.catalog_version
+        self.catalog_version = catalog.version
+        new_plan = {int(sem): list(codes) for sem, codes in result["plan"].items()}
+        old_plan, self.plan = self.plan, new_plan
+        self.version += 1
+        if self.version == 1 or new_catalog:
+            return self.snapshot(result["status"])
+
+        diff = plan_diff(old_plan, new_plan)
+        return {
+            "type": "diff", "base": self.version - 1, "version": self.version, **diff,
+            "courses": self._details(code for codes in diff["add"].values() for code in codes),
+            "status": result["status"], "feasible": True,
+        }
+
+    def snapshot(self, status: str | None = None) -> dict:
+        """The whole current plan, with every course's details."""
+        self._sent = set()
+        return {
+            "type": "snapshot", "version": self.version, "plan": self.plan,
+            "courses": self._details(code for codes in self.plan.values() for code in codes),
+            "status": status, "feasible": bool(self.plan), "catalog": self.catalog_version,
+        }
+
+    def _details(self, codes) -> dict:
+        courses = get_catalog().courses
+        details = {}
+        for code in codes:
+            if code not in self._sent and code in courses:
+                details[code] = project(courses[code], SESSION_FIELDS)
+                self._sent.add(code)
+        return details
@@ -5,6 +5,14 @@ This module coordinates the loading of course data, building constraint models,
 and solving for optimal semester plans.
 """
 
+import argparse
+import logging
+import math
+import sys
+import time
+
+from ortools.sat.python import cp_model
+
 from data_loader import (
     load_courses, load_department, save_json,
     parse_prereqs, parse_overlaps
@@ -15,23 +23,84 @@ from solver import (
     print_semester_plan, print_feasibility_check
 )
 from user import UserData
+from slotting.offerings import OfferingIndex, load_offering_index
+from course_neighbours import NeighbourTable, load_neighbour_table
+from greedy_planner import GreedyPlan, greedy_plan
+from slotting.slotparsing import load_slot_index
+
+logger = logging.getLogger(__name__)
 
 
 # Configuration
 CONFIG = {
     "TOTAL_TARGET_CREDITS": 150,   # EE degree requirement
     "CREDIT_SCALE": 10,            # Scale to avoid floats in OR-Tools
-    "MAX_HUL_PER_SEM": 2
+    "MAX_HUL_PER_SEM": 2,
+    "DUAL_DEGREE_SEMESTERS": 10,   # Nominal length of dual-degree programmes
+    "EXTRA_SEMESTERS": 2,          # How far past the nominal length a plan may run
+    "MAX_ELECTIVE_CANDIDATES": 12, # Per elective type and semester, when preferences rank them
+    "PREFERENCE_SCALE": 100,       # Scale preference scores to integer objective weights
+    "GROUP_INTERCHANGEABLE": True  # One count variable per class of interchangeable electives
+}
+
+
+# Codes a programme structure names but courses.json lacks, already warned about
+_reported_missing: set[str] = set()
+
+# Display names for collapsed elective placeholders
+PLACEHOLDER_NAMES = {
+    "DE": "Department Elective",
+    "HUL2XX": "Humanities Elective (200 level)",
+    "HUL3XX": "Humanities Elective (300 level)",
 }
 
 
-def build_selected_courses(department: dict, all_courses: dict) -> dict:
+def make_candidate(course_data: dict, ctype: str) -> dict:
+    """Copy a catalog course and annotate it with parsed prerequisites and its type."""
+    course = course_data.copy()
+    prereq_string = course.get("prereqs", "")
+    course["prereqs_parsed"] = parse_prereqs(prereq_string)
+    course["type"] = ctype
+    return course
+
+
+def make_placeholder(code: str, ctype: str, candidates: list[dict]) -> dict:
+    """
+    Collapse an elective slot into a single entry.
+    
+    Credits are the most common value among the candidates; the candidate
+    codes are listed so a client can expand the slot on demand.
+    """
+    credit_values = [c["credits"] for c in candidates]
+    credits = max(set(credit_values), key=credit_values.count) if credit_values else 0
+    return {
+        "code": code,
+        "name": PLACEHOLDER_NAMES.get(ctype, code),
+        "credits": credits,
+        "prereqs": "",
+        "prereqs_parsed": [],
+        "type": ctype,
+        "placeholder": True,
+        "candidates": [c["code"] for c in candidates],
+    }
+
+
+def build_selected_courses(department: dict, all_courses: dict,
+                           offerings: OfferingIndex | None = None,
+                           expand: bool = True) -> dict:
     """
     Build semester-wise course selection based on department recommendations.
     
     Args:
         department: Department structure with recommended courses
         all_courses: All available courses
+        offerings: Optional offering-history index. When given, elective
+            candidates (DE/HUL placeholders) that were never seen offered
+            are left out of the candidate pools.
+        expand: If True, each elective placeholder (DE*, HUL2XX, HUL3XX) is
+            replaced by every eligible candidate course (what the solver
+            needs). If False, it stays a single placeholder entry (see
+            make_placeholder), which is what a degree overview shows.
     
     Returns:
         Dict mapping semester -> list of course dicts
@@ -39,39 +108,29 @@ def build_selected_courses(department: dict, all_courses: dict) -> dict:
     recommended_courses = department["recommended"]
     selected_courses = {}
     
+    def offered(code: str) -> bool:
+        return offerings is None or offerings.is_known(code)
+    
     for sem_idx, course_list in enumerate(recommended_courses, start=1):
         selected_courses[sem_idx] = []
         
         for course_code in course_list:
             # Handle DE (Department Elective) placeholders
             if course_code.startswith("DE"):
-                for de_code in department["courses"].get("DE", []):
-                    if de_code in all_courses:
-                        course = all_courses[de_code].copy()
-                        prereq_string = course.get("prereqs", "")
-                        course["prereqs_parsed"] = parse_prereqs(prereq_string)
-                        course["type"] = "DE"
-                        selected_courses[sem_idx].append(course)
+                candidates = [
+                    make_candidate(all_courses[de_code], "DE")
+                    for de_code in department["courses"].get("DE", [])
+                    if offered(de_code) and de_code in all_courses
+                ]
             
-            # Handle HUL2XX placeholder
-            elif course_code == "HUL2XX":
-                for code, course_data in all_courses.items():
-                    if code.startswith("HUL2"):
-                        course = course_data.copy()
-                        prereq_string = course.get("prereqs", "")
-                        course["prereqs_parsed"] = parse_prereqs(prereq_string)
-                        course["type"] = "HUL2XX"
-                        selected_courses[sem_idx].append(course)
-            
-            # Handle HUL3XX placeholder
-            elif course_code == "HUL3XX":
-                for code, course_data in all_courses.items():
-                    if code.startswith("HUL3"):
-                        course = course_data.copy()
-                        prereq_string = course.get("prereqs", "")
-                        course["prereqs_parsed"] = parse_prereqs(prereq_string)
-                        course["type"] = "HUL3XX"
-                        selected_courses[sem_idx].append(course)
+            # Handle HUL2XX / HUL3XX placeholders
+            elif course_code in ("HUL2XX", "HUL3XX"):
+                prefix = course_code[:4]
+                candidates = [
+                    make_candidate(course_data, course_code)
+                    for code, course_data in all_courses.items()
+                    if offered(code) and code.startswith(prefix)
+                ]
             
             # Handle OC (Open Course) placeholders - skip for now
             elif course_code.startswith("OC"):
@@ -79,29 +138,48 @@ def build_selected_courses(department: dict, all_courses: dict) -> dict:
             
             # Regular course
             elif course_code in all_courses:
-                course = all_courses[course_code].copy()
-                prereq_string = course.get("prereqs", "")
-                course["prereqs_parsed"] = parse_prereqs(prereq_string)
-                course["type"] = "Core"
-                selected_courses[sem_idx].append(course)
+                selected_courses[sem_idx].append(make_candidate(all_courses[course_code], "Core"))
+                continue
             
             else:
-                print(f"⚠ Warning: {course_code} not found in courses.json")
+                if course_code not in _reported_missing:
+                    _reported_missing.add(course_code)
+                    logger.warning("%s not found in courses.json", course_code)
+                continue
+            
+            if expand:
+                selected_courses[sem_idx].extend(candidates)
+            else:
+                ctype = candidates[0]["type"] if candidates else course_code
+                selected_courses[sem_idx].append(make_placeholder(course_code, ctype, candidates))
     
     return selected_courses
 
 
-def build_courses_left(selected_courses: dict, user: UserData) -> dict:
+def degree_length(department: dict, user: UserData) -> int:
+    """Nominal number of semesters: 10 for dual-degree programmes, else user.num_semesters."""
+    if department.get("dual"):
+        return max(CONFIG["DUAL_DEGREE_SEMESTERS"], user.num_semesters)
+    return user.num_semesters
+
+
+def build_courses_left(selected_courses: dict, user: UserData,
+                       last_semester: int | None = None) -> dict:
     """
     Build dict of remaining courses based on user's completed courses.
     
     Args:
         selected_courses: All selected courses by semester
         user: User data with completion info
+        last_semester: Last semester to plan; defaults to the longer of
+            user.num_semesters and the recommended structure (see degree_length)
     
     Returns:
         Dict mapping semester -> list of remaining course dicts
     """
+    if last_semester is None:
+        last_semester = max(user.num_semesters, max(selected_courses, default=0))
+    
     courses_left = {}
     
     # Build set of all completed courses
@@ -131,10 +209,10 @@ def build_courses_left(selected_courses: dict, user: UserData) -> dict:
                 
                 if ctype == "Core" and code not in all_completed:
                     incomplete_cores.append(course)
-                    print(f"Found incomplete/failed course: {code} from semester {sem}")
+                    logger.debug("Found incomplete/failed course: %s from semester %s", code, sem)
     
     # Add failed courses to all future semesters
-    for sem in range(user.current_semester, 9):
+    for sem in range(user.current_semester, last_semester + 1):
         if sem not in courses_left:
             courses_left[sem] = []
         
@@ -146,6 +224,314 @@ def build_courses_left(selected_courses: dict, user: UserData) -> dict:
     return courses_left
 
 
+def filter_courses_by_offering(courses_left: dict, offerings: OfferingIndex) -> dict:
+    """
+    Presolve step: drop elective candidates from semesters they are not offered in.
+    
+    Core courses are kept as-is (they are mandatory and dropping them would
+    only turn a scheduling warning into an infeasible model); use
+    print_feasibility_check to see cores sitting in an unusual parity.
+    
+    Args:
+        courses_left: Remaining courses by semester
+        offerings: Offering-history index
+    
+    Returns:
+        Dict mapping semester -> list of remaining course dicts
+    """
+    filtered = {}
+    for sem, courses in courses_left.items():
+        filtered[sem] = [
+            course for course in courses
+            if course.get("type") == "Core"
+            or offerings.offered_in_planner_semester(course["code"], sem)
+        ]
+    return filtered
+
+
+def spread_over_horizon(courses_left: dict, last_semester: int, offerings: OfferingIndex) -> dict:
+    """
+    Make every remaining course available in every semester up to
+    last_semester in which it can run, not only its recommended one.
+    
+    A course can run in its recommended semester and in any semester whose
+    parity it has been offered in (or, without offering history, the parity
+    of its recommended semester). This lets the solver pull courses earlier
+    to graduate sooner, or push them later for a student who is behind.
+    
+    Args:
+        courses_left: Remaining courses by semester
+        last_semester: Last semester of the planning horizon
+        offerings: Offering-history index
+    
+    Returns:
+        Dict mapping every semester in [current, last_semester] -> list of course dicts
+    """
+    home = {}
+    for sem in sorted(courses_left):
+        for course in courses_left[sem]:
+            home.setdefault(course["code"], (sem, course))
+    
+    first = min(courses_left, default=1)
+    last = max(last_semester, max(courses_left, default=first))
+    spread = {sem: [] for sem in range(first, last + 1)}
+    for code, (home_sem, course) in home.items():
+        known = offerings.is_known(code)
+        for sem in spread:
+            if sem == home_sem or (
+                offerings.offered_in_planner_semester(code, sem) if known
+                else sem % 2 == home_sem % 2
+            ):
+                spread[sem].append(course)
+    return spread
+
+
+def horizon_lower_bound(courses_left: dict, user: UserData, credits_done: float,
+                        completed_courses: set) -> int:
+    """
+    Earliest semester the student could possibly finish in.
+    
+    The larger of the longest chain of remaining core prerequisites (one
+    semester per link) and the remaining credits at max_credits per semester.
+    
+    Args:
+        courses_left: Remaining courses by semester
+        user: User data (current semester, credit limit)
+        credits_done: Credits already completed
+        completed_courses: Set of already completed course codes
+    
+    Returns:
+        Planner semester number
+    """
+    cores = {
+        course["code"]: course for courses in courses_left.values()
+        for course in courses if course.get("type") == "Core"
+    }
+    depth = {}
+    
+    def chain(code: str, visiting: frozenset = frozenset()) -> int:
+        # Completed and non-core prerequisites do not lengthen the chain
+        if code in completed_courses or code not in cores or code in visiting:
+            return 0
+        if code not in depth:
+            paths = cores[code].get("prereqs_parsed") or [[]]
+            depth[code] = 1 + min(
+                max((chain(p, visiting | {code}) for p in path), default=0) for path in paths
+            )
+        return depth[code]
+    
+    longest_chain = max((chain(code) for code in cores), default=0)
+    remaining = CONFIG["TOTAL_TARGET_CREDITS"] - credits_done
+    by_credits = math.ceil(remaining / user.max_credits) if remaining > 0 else 0
+    return user.current_semester - 1 + max(longest_chain, by_credits, 1)
+
+
+def prerequisite_violations(plan: dict[int, list[str]], all_courses: dict,
+                            completed_courses: set) -> list[tuple[int, str]]:
+    """
+    Placed courses whose prerequisites the plan doesn't meet.
+    
+    A course is met by a prerequisite path whose courses are all completed
+    or placed in an earlier semester. As in
+    DegreePlannerModel.add_prerequisite_constraints, courses the plan
+    doesn't place at all are left to the student.
+    
+    Args:
+        plan: {semester: [course codes]}
+        all_courses: Course catalog
+        completed_courses: Set of already completed course codes
+    
+    Returns:
+        (semester, code) of every violating placement
+    """
+    placed_in = {code: sem for sem, codes in plan.items() for code in codes}
+    violations = []
+    for sem, codes in sorted(plan.items()):
+        for code in codes:
+            paths = parse_prereqs(all_courses.get(code, {}).get("prereqs", ""))
+            missing = [
+                [p for p in path if p not in completed_courses and placed_in.get(p, sem) >= sem]
+                for path in paths
+            ]
+            if paths and not any(all(p not in placed_in for p in path) for path in missing):
+                violations.append((sem, code))
+    return violations
+
+
+def find_shortest_horizon(planner: DegreePlannerModel, lower: int, upper: int,
+                          time_limit: float | None = None,
+                          num_workers: int | None = None) -> tuple[cp_model.CpSolver, int, int | None, dict]:
+    """
+    Search upward from lower for the first horizon with a feasible plan.
+    
+    The model is built once (with add_horizon_literals); each candidate
+    horizon is a re-solve of the same model under different assumptions,
+    warm-started from the current hint. A feasible solution becomes the
+    hint for any later solve.
+    
+    A horizon is only passed over once it is proven INFEASIBLE. A solve that
+    runs out of time (UNKNOWN) ends the search with that status, so a
+    timeout never turns into a later graduation semester reported as the
+    earliest. time_limit bounds the whole search: each solve gets what is
+    left of it.
+    
+    Returns:
+        Tuple of (solver, status, horizon or None, {horizon: status name}
+        of every solve made)
+    """
+    deadline = time.monotonic() + time_limit if time_limit is not None else None
+    solver, status, statuses = None, cp_model.UNKNOWN, {}
+    for horizon in range(lower, upper + 1):
+        remaining = None
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 and statuses:
+                return solver, cp_model.UNKNOWN, None, statuses
+        planner.set_horizon(horizon)
+        solver, status = solve_plan(planner, remaining, num_workers)
+        statuses[horizon] = solver.StatusName(status)
+        if status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            planner.set_hints({key: solver.Value(var) for key, var in planner.get_course_vars().items()})
+            return solver, status, horizon, statuses
+        if status != cp_model.INFEASIBLE:
+            break
+    return solver, status, None, statuses
+
+
+def recommended_hint(courses_left: dict) -> dict:
+    """Hint each remaining core at its first recommended semester."""
+    hint, seen = {}, set()
+    for sem in sorted(courses_left):
+        for course in courses_left[sem]:
+            if course.get("type") == "Core" and course["code"] not in seen:
+                seen.add(course["code"])
+                hint[(sem, course["code"])] = 1
+    return hint
+
+
+def rank_elective_candidates(courses_left: dict, preferences: dict,
+                             neighbours: NeighbourTable,
+                             max_candidates: int | None = None) -> tuple[dict, dict]:
+    """
+    Presolve step: order elective candidates by similarity to the student's preferences.
+    
+    Within each semester, the candidates of each elective type (DE, HUL2XX,
+    HUL3XX) are sorted by NeighbourTable.preference_scores. If max_candidates
+    is set, only that many are kept per type - but only for types where
+    some candidate relates to a preference, so an unranked pool is never
+    cut arbitrarily. Core courses are untouched.
+    
+    Args:
+        courses_left: Remaining courses by semester
+        preferences: Dict mapping course code -> weight (UserData.preferences)
+        neighbours: Similar-course table
+        max_candidates: Optional cap on candidates per type and semester
+    
+    Returns:
+        Tuple of (courses_left, scores) where scores maps every elective
+        candidate code to its preference score
+    """
+    electives = {
+        course["code"] for courses in courses_left.values()
+        for course in courses if course.get("type") != "Core"
+    }
+    scores = neighbours.preference_scores(preferences, electives)
+    
+    ranked = {}
+    for sem, courses in courses_left.items():
+        by_type = {}
+        for course in courses:
+            by_type.setdefault(course.get("type"), []).append(course)
+        
+        ranked[sem] = list(by_type.pop("Core", []))
+        for ctype, candidates in by_type.items():
+            candidates = sorted(candidates, key=lambda c: -scores[c["code"]])
+            if max_candidates and scores[candidates[0]["code"]] > 0:
+                candidates = candidates[:max_candidates]
+            ranked[sem].extend(candidates)
+    
+    return ranked, scores
+
+
+def group_interchangeable(courses_left: dict, slot_index, overlap_list: list[str],
+                          scores: dict | None = None, exclude=()) -> tuple[dict, dict]:
+    """
+    Presolve step: merge interchangeable elective candidates into classes.
+    
+    Two electives are interchangeable when no constraint or objective term
+    can tell them apart: same type, credits and preference weight, no
+    prerequisites, not a prerequisite of any candidate, not in the overlap
+    list, lab or lecture in the same slots, and candidates in the same
+    semesters. Each class of two or more becomes one entry per semester
+    (with "members", best preference first), which the model plans as a
+    count instead of one BoolVar per course; extract_semester_plan then
+    hands out the members.
+    
+    Candidates listed twice in one semester are left alone, since the model
+    counts such a candidate twice.
+    
+    Args:
+        courses_left: Remaining courses by semester
+        slot_index: load_slot_index() output
+        overlap_list: Department overlap list (parse_overlaps)
+        scores: Elective preference scores (rank_elective_candidates)
+        exclude: Codes to keep as individual variables (e.g. fixed courses)
+    
+    Returns:
+        Tuple of (courses_left, scores), scores extended with each class's weight
+    """
+    scores = dict(scores or {})
+    scale = CONFIG["PREFERENCE_SCALE"]
+    individual = set(overlap_list) | set(exclude)  # codes that keep their own variables
+    candidate_sems, courses = {}, {}
+    for sem in sorted(courses_left):
+        for course in courses_left[sem]:
+            for path in course.get("prereqs_parsed") or []:
+                individual.update(path)
+            if course.get("type") != "Core" and not course.get("placeholder"):
+                candidate_sems.setdefault(course["code"], []).append(sem)
+                courses.setdefault(course["code"], course)
+    
+    slots = {}
+    for slot_sem, slot_table in slot_index.items():
+        for slot, codes in slot_table.items():
+            for code in codes:
+                slots.setdefault(code, []).append((slot_sem, slot))
+    
+    classes = {}
+    for code, sems in candidate_sems.items():
+        course = courses[code]
+        if code in individual or course.get("prereqs_parsed") or len(sems) != len(set(sems)):
+            continue
+        key = (
+            course.get("type"), int(course["credits"] * CONFIG["CREDIT_SCALE"]),
+            int(round(scores.get(code, 0) * scale)), len(code) > 2 and code[2] == "P",
+            tuple(sorted(slots.get(code, ()))), tuple(sems),
+        )
+        classes.setdefault(key, []).append(course)
+    
+    grouped = {sem: list(courses) for sem, courses in courses_left.items()}
+    for (ctype, _, _, _, _, sems), members in classes.items():
+        if len(members) < 2:
+            continue
+        members = sorted(members, key=lambda c: (-scores.get(c["code"], 0), c["code"]))
+        entry = {
+            "code": f"{ctype}:{members[0]['code']}+{len(members) - 1}",
+            "name": PLACEHOLDER_NAMES.get(ctype, ctype),
+            "credits": members[0]["credits"],
+            "prereqs": "",
+            "prereqs_parsed": [],
+            "type": ctype,
+            "members": members,
+        }
+        scores[entry["code"]] = scores.get(members[0]["code"], 0)
+        codes = {member["code"] for member in members}
+        for sem in sems:
+            grouped[sem] = [c for c in grouped[sem] if c["code"] not in codes]
+            grouped[sem].append(entry)
+    return grouped, scores
+
+
 def calculate_credits_done(user: UserData) -> float:
     """Calculate total credits already completed."""
     credits_done = 0
@@ -166,8 +552,222 @@ def calculate_credits_done(user: UserData) -> float:
     return credits_done
 
 
+def build_plan_model(user: UserData, department: dict, courses_left: dict,
+                     preference_scores: dict | None = None,
+                     variable_horizon: bool = False,
+                     fixed: dict | None = None,
+                     slot_index=None,
+                     group_electives: bool | None = None) -> tuple[DegreePlannerModel, float]:
+    """
+    Build the CP-SAT model for a student's remaining courses.
+    
+    Args:
+        user: User data with completion info and credit limits
+        department: Department structure (for its overlap list)
+        courses_left: Remaining courses by semester
+        preference_scores: Optional elective scores for the objective
+            (see rank_elective_candidates)
+        variable_horizon: Add per-semester horizon literals so the model can
+            be re-solved for different horizons (see find_shortest_horizon)
+        fixed: Optional (sem, code) -> 0/1 assignments emitted as constants
+        slot_index: Slot index to plan against (default load_slot_index())
+        group_electives: Plan interchangeable electives as counts (see
+            group_interchangeable); defaults to CONFIG["GROUP_INTERCHANGEABLE"]
+    
+    Returns:
+        Tuple of (planner model, credits already done)
+    """
+    if slot_index is None:
+        slot_index = load_slot_index()
+    overlap_list = parse_overlaps(department.get("overlaps", ""))
+    if group_electives is None:
+        group_electives = CONFIG["GROUP_INTERCHANGEABLE"]
+    if group_electives:
+        courses_left, preference_scores = group_interchangeable(
+            courses_left, slot_index, overlap_list, preference_scores,
+            exclude={code for _, code in fixed or ()},
+        )
+    
+    planner = DegreePlannerModel(CONFIG, department.get("code", ""))
+    planner.create_course_variables(courses_left, fixed)
+    if variable_horizon:
+        planner.add_horizon_literals(courses_left)
+    
+    planner.add_semester_credit_constraints(courses_left, user.min_credits, user.max_credits)
+    
+    credits_done = calculate_credits_done(user)
+    planner.add_total_credit_constraint(courses_left, credits_done)
+    planner.add_hul_limit_constraint(courses_left)
+    
+    # Build completed courses set
+    all_completed = set(user.completed_corecourses)
+    all_completed.update(user.completed_hul)
+    all_completed.update(user.completed_DE)
+    
+    planner.add_prerequisite_constraints(courses_left, all_completed, strict=variable_horizon)
+    planner.add_core_course_constraint(courses_left)
+    planner.add_elective_once_constraint(courses_left)
+    
+    planner.add_overlap_constraints(courses_left, overlap_list)
+    
+    planner.add_slotting_constraints(courses_left, slot_index)
+    
+    planner.add_elective_preference_objective(courses_left, preference_scores or {})
+    
+    return planner, credits_done
+
+
+def build_greedy_plan(user: UserData, department: dict, courses_left: dict, credits_done: float,
+                      preference_scores: dict | None = None,
+                      variable_horizon: bool = False, slot_index=None) -> GreedyPlan:
+    """
+    Run the greedy planner with the same constraints build_plan_model adds.
+    
+    Args:
+        user: User data with completion info and credit limits
+        department: Department structure (for its overlap list)
+        courses_left: Remaining courses by semester
+        credits_done: Credits already completed
+        preference_scores: Optional elective scores
+        variable_horizon: Whether trailing semesters may stay empty
+        slot_index: Slot index to plan against (default load_slot_index())
+    
+    Returns:
+        GreedyPlan (feasible, or with the reason it failed)
+    """
+    completed = set(user.completed_corecourses) | set(user.completed_hul) | set(user.completed_DE)
+    return greedy_plan(
+        courses_left, completed,
+        remaining_credits=CONFIG["TOTAL_TARGET_CREDITS"] - credits_done,
+        min_credits=user.min_credits, max_credits=user.max_credits,
+        max_hul=CONFIG["MAX_HUL_PER_SEM"], scale=CONFIG["CREDIT_SCALE"],
+        overlap_list=parse_overlaps(department.get("overlaps", "")),
+        slot_index=slot_index if slot_index is not None else load_slot_index(),
+        scores=preference_scores,
+        variable_horizon=variable_horizon,
+    )
+
+
+def plan_degree(user: UserData, department: dict, selected_courses: dict,
+                offerings: OfferingIndex, neighbours: NeighbourTable | None = None,
+                time_limit: float | None = None, num_workers: int | None = None,
+                shortest: bool = False, preview: bool = False, slot_index=None) -> dict:
+    """
+    Plan a student's remaining semesters for one department, without printing
+    a report (what main() does step by step).
+    
+    The greedy planner runs first. Its plan is the solver's hint (and, when
+    searching for the shortest horizon, an upper bound on it), and is
+    returned as-is if the solver runs out of time without a solution.
+    
+    Args:
+        user: User data; user.core_courses should be selected_courses
+        department: Department structure
+        selected_courses: build_selected_courses output for the department
+        offerings: Offering-history index
+        neighbours: Similar-course table, used when user.preferences is set
+        time_limit: Optional solver time limit in seconds (for the whole
+            horizon search when shortest)
+        num_workers: Optional number of CP-SAT search workers
+        shortest: Search for the earliest feasible graduation semester
+            (courses may move between semesters) instead of following the
+            recommended semester of each course
+        preview: Return the greedy plan only, without solving
+        slot_index: Slot index to plan against (default load_slot_index())
+    
+    Returns:
+        Dict with status, feasibility, credit totals, semesters needed,
+        the plan as {semester: [course codes]} and, when shortest, the
+        status of each horizon tried ({semester: status name})
+    """
+    last_semester = degree_length(department, user)
+    courses_left = build_courses_left(selected_courses, user, last_semester)
+    courses_left = filter_courses_by_offering(courses_left, offerings)
+    
+    preference_scores = {}
+    if user.preferences and neighbours is not None:
+        courses_left, preference_scores = rank_elective_candidates(
+            courses_left, user.preferences, neighbours, CONFIG["MAX_ELECTIVE_CANDIDATES"]
+        )
+    
+    credits_done = calculate_credits_done(user)
+    lower_bound = None
+    upper = last_semester + CONFIG["EXTRA_SEMESTERS"]
+    if shortest:
+        hint = recommended_hint(courses_left)
+        completed = set(user.completed_corecourses) | set(user.completed_hul) | set(user.completed_DE)
+        lower_bound = horizon_lower_bound(courses_left, user, credits_done, completed)
+        courses_left = spread_over_horizon(courses_left, upper, offerings)
+    
+    greedy = build_greedy_plan(user, department, courses_left, credits_done,
+                               preference_scores, variable_horizon=shortest, slot_index=slot_index)
+    
+    solver, solves, horizons = None, 0, {}
+    feasible, plan = greedy.feasible, greedy.plan
+    status_name = "GREEDY" if greedy.feasible else "GREEDY_FAILED"
+    if not preview:
+        planner, _ = build_plan_model(user, department, courses_left, preference_scores,
+                                      variable_horizon=shortest, slot_index=slot_index)
+        if greedy.feasible:
+            planner.set_hints(greedy.assignment())
+        elif shortest:
+            planner.set_hints(hint)
+        
+        if shortest:
+            if greedy.feasible:
+                upper = max(greedy.horizon, lower_bound)
+            solver, status, _, horizons = find_shortest_horizon(planner, lower_bound, upper,
+                                                                time_limit, num_workers)
+            solves = len(horizons)
+        else:
+            solver, status = solve_plan(planner, time_limit, num_workers)
+            solves = 1
+        
+        if solver is None:  # the lower bound is past the last semester: nothing to solve
+            feasible, plan, status_name = False, {}, "INFEASIBLE"
+        elif status in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            feasible, plan = True, extract_semester_plan(solver, planner, courses_left)
+            status_name = solver.StatusName(status)
+        elif status == cp_model.UNKNOWN and greedy.feasible:
+            status_name = "GREEDY_FALLBACK"  # out of time; the greedy plan is still valid
+        else:
+            feasible, plan = False, {}
+            status_name = solver.StatusName(status)
+    
+    plan = {sem: [c["code"] for c in plan[sem]] for sem in sorted(plan) if plan[sem]}
+    last_planned = max(plan, default=None)
+    return {
+        "dept": department["code"],
+        "name": department.get("name", department["code"]),
+        "status": status_name,
+        "feasible": feasible,
+        "credits_done": credits_done,
+        "remaining_credits": CONFIG["TOTAL_TARGET_CREDITS"] - credits_done,
+        "semesters_needed": last_planned - user.current_semester + 1 if last_planned else None,
+        "graduation_semester": last_planned,
+        "lower_bound": lower_bound,
+        "solves": solves,
+        "horizons": horizons,
+        "greedy_feasible": greedy.feasible,
+        "greedy_reason": greedy.reason,
+        "plan": plan,
+        "solve_seconds": round(solver.WallTime(), 3) if solver else 0.0,
+    }
+
+
+def parse_preference(text: str) -> tuple[str, float]:
+    """"ELL409" or "ELL784:0.5" -> (code, weight); the weight defaults to 1."""
+    code, _, weight = text.partition(":")
+    return code.strip().upper(), float(weight) if weight else 1.0
+
+
 def main():
     """Main entry point for the degree planner."""
+    parser = argparse.ArgumentParser(description="Plan the sample EE1 student's remaining semesters")
+    parser.add_argument("--prefer", action="append", default=[], type=parse_preference,
+                        help="CODE[:WEIGHT] elective to plan towards (repeatable)")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s", stream=sys.stdout)
     # Load data from JSON files
     print("📚 Loading course data...")
     all_courses = load_courses()
@@ -177,8 +777,11 @@ def main():
     print(f"✅ Loaded {len(all_courses)} courses")
     print(f"✅ Loaded department: {department['name']}")
     
+    offerings = load_offering_index()
+    print(f"✅ Loaded offering history for {len(offerings.terms)} terms")
+    
     # Build selected courses
-    selected_courses = build_selected_courses(department, all_courses)
+    selected_courses = build_selected_courses(department, all_courses, offerings)
     
     # Save department courses
     output_file = f"{dept_code}_courses_data.json"
@@ -194,12 +797,23 @@ def main():
             'ELL101', 'PYL101', 'MCP100', 'MTL100', 'COL100', 'PYP100', 'MCP101',
             'APL100', 'CML101', 'MTL101', 'CMP100', 'ELL205', 'ELL203', 'ELL201',
             'COL106', 'ELL202', 'ELP101'
-        ]
+        ],
+        preferences=dict(args.prefer)
     )
     user.print_summary(debug=True)
     
     # Build remaining courses
-    courses_left = build_courses_left(selected_courses, user)
+    last_semester = degree_length(department, user)
+    courses_left = build_courses_left(selected_courses, user, last_semester)
+    courses_left = filter_courses_by_offering(courses_left, offerings)
+    
+    # Rank (and trim) elective pools by similarity to the student's preferences
+    preference_scores = {}
+    if user.preferences:
+        courses_left, preference_scores = rank_elective_candidates(
+            courses_left, user.preferences, load_neighbour_table(),
+            CONFIG["MAX_ELECTIVE_CANDIDATES"]
+        )
     
     # Save courses_left
     save_json(courses_left, "courses_left.json")
@@ -213,48 +827,34 @@ def main():
         core_count = sum(1 for c in courses_left[sem] if c.get("type") == "Core")
         print(f"  Semester {sem}: {len(courses_left[sem])} courses ({core_count} Core, {hul_count} HUL, {de_count} DE)")
     
+    # Let courses move between semesters, up to a few semesters past the nominal length
+    upper = last_semester + CONFIG["EXTRA_SEMESTERS"]
+    hint = recommended_hint(courses_left)
+    courses_left = spread_over_horizon(courses_left, upper, offerings)
+    
     # Build and solve constraint model
     print("\n🔧 Building constraint model...")
-    planner = DegreePlannerModel(CONFIG)
-    planner.create_course_variables(courses_left)
-    
-    # Add constraints
-    planner.add_semester_credit_constraints(courses_left, user.min_credits, user.max_credits)
-    
-    credits_done = calculate_credits_done(user)
+    planner, credits_done = build_plan_model(user, department, courses_left, preference_scores,
+                                             variable_horizon=True)
+    planner.set_hints(hint)
     print(f"Credits done: {credits_done}")
-    
-    planner.add_total_credit_constraint(courses_left, credits_done)
-    planner.add_hul_limit_constraint(courses_left)
-    
-    # Build completed courses set
-    all_completed = set(user.completed_corecourses)
-    all_completed.update(user.completed_hul)
-    all_completed.update(user.completed_DE)
-    
-    planner.add_prerequisite_constraints(courses_left, all_completed)
-    planner.add_core_course_constraint(courses_left)
-    
-    # Add overlap constraints
-    overlap_string = department.get("overlaps", "")
-    overlap_list = parse_overlaps(overlap_string)
-    planner.add_overlap_constraints(courses_left, overlap_list)
-    print("Overlap constraints added")
-
-    #ADD slotting constraints 
-    planner.add_slotting_constraints(courses_left)
-    print("Slotting constraints added")
+    print("Constraints added (credits, HUL, prerequisites, core, overlap, slotting)")
     
     # Print pre-solve debug info
     remaining_target = (CONFIG["TOTAL_TARGET_CREDITS"] - credits_done) * CONFIG["CREDIT_SCALE"]
     print_feasibility_check(
         courses_left, credits_done, remaining_target,
-        user.min_credits, user.max_credits, CONFIG["CREDIT_SCALE"]
+        user.min_credits, user.max_credits, CONFIG["CREDIT_SCALE"],
+        offerings
     )
     
-    # Solve
-    print("\n🧮 Solving...")
-    solver, status = solve_plan(planner)
+    # Solve for the earliest feasible graduation semester
+    all_completed = set(user.completed_corecourses) | set(user.completed_hul) | set(user.completed_DE)
+    lower = horizon_lower_bound(courses_left, user, credits_done, all_completed)
+    print(f"\n🧮 Solving (graduation no earlier than semester {lower}, at most {upper})...")
+    solver, status, horizon, horizons = find_shortest_horizon(planner, lower, upper)
+    if horizon is not None:
+        print(f"Earliest graduation: semester {horizon} ({len(horizons)} solve(s))")
     
     # Print results
     success = print_solver_status(
@@ -0,0 +1,260 @@
+"""
+Re-plan a few semesters of an existing plan, keeping the rest as it is.
+
+A student with a plan who swaps one elective, or moves a course, pins the
+(semester, course) assignments they want and names a window of semesters
+that may change. Outside the window every semester keeps exactly the
+courses of the current plan: only those courses get variables there, and
+they are created as constants (DegreePlannerModel.create_course_variables
+with fixed=...), so CP-SAT only searches the window. If no plan fits the
+window it is widened by a semester on each side, up to the whole horizon.
+
+Usage:
+    python replan.py --dept EE1 --semester 4 --completed ELL101,PYL101 \\
+        --pin 5:ELL409 --window 5:6 [--plan plan.json]
+"""
+
+import argparse
+import json
+import time
+
+from ortools.sat.python import cp_model
+
+from catalog import get_catalog
+from course_neighbours import NeighbourTable, load_neighbour_table
+from planner import (
+    CONFIG, build_courses_left, build_plan_model, build_selected_courses, degree_length,
+    filter_courses_by_offering, plan_degree, rank_elective_candidates, spread_over_horizon,
+)
+from slotting.offerings import OfferingIndex
+from solver import extract_semester_plan, solve_plan
+from user import UserData
+from what_if import check_current_semester, student_for_department
+
+# Per-solve limit; a window re-plan should answer while the student edits
+TIME_LIMIT = 5.0
+
+
+def apply_pins(plan: dict[int, list[str]], pinned: list[tuple[int, str]]) -> dict[int, list[str]]:
+    """
+    The plan with every pinned course moved to its pinned semester.
+
+    Args:
+        plan: Current plan as {semester: [course codes]}
+        pinned: (semester, course code) assignments to keep
+
+    Returns:
+        New plan; a pinned course is removed from any other semester
+    """
+    pinned_codes = {code for _, code in pinned}
+    pinned_plan = {
+        int(sem): [code for code in codes if code not in pinned_codes] for sem, codes in plan.items()
+    }
+    for sem, code in pinned:
+        pinned_plan.setdefault(sem, []).append(code)
+    return pinned_plan
+
+
+def neighbourhood(courses_left: dict, plan: dict[int, list[str]], window: tuple[int, int],
+                  pinned: list[tuple[int, str]]) -> tuple[dict, dict]:
+    """
+    Restrict the candidates to the window around a fixed plan.
+
+    Args:
+        courses_left: Candidates by semester over the whole horizon
+            (spread_over_horizon output)
+        plan: apply_pins() result
+        window: (first, last) semester that may change, inclusive
+        pinned: (semester, course code) assignments to keep
+
+    Returns:
+        Tuple of (courses_left, fixed) where fixed maps (sem, code) -> 1 for
+        every course planned outside the window and every pin
+
+    Raises:
+        ValueError: for a planned or pinned course that is no candidate at all
+    """
+    first, last = window
+    by_code = {}
+    for courses in courses_left.values():
+        for course in courses:
+            by_code.setdefault(course["code"], course)
+    for sem, codes in plan.items():
+        for code in codes:
+            if code not in by_code:
+                raise ValueError(f"{code} (semester {sem}) is not a remaining course of this programme")
+
+    outside = {
+        code for sem, codes in plan.items() if not first <= sem <= last for code in codes
+    }
+    restricted, fixed = {}, {}
+    for sem, courses in courses_left.items():
+        if first <= sem <= last:
+            restricted[sem] = [course for course in courses if course["code"] not in outside]
+        else:
+            planned = set(plan.get(sem, ()))
+            restricted[sem] = [course for course in courses if course["code"] in planned]
+            # Kept even where the offering history says it doesn't run: it's the student's plan
+            missing = planned - {course["code"] for course in restricted[sem]}
+            restricted[sem].extend(by_code[code] for code in sorted(missing))
+            fixed.update({(sem, code): 1 for code in planned})
+
+    for sem, code in pinned:
+        if sem not in restricted:
+            raise ValueError(f"Semester {sem} is outside the planning horizon")
+        if not any(course["code"] == code for course in restricted[sem]):
+            restricted[sem].append(by_code[code])
+        fixed[(sem, code)] = 1
+    return restricted, fixed
+
+
+def widen(window: tuple[int, int], first: int, last: int) -> tuple[int, int] | None:
+    """The window one semester larger on each side within [first, last], or None if it covers it."""
+    if window[0] <= first and window[1] >= last:
+        return None
+    return max(window[0] - 1, first), min(window[1] + 1, last)
+
+
+def replan(user: UserData, department: dict, selected_courses: dict, offerings: OfferingIndex,
+           plan: dict[int, list[str]], pinned: list[tuple[int, str]], window: tuple[int, int],
+           neighbours: NeighbourTable | None = None, time_limit: float | None = TIME_LIMIT,
+           num_workers: int | None = None, slot_index=None) -> dict:
+    """
+    Re-solve the semesters in the window, with the rest of the plan and the pins fixed.
+
+    Args:
+        user: User data; user.core_courses should be selected_courses
+        department: Department structure
+        selected_courses: build_selected_courses output for the department
+        offerings: Offering-history index
+        plan: Current plan as {semester: [course codes]} (plan_degree's "plan")
+        pinned: (semester, course code) assignments the new plan must keep
+        window: (first, last) semester that may change, inclusive
+        neighbours: Similar-course table, used when user.preferences is set
+        time_limit: Optional solver time limit in seconds (per solve)
+        num_workers: Optional number of CP-SAT search workers
+        slot_index: Slot index to plan against (default load_slot_index())
+
+    Returns:
+        Dict with status, feasibility, the new plan, the window it was found
+        in, how often the window was widened, the free variables of the
+        last solve and the solve time of all of them
+
+    Raises:
+        ValueError: for an empty window, or a course that cannot be planned
+    """
+    last_semester = degree_length(department, user) + CONFIG["EXTRA_SEMESTERS"]
+    courses_left = build_courses_left(selected_courses, user, degree_length(department, user))
+    courses_left = filter_courses_by_offering(courses_left, offerings)
+    preference_scores = {}
+    if user.preferences and neighbours is not None:
+        courses_left, preference_scores = rank_elective_candidates(
+            courses_left, user.preferences, neighbours, CONFIG["MAX_ELECTIVE_CANDIDATES"]
+        )
+    courses_left = spread_over_horizon(courses_left, last_semester, offerings)
+    first_semester = min(courses_left)
+
+    plan = apply_pins(plan, pinned)
+    requested = window = (max(window[0], first_semester), min(window[1], last_semester))
+    if window[0] > window[1]:
+        raise ValueError(f"Window {window} is outside semesters {first_semester}-{last_semester}")
+    hint = {(sem, code): 1 for sem, codes in plan.items() for code in codes}
+    widenings, solve_seconds, solver, status = 0, 0.0, None, cp_model.UNKNOWN
+    while window is not None:
+        restricted, fixed = neighbourhood(courses_left, plan, window, pinned)
+        planner, credits_done = build_plan_model(user, department, restricted, preference_scores,
+                                                 variable_horizon=True, fixed=fixed,
+                                                 slot_index=slot_index)
+        planner.set_hints(hint)
+        solver, status = solve_plan(planner, time_limit, num_workers)
+        solve_seconds += solver.WallTime()
+        if status != cp_model.INFEASIBLE:
+            break  # a plan, or out of time (a wider window would not solve faster)
+        window = widen(window, first_semester, last_semester)
+        widenings += window is not None
+
+    feasible = status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+    new_plan = {}
+    if feasible:
+        semester_plan = extract_semester_plan(solver, planner, restricted)
+        new_plan = {sem: [c["code"] for c in semester_plan[sem]]
+                    for sem in sorted(semester_plan) if semester_plan[sem]}
+    return {
+        "dept": department["code"],
+        "status": solver.StatusName(status),
+        "feasible": feasible,
+        "credits_done": credits_done,
+        "requested_window": list(requested),
+        "window": list(window) if window else None,
+        "widenings": widenings,
+        "free_variables": len(planner.get_course_vars()) - len(planner.fixed),
+        "plan": new_plan,
+        "solve_seconds": round(solve_seconds, 3),
+    }
+
+
+def replan_for_department(dept_code: str, completed: list[str], current_semester: int,
+                          plan: dict[int, list[str]] | None, pinned: list[tuple[int, str]],
+                          window: tuple[int, int], preferences: dict | None = None,
+                          time_limit: float | None = TIME_LIMIT) -> dict:
+    """
+    replan() for a student given as a flat completion list (see student_for_department).
+
+    Without a current plan, one is made first with plan_degree.
+
+    Raises:
+        FileNotFoundError: for an unknown department code
+        ValueError: current_semester is past the end of the programme; see replan()
+    """
+    start = time.perf_counter()
+    catalog = get_catalog()
+    department = catalog.get_department(dept_code)
+    check_current_semester(department, current_semester)
+    selected_courses = build_selected_courses(department, catalog.courses, catalog.offerings)
+    user = student_for_department(completed, department, selected_courses,
+                                  current_semester, preferences)
+    neighbours = load_neighbour_table() if preferences else None
+    if plan is None:
+        plan = plan_degree(user, department, selected_courses, catalog.offerings, neighbours,
+                           time_limit, shortest=True, slot_index=catalog.slot_index)["plan"]
+    result = replan(user, department, selected_courses, catalog.offerings, plan, pinned,
+                    window, neighbours, time_limit, slot_index=catalog.slot_index)
+    result["wall_seconds"] = round(time.perf_counter() - start, 3)
+    return result
+
+
+def parse_pin(text: str) -> tuple[int, str]:
+    sem, _, code = text.partition(":")
+    return int(sem), code.strip().upper()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-plan a window of semesters around pinned courses")
+    parser.add_argument("--dept", required=True, help="Department code")
+    parser.add_argument("--completed", default="", help="Comma-separated completed course codes")
+    parser.add_argument("--semester", type=int, required=True, help="Semester the student is about to start")
+    parser.add_argument("--plan", help="JSON file with the current plan {semester: [codes]} "
+                                       "(default: plan from scratch first)")
+    parser.add_argument("--pin", action="append", default=[], type=parse_pin,
+                        help="SEMESTER:CODE to keep (repeatable)")
+    parser.add_argument("--window", required=True, help="FIRST:LAST semesters that may change")
+    args = parser.parse_args()
+
+    completed = [code.strip() for code in args.completed.split(",") if code.strip()]
+    plan = None
+    if args.plan:
+        with open(args.plan) as f:
+            plan = {int(sem): codes for sem, codes in json.load(f).items()}
+    first, _, last = args.window.partition(":")
+    window = (int(first), int(last or first))
+
+    result = replan_for_department(args.dept, completed, args.semester, plan, args.pin, window)
+    print(f"{result['dept']}: {result['status']}, window {result['window']} "
+          f"(asked {result['requested_window']}, widened {result['widenings']}x), "
+          f"{result['free_variables']} free variables, {result['solve_seconds']:.3f}s solving")
+    for sem, codes in result["plan"].items():
+        print(f"  semester {sem}: {', '.join(codes)}")
+
+
+if __name__ == "__main__":
+    main()
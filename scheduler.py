@@ -0,0 +1,273 @@
+"""
+Priority scheduling and admission control for solver work in the API process.
+
+Interactive requests (a student waiting on a plan) and bulk work (cohort
+planning) share the machine's solver slots. SolverScheduler hands the slots
+out by priority class:
+
+  - each class has a bounded queue; a request that would overflow it is
+    rejected straight away with Overloaded (and a retry-after estimate)
+    instead of waiting behind work it can't catch up with
+  - each class has a concurrency limit, so bulk work can never hold every
+    slot
+  - a freed slot goes to the highest-priority class with a waiter under its
+    limit, FIFO within the class
+  - the time limit a solve gets shrinks as the queues grow (down to a
+    per-class floor), so a burst drains faster at the cost of plan quality
+
+The API installs one scheduler per worker process (install_scheduler).
+solve_plan then asks it for a slot around every in-process solve, and
+compare_departments for every department it sends to the process pool.
+CLIs and pool workers have none and solve directly.
+"""
+
+import contextlib
+import contextvars
+import math
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+
+from metrics import REGISTRY
+
+_WAIT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+_BUDGET_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 5, 10, 30)
+
+QUEUE_DEPTH = REGISTRY.gauge(
+    "degree_planner_scheduler_queue_depth", "Solver jobs waiting for a slot", ("priority",),
+)
+RUNNING = REGISTRY.gauge(
+    "degree_planner_scheduler_running", "Solver jobs holding a slot", ("priority",),
+)
+WAIT_SECONDS = REGISTRY.histogram(
+    "degree_planner_scheduler_wait_seconds", "Time from arrival to getting a solver slot",
+    _WAIT_BUCKETS, ("priority",),
+)
+BUDGET_SECONDS = REGISTRY.histogram(
+    "degree_planner_scheduler_budget_seconds", "Solver time limit granted with a slot",
+    _BUDGET_BUCKETS, ("priority",),
+)
+REJECTED = REGISTRY.counter(
+    "degree_planner_scheduler_rejected_total", "Solver jobs turned away, by reason (queue_full, timeout)",
+    ("priority", "reason"),
+)
+
+
+class Overloaded(Exception):
+    """A solver job was not admitted; retry_after is a suggested wait in seconds."""
+
+    MESSAGES = {"queue_full": "the {} solver queue is full", "timeout": "no {} solver slot came free in time"}
+
+    def __init__(self, priority: str, reason: str, retry_after: int):
+        super().__init__(f"{self.MESSAGES[reason].format(priority).capitalize()}; retry after {retry_after}s")
+        self.priority = priority
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+@dataclass(frozen=True)
+class PriorityClass:
+    """
+    Scheduling parameters of one class of solver work.
+
+    Args:
+        name: label used by callers and metrics
+        rank: lower ranks are served first
+        max_concurrent: slots the class may hold at once
+        max_queue: waiting jobs before new ones are rejected
+        max_wait: seconds a job may wait for a slot before it is rejected
+        min_budget: floor of the time-limit scale-down, as a share of the
+            time limit asked for
+        time_limit: time limit for jobs that ask for none
+    """
+    name: str
+    rank: int
+    max_concurrent: int
+    max_queue: int
+    max_wait: float
+    min_budget: float
+    time_limit: float
+
+
+def default_classes(capacity: int) -> dict[str, PriorityClass]:
+    """Interactive may use every slot; bulk at most half of them, so interactive always finds one soon."""
+    return {
+        "interactive": PriorityClass("interactive", 0, capacity, max_queue=8 * capacity,
+                                     max_wait=30.0, min_budget=0.25, time_limit=10.0),
+        "bulk": PriorityClass("bulk", 1, max(1, capacity // 2), max_queue=64 * capacity,
+                              max_wait=600.0, min_budget=0.1, time_limit=30.0),
+    }
+
+
+@dataclass
+class Ticket:
+    """A solver slot (once granted); time_limit is the budget to solve with."""
+    priority: str
+    arrived: float
+    time_limit: float | None = None
+    granted: float | None = None
+
+
+class SolverScheduler:
+    """
+    Hands out solver slots by priority class (see the module docstring).
+
+    Args:
+        capacity: concurrent solver jobs in total (default: CPU count)
+        classes: {name: PriorityClass}; default_classes(capacity) when None
+    """
+
+    def __init__(self, capacity: int | None = None, classes: dict[str, PriorityClass] | None = None):
+        self.capacity = capacity or os.cpu_count() or 1
+        self.classes = classes or default_classes(self.capacity)
+        self._ranked = sorted(self.classes.values(), key=lambda c: c.rank)
+        self._cond = threading.Condition()
+        self._queues = {name: deque() for name in self.classes}
+        self._running = {name: 0 for name in self.classes}
+        # Moving average of slot hold times, for retry-after estimates
+        self._hold = {name: 1.0 for name in self.classes}
+
+    def budget(self, priority: str, time_limit: float | None) -> float:
+        """
+        Time limit for a job granted now: the one asked for, scaled by
+        1 / (1 + waiting jobs per slot) but not below the class floor.
+        """
+        cls = self.classes[priority]
+        limit = time_limit if time_limit is not None else cls.time_limit
+        waiting = sum(len(queue) for queue in self._queues.values())
+        return limit * max(cls.min_budget, 1 / (1 + waiting / self.capacity))
+
+    def retry_after(self, priority: str) -> int:
+        """Seconds until the class's queue should have room again (at least 1)."""
+        cls = self.classes[priority]
+        seconds = len(self._queues[priority]) * self._hold[priority] / cls.max_concurrent
+        return max(1, math.ceil(seconds))
+
+    def _next_grant(self) -> Ticket | None:
+        """The waiter the next free slot goes to, if any may start now."""
+        if sum(self._running.values()) >= self.capacity:
+            return None
+        for cls in self._ranked:
+            queue = self._queues[cls.name]
+            if queue and self._running[cls.name] < cls.max_concurrent:
+                return queue[0]
+        return None
+
+    def acquire(self, priority: str = "interactive", time_limit: float | None = None) -> Ticket:
+        """
+        Wait for a solver slot.
+
+        Args:
+            priority: class name
+            time_limit: time limit the job would like (None: the class default)
+
+        Returns:
+            Granted Ticket; pass it to release() when the job is done
+
+        Raises:
+            Overloaded: the class queue is full, or the slot didn't come within max_wait
+            KeyError: unknown priority class
+        """
+        cls = self.classes[priority]
+        ticket = Ticket(priority, time.monotonic())
+        with self._cond:
+            queue = self._queues[priority]
+            if len(queue) >= cls.max_queue:
+                REJECTED.inc(priority, "queue_full")
+                raise Overloaded(priority, "queue_full", self.retry_after(priority))
+            queue.append(ticket)
+            QUEUE_DEPTH.set(len(queue), priority)
+            deadline = ticket.arrived + cls.max_wait
+            while self._next_grant() is not ticket:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    queue.remove(ticket)
+                    QUEUE_DEPTH.set(len(queue), priority)
+                    self._cond.notify_all()
+                    REJECTED.inc(priority, "timeout")
+                    raise Overloaded(priority, "timeout", self.retry_after(priority))
+                self._cond.wait(remaining)
+
+            queue.popleft()
+            self._running[priority] += 1
+            ticket.granted = time.monotonic()
+            ticket.time_limit = self.budget(priority, time_limit)
+            QUEUE_DEPTH.set(len(queue), priority)
+            RUNNING.set(self._running[priority], priority)
+            # Another class may be able to start too
+            self._cond.notify_all()
+
+        WAIT_SECONDS.observe(ticket.granted - ticket.arrived, priority)
+        BUDGET_SECONDS.observe(ticket.time_limit, priority)
+        return ticket
+
+    def release(self, ticket: Ticket):
+        """Give a granted slot back."""
+        held = time.monotonic() - ticket.granted
+        with self._cond:
+            self._running[ticket.priority] -= 1
+            self._hold[ticket.priority] = 0.8 * self._hold[ticket.priority] + 0.2 * held
+            RUNNING.set(self._running[ticket.priority], ticket.priority)
+            self._cond.notify_all()
+
+    @contextlib.contextmanager
+    def slot(self, priority: str = "interactive", time_limit: float | None = None):
+        """
+        acquire() ... release() around a block.
+
+        Yields:
+            The time limit to solve with
+        """
+        ticket = self.acquire(priority, time_limit)
+        try:
+            yield ticket.time_limit
+        finally:
+            self.release(ticket)
+
+    def stats(self) -> dict:
+        """Queue depth, running jobs and average hold time per class."""
+        with self._cond:
+            return {
+                name: {
+                    "queued": len(self._queues[name]),
+                    "running": self._running[name],
+                    "max_concurrent": cls.max_concurrent,
+                    "max_queue": cls.max_queue,
+                    "hold_seconds": round(self._hold[name], 3),
+                }
+                for name, cls in self.classes.items()
+            }
+
+
+_scheduler: SolverScheduler | None = None
+_scheduler_pid: int | None = None
+_priority: contextvars.ContextVar[str] = contextvars.ContextVar("solve_priority", default="interactive")
+
+
+def install_scheduler(scheduler: SolverScheduler | None) -> SolverScheduler | None:
+    """Route this process's solver work through scheduler (None to stop); returns the previous one."""
+    global _scheduler, _scheduler_pid
+    previous = get_scheduler()
+    _scheduler, _scheduler_pid = scheduler, os.getpid()
+    return previous
+
+
+def get_scheduler() -> SolverScheduler | None:
+    """The installed scheduler; None in other processes (e.g. forked pool workers)."""
+    return _scheduler if _scheduler_pid == os.getpid() else None
+
+
+@contextlib.contextmanager
+def solve_priority(priority: str):
+    """Run solver work started in this context (and threads started from it) in a priority class."""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_priority() -> str:
+    return _priority.get()
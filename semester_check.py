@@ -0,0 +1,164 @@
+"""
+Constant-time validation of one hand-edited semester, without the solver.
+
+Every course gets a bitmask of its slots per slot semester (bit i = the i-th
+slot name), computed once from the slot index. A semester then clashes iff
+two lectures, or two labs, share a bit — the same rule as
+DegreePlannerModel.add_slotting_constraints, where a lab (XXP code) and a
+lecture may share a slot. Credits use the model's scaled integers and the
+HUL cap the model's MAX_HUL_PER_SEM.
+"""
+
+from dataclasses import dataclass
+from typing import Iterable, Mapping
+
+from slotting.offerings import slot_semester
+
+# Courses the model types as HUL2XX / HUL3XX electives (and caps per semester)
+HUL_PREFIXES = ("HUL2", "HUL3")
+
+
+@dataclass(frozen=True)
+class SlotClash:
+    slot: str
+    kind: str                # "lecture" or "lab"
+    courses: tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class SemesterCheck:
+    """Outcome of SemesterChecker.check."""
+    semester: int
+    courses: tuple[str, ...]
+    credits: float
+    hul_courses: int
+    clashes: tuple[SlotClash, ...] = ()
+    unknown: tuple[str, ...] = ()     # codes not in the catalog
+    duplicates: tuple[str, ...] = ()  # codes listed more than once
+    violations: tuple[str, ...] = ()  # credit bounds and HUL cap
+
+    @property
+    def ok(self) -> bool:
+        return not (self.clashes or self.unknown or self.duplicates or self.violations)
+
+    def to_dict(self) -> dict:
+        return {
+            "semester": self.semester,
+            "ok": self.ok,
+            "courses": list(self.courses),
+            "credits": self.credits,
+            "hul_courses": self.hul_courses,
+            "clashes": [{"slot": c.slot, "kind": c.kind, "courses": list(c.courses)} for c in self.clashes],
+            "unknown": list(self.unknown),
+            "duplicates": list(self.duplicates),
+            "violations": list(self.violations),
+        }
+
+
+def is_lab(code: str) -> bool:
+    """Lab courses have a P as third character (ELP101), as in add_slotting_constraints."""
+    return len(code) > 2 and code[2] == "P"
+
+
+class SemesterChecker:
+    """
+    Precomputed slot bitmasks and scaled credits for every course.
+
+    Args:
+        courses: {code: course dict} as returned by load_courses()
+        slot_index: load_slot_index() output
+        scale: credit scale, as CONFIG["CREDIT_SCALE"]
+        max_hul: HUL courses allowed per semester, as CONFIG["MAX_HUL_PER_SEM"]
+    """
+
+    def __init__(self, courses: Mapping[str, Mapping], slot_index: Mapping, scale: int, max_hul: int):
+        self.scale = scale
+        self.max_hul = max_hul
+        self.credits = {code: int(float(course.get("credits") or 0) * scale) for code, course in courses.items()}
+        self.slot_names = {}
+        # slot semester -> {code: slot bitmask}
+        self.masks: dict[int, dict[str, int]] = {}
+        for slot_sem, slots in slot_index.items():
+            names = sorted(slots)
+            self.slot_names[slot_sem] = names
+            masks = self.masks[slot_sem] = {}
+            for bit, slot in enumerate(names):
+                for code in slots[slot]:
+                    masks[code] = masks.get(code, 0) | (1 << bit)
+
+    def check(self, semester: int, codes: Iterable[str], min_credits: float, max_credits: float) -> SemesterCheck:
+        """
+        Validate the courses planned for one semester.
+
+        Args:
+            semester: Planner semester (decides which slot table applies)
+            codes: Course codes in the semester
+            min_credits, max_credits: Per-semester credit bounds
+
+        Returns:
+            SemesterCheck; .ok is True when nothing is violated
+        """
+        masks = self.masks.get(slot_semester(semester), {})
+        credits = self.credits
+        seen = []
+        unknown = []
+        duplicates = []
+        total = hul = 0
+        lectures = labs = 0
+        lecture_clashes = lab_clashes = 0  # slot bits taken twice
+
+        for code in codes:
+            if code in seen:
+                duplicates.append(code)
+                continue
+            seen.append(code)
+            scaled = credits.get(code)
+            if scaled is None:
+                unknown.append(code)
+                continue
+            total += scaled
+            if code.startswith(HUL_PREFIXES):
+                hul += 1
+            mask = masks.get(code, 0)
+            if is_lab(code):
+                lab_clashes |= labs & mask
+                labs |= mask
+            else:
+                lecture_clashes |= lectures & mask
+                lectures |= mask
+
+        violations = []
+        if total < int(min_credits * self.scale):
+            violations.append(f"{total / self.scale:g} credits is below the minimum of {min_credits:g}")
+        if total > int(max_credits * self.scale):
+            violations.append(f"{total / self.scale:g} credits is above the maximum of {max_credits:g}")
+        if hul > self.max_hul:
+            violations.append(f"{hul} HUL courses is above the limit of {self.max_hul}")
+
+        return SemesterCheck(
+            semester=semester,
+            courses=tuple(seen),
+            credits=total / self.scale,
+            hul_courses=hul,
+            clashes=self._clashes(semester, seen, masks, lecture_clashes, lab_clashes)
+            if lecture_clashes or lab_clashes else (),
+            unknown=tuple(unknown),
+            duplicates=tuple(duplicates),
+            violations=tuple(violations),
+        )
+
+    def _clashes(self, semester: int, codes: list[str], masks: Mapping[str, int],
+                 lecture_bits: int, lab_bits: int) -> tuple[SlotClash, ...]:
+        """Spell out which courses share the clashing slots (only runs when there is a clash)."""
+        names = self.slot_names[slot_semester(semester)]
+        clashes = []
+        for kind, lab, bits in (("lecture", False, lecture_bits), ("lab", True, lab_bits)):
+            while bits:
+                bit = (bits & -bits).bit_length() - 1
+                bits &= bits - 1
+                sharing = tuple(
+                    code for code in codes
+                    if is_lab(code) == lab and masks.get(code, 0) >> bit & 1
+                )
+                clashes.append(SlotClash(names[bit], kind, sharing))
+        return tuple(clashes)
@@ -0,0 +1,143 @@
+"""
+Offering-history index built from every Courses_Offered_<year>_Sem<n>.csv file.
+
+Each course gets a compact bitset over the (year, semester) terms we have data
+for, plus per-parity offering frequencies derived from it. All lookups used by
+the planner ("offered in parity p?", "last offered", "offered in >= X% of
+years?") are constant time dictionary/bit operations.
+"""
+
+import csv
+import re
+from functools import lru_cache
+from pathlib import Path
+
+SLOTTING_DIR = Path(__file__).parent
+
+# Courses_Offered_2025_Sem1.csv -> year 2025, semester 1
+OFFERING_FILE_PATTERN = re.compile(r"Courses_Offered_(\d{4})_Sem(\d)\.csv$")
+
+# Section variants such as CVL100A / MCV390(B) collapse onto the catalog code
+COURSE_CODE_PATTERN = re.compile(r"^([A-Z]{3}\d{3})")
+
+
+def slot_semester(planner_sem: int) -> int:
+    """
+    Map a planner semester (1..10) onto the slot/offering semester.
+
+    Odd planner semesters use Sem1 (July-Dec) data, even ones use Sem2 (Jan-May).
+    """
+    return 1 if planner_sem % 2 == 1 else 2
+
+
+def find_offering_files(directory: Path = SLOTTING_DIR) -> list[tuple[int, int, Path]]:
+    """
+    List all offering CSVs in a directory.
+
+    Returns:
+        Sorted list of (year, semester, path) tuples
+    """
+    files = []
+    for csv_file in Path(directory).glob("Courses_Offered_*.csv"):
+        match = OFFERING_FILE_PATTERN.search(csv_file.name)
+        if match:
+            files.append((int(match.group(1)), int(match.group(2)), csv_file))
+    return sorted(files)
+
+
+def read_offered_codes(csv_file: Path) -> set[str]:
+    """
+    Read the set of course codes offered in one Courses_Offered CSV.
+
+    The files are per-department blocks ("Department :" line, header line,
+    rows) concatenated together, so rows are parsed individually and only the
+    "Course Name" column ("NAME-CODE") is used.
+    """
+    codes = set()
+    with open(csv_file, encoding="utf-8") as f:
+        for row in csv.reader(f):
+            if len(row) < 2 or "-" not in row[1]:
+                continue
+            code = row[1].rsplit("-", 1)[1].strip()
+            match = COURSE_CODE_PATTERN.match(code)
+            if match:
+                codes.add(match.group(1))
+    return codes
+
+
+class OfferingIndex:
+    """Per-course offering bitsets over (year, semester) terms."""
+
+    def __init__(self, offered_by_term: dict[tuple[int, int], set[str]]):
+        """
+        Build the index.
+
+        Args:
+            offered_by_term: Dict mapping (year, semester) -> set of course codes
+        """
+        self.terms = sorted(offered_by_term)
+        self.term_bit = {term: i for i, term in enumerate(self.terms)}
+
+        # Bit masks selecting all Sem1 / Sem2 terms, and how many years each covers
+        self.parity_mask = {1: 0, 2: 0}
+        for term, bit in self.term_bit.items():
+            self.parity_mask[term[1]] |= 1 << bit
+        self.years_by_parity = {p: mask.bit_count() for p, mask in self.parity_mask.items()}
+
+        self.bits = {}  # code -> int bitset over self.terms
+        for term, codes in offered_by_term.items():
+            bit = 1 << self.term_bit[term]
+            for code in codes:
+                self.bits[code] = self.bits.get(code, 0) | bit
+
+        # Derived, precomputed so every lookup stays O(1)
+        self.frequency = {}  # code -> {parity: fraction of years offered}
+        self.last_term = {}  # code -> (year, semester)
+        for code, bits in self.bits.items():
+            self.frequency[code] = {
+                p: (bits & mask).bit_count() / self.years_by_parity[p]
+                if self.years_by_parity[p] else 0.0
+                for p, mask in self.parity_mask.items()
+            }
+            self.last_term[code] = self.terms[bits.bit_length() - 1]
+
+    @classmethod
+    def from_directory(cls, directory: Path = SLOTTING_DIR) -> "OfferingIndex":
+        """Build the index from every offering CSV found in a directory."""
+        offered_by_term = {}
+        for year, semester, csv_file in find_offering_files(directory):
+            offered_by_term.setdefault((year, semester), set()).update(
+                read_offered_codes(csv_file)
+            )
+        return cls(offered_by_term)
+
+    def is_known(self, code: str) -> bool:
+        """True if the course was offered in at least one term we have data for."""
+        return code in self.bits
+
+    def offered_in_parity(self, code: str, parity: int) -> bool:
+        """True if the course was ever offered in Sem1 (parity=1) or Sem2 (parity=2)."""
+        return bool(self.bits.get(code, 0) & self.parity_mask.get(parity, 0))
+
+    def offered_in_planner_semester(self, code: str, planner_sem: int) -> bool:
+        """True if the course can be expected in the given planner semester."""
+        return self.offered_in_parity(code, slot_semester(planner_sem))
+
+    def offering_frequency(self, code: str, parity: int) -> float:
+        """Fraction of years (0..1) in which the course ran in the given parity."""
+        freq = self.frequency.get(code)
+        return freq.get(parity, 0.0) if freq else 0.0
+
+    def offered_at_least(self, code: str, parity: int, fraction: float) -> bool:
+        """True if the course ran in >= fraction of the years for that parity."""
+        return self.offering_frequency(code, parity) >= fraction
+
+    def last_offered(self, code: str) -> tuple[int, int] | None:
+        """Most recent (year, semester) the course was offered, or None."""
+        return self.last_term.get(code)
+
+
+@lru_cache(maxsize=1)
+def load_offering_index() -> OfferingIndex:
+    """Load (once) the offering index for the bundled slotting data."""
+    return OfferingIndex.from_directory(SLOTTING_DIR)
@@ -1,25 +1,22 @@
 import pandas as pd
-import re #to extract year and sem from courses offered csvs
+from functools import lru_cache
 from pathlib import Path
+from types import MappingProxyType
+
+from slotting.offerings import find_offering_files
 
 def load_slot_dataframe():
     BASE_DIR = Path(__file__).parent
     # Allowed slots
     allowed_slots = set("ABHJCDEFMKL") #just valid slot letters
 
-    csv_files = [
-    BASE_DIR / "Courses_Offered_2025_Sem1.csv",
-    BASE_DIR / "Courses_Offered_2025_Sem2.csv",
-]
+    # Slots come from the latest Courses_Offered_<year>_Sem<n>.csv of each semester
+    latest = {}
+    for year, semester, csv_file in find_offering_files(BASE_DIR):
+        latest[semester] = (str(year), str(semester), csv_file)
     all_dfs = []
 
-    for csv_file in csv_files:
-        # -------- Extract year & semester from filename --------
-        match = re.search(r"(\d{4})_Sem(\d)", csv_file.name)
-        year = match.group(1) if match else ""
-        semester = match.group(2) if match else ""
-
-
+    for year, semester, csv_file in latest.values():
         # Read CSV, skip first line (department header)
         df = pd.read_csv(csv_file, skiprows=1)
         
@@ -66,3 +63,23 @@ def load_slot_dataframe():
     slot_df = combined_df
     return slot_df
 
+
+def build_slot_index(slot_df) -> MappingProxyType:
+    """
+    Group the slot dataframe once into {semester: {slot: (course codes...)}}.
+
+    The result is immutable (read-only mappings of tuples) so it can be
+    shared between forked API workers and across solves.
+    """
+    index = {}
+    for (semester, slot), codes in slot_df.groupby(["Semester", "Slot Name"])["Course Code"]:
+        index.setdefault(int(semester), {})[slot] = tuple(codes)
+    return MappingProxyType({
+        semester: MappingProxyType(slots) for semester, slots in index.items()
+    })
+
+
+@lru_cache(maxsize=1)
+def load_slot_index() -> MappingProxyType:
+    """Load (once per process) the slot index for the bundled CSVs."""
+    return build_slot_index(load_slot_dataframe())
@@ -2,40 +2,164 @@
 Solver and output utilities for degree planning.
 """
 
+import contextlib
+import logging
+import threading
+
 from ortools.sat.python import cp_model
 from constraints import DegreePlannerModel
+from metrics import REGISTRY
+from scheduler import current_priority, get_scheduler
+
+logger = logging.getLogger(__name__)
+
+_SIZE_BUCKETS = (50, 100, 250, 500, 1000, 2500, 5000, 10000, 25000)
+_SEARCH_BUCKETS = (0, 10, 100, 1000, 10000, 100000, 1000000)
 
+SOLVES = REGISTRY.counter(
+    "degree_planner_solves_total", "CP-SAT solves by department and status",
+    ("department", "status"),
+)
+SOLVE_SECONDS = REGISTRY.histogram(
+    "degree_planner_solve_seconds", "CP-SAT wall time per solve",
+    (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30), ("department",),
+)
+MODEL_VARIABLES = REGISTRY.histogram(
+    "degree_planner_model_variables", "Variables in the model as built",
+    _SIZE_BUCKETS, ("department",),
+)
+MODEL_CONSTRAINTS = REGISTRY.histogram(
+    "degree_planner_model_constraints", "Constraints in the model as built",
+    _SIZE_BUCKETS, ("department",),
+)
+PRESOLVE_REMOVED = REGISTRY.histogram(
+    "degree_planner_presolve_removed_ratio",
+    "Share of the model's variables removed by presolve",
+    (0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1), ("department",),
+)
+BRANCHES = REGISTRY.histogram(
+    "degree_planner_solve_branches", "Search branches per solve", _SEARCH_BUCKETS, ("department",),
+)
+CONFLICTS = REGISTRY.histogram(
+    "degree_planner_solve_conflicts", "Search conflicts per solve", _SEARCH_BUCKETS, ("department",),
+)
 
-def solve_plan(planner_model: DegreePlannerModel) -> tuple[cp_model.CpSolver, int]:
+_capture = threading.local()
+
+
+def solve_plan(planner_model: DegreePlannerModel, time_limit: float | None = None,
+               num_workers: int | None = None) -> tuple[cp_model.CpSolver, int]:
     """
     Solve the degree planning model.
     
     Args:
         planner_model: The DegreePlannerModel with all constraints added
+        time_limit: Optional wall-clock limit in seconds
+        num_workers: Optional number of search workers (1 when solving
+            many models side by side in a process pool)
     
     Returns:
         Tuple of (solver, status)
+    
+    Raises:
+        scheduler.Overloaded: a scheduler is installed and turned the solve away
+    
+    With a scheduler installed (the API), the solve waits for a slot in the
+    current priority class and runs with the time limit it grants. A slot
+    is one core, so the solve then uses one search worker unless
+    num_workers asks for more.
     """
-    solver = cp_model.CpSolver()
-    status = solver.Solve(planner_model.get_model())
+    scheduler = get_scheduler()
+    slot = scheduler.slot(current_priority(), time_limit) if scheduler else contextlib.nullcontext(time_limit)
+    if scheduler is not None and num_workers is None:
+        num_workers = 1
+    with slot as time_limit:
+        solver = cp_model.CpSolver()
+        if time_limit is not None:
+            solver.parameters.max_time_in_seconds = time_limit
+        if num_workers is not None:
+            solver.parameters.num_workers = num_workers
+        status = solver.Solve(planner_model.get_model())
+    record_solve(solve_stats(planner_model, solver, status))
     return solver, status
 
 
+def solve_stats(planner_model: DegreePlannerModel, solver: cp_model.CpSolver, status: int) -> dict:
+    """
+    Size and search statistics of one solve.
+    
+    Presolve reductions are the model's variables minus those left in the
+    presolved model the solver searched (its Boolean and integer variables).
+    """
+    proto = planner_model.get_model().Proto()
+    response = solver.ResponseProto()
+    variables = len(proto.variables)
+    remaining = response.num_booleans + response.num_integers
+    return {
+        "department": planner_model.department,
+        "status": solver.StatusName(status),
+        "variables": variables,
+        "constraints": len(proto.constraints),
+        "presolve_removed": max(variables - remaining, 0),
+        "wall_seconds": response.wall_time,
+        "branches": response.num_branches,
+        "conflicts": response.num_conflicts,
+    }
+
+
+def record_solve(stats: dict):
+    """Add one solve_stats() result to the solver metrics (or to an active capture)."""
+    captured = getattr(_capture, "stats", None)
+    if captured is not None:
+        captured.append(stats)
+        return
+    
+    department = stats["department"]
+    SOLVES.inc(department, stats["status"])
+    SOLVE_SECONDS.observe(stats["wall_seconds"], department)
+    MODEL_VARIABLES.observe(stats["variables"], department)
+    MODEL_CONSTRAINTS.observe(stats["constraints"], department)
+    if stats["variables"]:
+        PRESOLVE_REMOVED.observe(stats["presolve_removed"] / stats["variables"], department)
+    BRANCHES.observe(stats["branches"], department)
+    CONFLICTS.observe(stats["conflicts"], department)
+
+
+@contextlib.contextmanager
+def capture_solves():
+    """
+    Collect the solve_stats of this thread's solves instead of recording them.
+    
+    Used in process-pool workers, whose metrics would otherwise stay in the
+    worker: the stats travel back with the result and the parent process
+    passes them to record_solve.
+    
+    Yields:
+        The list the stats are appended to
+    """
+    previous = getattr(_capture, "stats", None)
+    _capture.stats = []
+    try:
+        yield _capture.stats
+    finally:
+        _capture.stats = previous
+
+
 def print_solver_status(status: int, credits_done: float, remaining_credits: float, 
                         min_credits: float, max_credits: float, scale: float):
-    """Print the solver status with debugging info."""
+    """Log the solver status with debugging info."""
     if status == cp_model.OPTIMAL:
-        print("✅ Optimal solution found!")
+        logger.info("✅ Optimal solution found!")
     elif status == cp_model.FEASIBLE:
-        print("⚠️ Feasible solution found (not optimal)")
+        logger.info("⚠️ Feasible solution found (not optimal)")
     elif status == cp_model.INFEASIBLE:
-        print("❌ NO SOLUTION EXISTS - Constraints are impossible to satisfy!")
-        print("\n🔍 Debugging info:")
-        print(f"  - Completed credits: {credits_done}")
-        print(f"  - Remaining target: {remaining_credits / scale}")
-        print(f"  - User min/max per sem: {min_credits} - {max_credits}")
+        logger.warning("❌ NO SOLUTION EXISTS - Constraints are impossible to satisfy!")
+        logger.info("\n🔍 Debugging info:")
+        logger.info(f"  - Completed credits: {credits_done}")
+        logger.info(f"  - Remaining target: {remaining_credits / scale}")
+        logger.info(f"  - User min/max per sem: {min_credits} - {max_credits}")
     else:
-        print(f"❓ Unknown status: {status}")
+        logger.warning(f"❓ Unknown status: {status}")
     
     return status in [cp_model.OPTIMAL, cp_model.FEASIBLE]
 
@@ -53,15 +177,27 @@ def extract_semester_plan(solver: cp_model.CpSolver,
     
     Returns:
         Dict mapping semester -> list of selected course dicts
+    
+    A class of interchangeable electives planned n times in a semester
+    contributes its n best-preferred members not already used by an
+    earlier semester.
     """
     semester_plan = {}
     course_vars = planner_model.get_course_vars()
+    used_members = {}  # class code -> members handed out so far
     
-    for (sem, code), var in course_vars.items():
+    for (sem, code), var in sorted(course_vars.items(), key=lambda item: item[0][0]):
         if solver.Value(var):
             if sem not in semester_plan:
                 semester_plan[sem] = []
             
+            if (sem, code) in planner_model.classes:
+                used = used_members.get(code, 0)
+                count = solver.Value(var)
+                semester_plan[sem].extend(planner_model.classes[(sem, code)][used:used + count])
+                used_members[code] = used + count
+                continue
+            
             for course in courses_left[sem]:
                 if course["code"] == code:
                     semester_plan[sem].append(course)
@@ -71,9 +207,9 @@ def extract_semester_plan(solver: cp_model.CpSolver,
 
 
 def print_semester_plan(semester_plan: dict):
-    """Print the semester plan in a formatted way."""
+    """Log the semester plan in a formatted way."""
     for sem in sorted(semester_plan.keys()):
-        print(f"\n📘 Semester {sem}")
+        logger.info(f"\n📘 Semester {sem}")
         total_credits = 0
         
         for course in semester_plan[sem]:
@@ -84,41 +220,50 @@ def print_semester_plan(semester_plan: dict):
             ctype = course.get("type", "Unknown")
             
             total_credits += credits
-            print(f"  - {code}: {name} ({credits} credits, Type: {ctype}), Prerequisites: {prereqs}")
+            logger.info(f"  - {code}: {name} ({credits} credits, Type: {ctype}), Prerequisites: {prereqs}")
         
-        print(f"👉 Total Credits: {total_credits}")
+        logger.info(f"👉 Total Credits: {total_credits}")
 
 
 def print_feasibility_check(courses_left: dict, credits_done: float, 
                             remaining_target: float, min_credits: float, 
-                            max_credits: float, scale: float):
-    """Print pre-solve feasibility analysis."""
-    print("\n🔍 PRE-SOLVE DEBUG:")
-    print(f"Semesters to plan: {sorted(courses_left.keys())}")
-    print(f"Total credits already done: {credits_done}")
-    print(f"Remaining credits needed: {remaining_target / scale}")
-    print(f"Min/Max credits per semester: {min_credits} - {max_credits}")
+                            max_credits: float, scale: float, offerings=None):
+    """Log pre-solve feasibility analysis (optionally checked against offering history)."""
+    logger.info("\n🔍 PRE-SOLVE DEBUG:")
+    logger.info(f"Semesters to plan: {sorted(courses_left.keys())}")
+    logger.info(f"Total credits already done: {credits_done}")
+    logger.info(f"Remaining credits needed: {remaining_target / scale}")
+    logger.info(f"Min/Max credits per semester: {min_credits} - {max_credits}")
     
     num_future_sems = len(courses_left.keys())
     min_possible = num_future_sems * min_credits
     max_possible = num_future_sems * max_credits
     target_needed = remaining_target / scale
     
-    print("\n📊 Feasibility check:")
-    print(f"  Future semesters: {num_future_sems}")
-    print(f"  Possible credit range: {min_possible} - {max_possible}")
-    print(f"  Target needed: {target_needed}")
+    logger.info("\n📊 Feasibility check:")
+    logger.info(f"  Future semesters: {num_future_sems}")
+    logger.info(f"  Possible credit range: {min_possible} - {max_possible}")
+    logger.info(f"  Target needed: {target_needed}")
     
     if target_needed < min_possible:
-        print("  ❌ PROBLEM: Need too few credits (will exceed minimum)")
+        logger.warning("  ❌ PROBLEM: Need too few credits (will exceed minimum)")
     elif target_needed > max_possible:
-        print("  ❌ PROBLEM: Need too many credits (can't fit in max limits)")
+        logger.warning("  ❌ PROBLEM: Need too many credits (can't fit in max limits)")
     else:
-        print("  ✅ Feasible range")
+        logger.info("  ✅ Feasible range")
     
     # Count available courses per semester
     for sem in sorted(courses_left.keys()):
         total_available = sum(c["credits"] for c in courses_left[sem])
         core_credits = sum(c["credits"] for c in courses_left[sem] if c.get("type") == "Core")
-        print(f"\n  Sem {sem}: {len(courses_left[sem])} courses, {total_available} total credits")
-        print(f"    Core (mandatory): {core_credits} credits")
+        logger.info(f"\n  Sem {sem}: {len(courses_left[sem])} courses, {total_available} total credits")
+        logger.info(f"    Core (mandatory): {core_credits} credits")
+        
+        if offerings is not None:
+            for c in courses_left[sem]:
+                code = c["code"]
+                if not offerings.is_known(code):
+                    logger.warning(f"    ⚠ {code}: never seen offered")
+                elif not offerings.offered_in_planner_semester(code, sem):
+                    logger.warning(f"    ⚠ {code}: not offered in this semester's parity "
+                                   f"(last offered {offerings.last_offered(code)})")
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+Co-enrollment analytics over the scraped enrollment database.
+
+Builds a sparse student x course incidence matrix from the `enrollments`
+table written by CourseScraper, derives per-semester co-enrollment counts
+(X^T X restricted to one term) and course popularity, and stores them as
+precomputed, indexed aggregate tables:
+
+    course_popularity(term, course_code, course_id, students)
+    co_enrollment(term, course_a, course_b, students)   -- both orderings
+
+Usage:
+    python utils/enrollment_analytics.py [courses.db]
+"""
+
+import logging
+import re
+import sqlite3
+import sys
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from scipy import sparse
+
+logger = logging.getLogger(__name__)
+
+DB_NAME = "courses.db"
+MIN_CO_ENROLLMENT = 1  # Pairs with fewer shared students are not stored
+
+# "2501-MCL111" -> term "2501", code "MCL111"
+COURSE_ID_PATTERN = re.compile(r'^(\d{4})-(\w+)$')
+
+
+def split_course_id(course_id: str) -> Tuple[str, str]:
+    """Split a scraped course id into (term, course_code); term is '' if absent"""
+    match = COURSE_ID_PATTERN.match(course_id)
+    if match:
+        return match.group(1), match.group(2)
+    return '', course_id
+
+
+def init_analytics_tables(conn: sqlite3.Connection):
+    """Create the aggregate tables and their indexes"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS course_popularity (
+            term TEXT NOT NULL,
+            course_code TEXT NOT NULL,
+            course_id TEXT NOT NULL,
+            students INTEGER NOT NULL,
+            PRIMARY KEY (term, course_code)
+        ) WITHOUT ROWID
+    ''')
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_popularity_term_students
+        ON course_popularity(term, students DESC)
+    ''')
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_popularity_students
+        ON course_popularity(students DESC)
+    ''')
+
+    # Stored in both orderings so "courses taken with X" is one index range scan
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS co_enrollment (
+            term TEXT NOT NULL,
+            course_a TEXT NOT NULL,
+            course_b TEXT NOT NULL,
+            students INTEGER NOT NULL,
+            PRIMARY KEY (term, course_a, course_b)
+        ) WITHOUT ROWID
+    ''')
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_co_enrollment_rank
+        ON co_enrollment(course_a, term, students DESC)
+    ''')
+
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS analytics_meta (
+            key TEXT PRIMARY KEY,
+            value TEXT
+        )
+    ''')
+
+
+def load_enrollments(conn: sqlite3.Connection) -> List[Tuple[str, str]]:
+    """
+    Read (student_key, course_id) pairs from the scraped data.
+
+    Students are keyed by entry number, falling back to user id and then
+    name for pages that only list names (see scrape_ldap.student_key).
+    """
+    return conn.execute('SELECT student_key, course_id FROM enrollments').fetchall()
+
+
+def build_incidence(enrollments: List[Tuple[str, str]]) -> Tuple[sparse.csc_matrix, List[str], List[str]]:
+    """
+    Build the binary student x course incidence matrix.
+
+    Returns:
+        (matrix, student_keys, course_ids) where matrix[i, j] == 1 iff
+        student_keys[i] is enrolled in course_ids[j]
+    """
+    student_index: Dict[str, int] = {}
+    course_index: Dict[str, int] = {}
+    rows = np.empty(len(enrollments), dtype=np.int32)
+    cols = np.empty(len(enrollments), dtype=np.int32)
+
+    for n, (student, course_id) in enumerate(enrollments):
+        rows[n] = student_index.setdefault(student, len(student_index))
+        cols[n] = course_index.setdefault(course_id, len(course_index))
+
+    matrix = sparse.coo_matrix(
+        (np.ones(len(enrollments), dtype=np.int32), (rows, cols)),
+        shape=(len(student_index), len(course_index))
+    ).tocsc()
+    # Duplicate rows for the same (student, course) collapse to 1
+    matrix.data[:] = 1
+
+    return matrix, list(student_index), list(course_index)
+
+
+def co_enrollment_by_term(matrix: sparse.csc_matrix, course_ids: List[str],
+                          min_count: int = MIN_CO_ENROLLMENT) -> List[tuple]:
+    """
+    Count students shared by every pair of courses offered in the same term.
+
+    Returns:
+        Rows (term, course_a, course_b, students) in both orderings
+    """
+    columns_by_term: Dict[str, List[int]] = {}
+    for j, course_id in enumerate(course_ids):
+        term, _ = split_course_id(course_id)
+        columns_by_term.setdefault(term, []).append(j)
+
+    result = []
+    for term, columns in columns_by_term.items():
+        codes = [split_course_id(course_ids[j])[1] for j in columns]
+        term_matrix = matrix[:, columns]
+        co = (term_matrix.T @ term_matrix).tocoo()
+
+        keep = (co.row != co.col) & (co.data >= min_count)
+        for a, b, count in zip(co.row[keep], co.col[keep], co.data[keep]):
+            result.append((term, codes[a], codes[b], int(count)))
+
+    return result
+
+
+def popularity_by_term(matrix: sparse.csc_matrix, course_ids: List[str]) -> List[tuple]:
+    """Rows (term, course_code, course_id, students) for every course"""
+    counts = np.asarray(matrix.sum(axis=0)).ravel()
+    rows = []
+    for course_id, count in zip(course_ids, counts):
+        term, code = split_course_id(course_id)
+        rows.append((term, code, course_id, int(count)))
+    return rows
+
+
+def build_analytics(db_name: str = DB_NAME, min_count: int = MIN_CO_ENROLLMENT) -> Dict[str, int]:
+    """
+    Rebuild the aggregate tables from the current enrollment data.
+
+    Returns:
+        Counts of enrollments, students, courses and stored pairs
+    """
+    start = time.perf_counter()
+    conn = sqlite3.connect(db_name)
+    init_analytics_tables(conn)
+
+    enrollments = load_enrollments(conn)
+    matrix, students, course_ids = build_incidence(enrollments)
+    pairs = co_enrollment_by_term(matrix, course_ids, min_count)
+    popularity = popularity_by_term(matrix, course_ids)
+
+    with conn:
+        conn.execute('DELETE FROM co_enrollment')
+        conn.execute('DELETE FROM course_popularity')
+        # Ids without a term prefix can repeat a code; their counts are merged
+        conn.executemany('''
+            INSERT INTO co_enrollment VALUES (?, ?, ?, ?)
+            ON CONFLICT(term, course_a, course_b) DO UPDATE SET students = students + excluded.students
+        ''', pairs)
+        conn.executemany('''
+            INSERT INTO course_popularity VALUES (?, ?, ?, ?)
+            ON CONFLICT(term, course_code) DO UPDATE SET students = students + excluded.students
+        ''', popularity)
+        conn.executemany('INSERT OR REPLACE INTO analytics_meta VALUES (?, ?)', [
+            ('built_at', datetime.now().isoformat()),
+            ('enrollments', str(len(enrollments))),
+        ])
+    conn.close()
+
+    summary = {
+        'enrollments': len(enrollments),
+        'students': len(students),
+        'courses': len(course_ids),
+        'pairs': len(pairs) // 2,
+    }
+    logger.info(f"Analytics built in {time.perf_counter() - start:.2f}s: {summary}")
+    return summary
+
+
+def analytics_available(conn: sqlite3.Connection) -> bool:
+    """True if build_analytics has populated this database"""
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'analytics_meta'"
+    ).fetchone()
+    return bool(row) and conn.execute(
+        "SELECT 1 FROM analytics_meta WHERE key = 'built_at'"
+    ).fetchone() is not None
+
+
+def top_co_enrolled(conn: sqlite3.Connection, course_code: str, term: Optional[str] = None,
+                    limit: int = 10) -> List[Tuple[str, str, int]]:
+    """
+    Courses most often taken in the same semester as course_code.
+
+    Returns:
+        List of (term, other_course, shared_students), most shared first
+    """
+    if term is not None:
+        return conn.execute('''
+            SELECT term, course_b, students FROM co_enrollment
+            WHERE course_a = ? AND term = ?
+            ORDER BY students DESC LIMIT ?
+        ''', (course_code, term, limit)).fetchall()
+    return conn.execute('''
+        SELECT term, course_b, students FROM co_enrollment
+        WHERE course_a = ?
+        ORDER BY students DESC LIMIT ?
+    ''', (course_code, limit)).fetchall()
+
+
+def shared_students(conn: sqlite3.Connection, term: str, course_a: str, course_b: str) -> int:
+    """Students enrolled in both courses in a term (a measure of real clash risk)"""
+    row = conn.execute(
+        'SELECT students FROM co_enrollment WHERE term = ? AND course_a = ? AND course_b = ?',
+        (term, course_a, course_b)
+    ).fetchone()
+    return row[0] if row else 0
+
+
+def popular_courses(conn: sqlite3.Connection, term: Optional[str] = None,
+                    limit: int = 10) -> List[Tuple[str, str, int]]:
+    """
+    Most enrolled courses, per term or overall.
+
+    Returns:
+        List of (course_id, course_code, students)
+    """
+    if term is not None:
+        return conn.execute('''
+            SELECT course_id, course_code, students FROM course_popularity
+            WHERE term = ? ORDER BY students DESC LIMIT ?
+        ''', (term, limit)).fetchall()
+    return conn.execute('''
+        SELECT course_id, course_code, students FROM course_popularity
+        ORDER BY students DESC LIMIT ?
+    ''', (limit,)).fetchall()
+
+
+def rank_by_co_enrollment(conn: sqlite3.Connection, anchor_courses: List[str],
+                          candidates: List[str]) -> List[Tuple[str, int]]:
+    """
+    Rank elective candidates by how often they are taken alongside anchor courses.
+
+    Returns:
+        List of (candidate, total_shared_students), highest first
+    """
+    if not anchor_courses or not candidates:
+        return [(code, 0) for code in candidates]
+
+    scores = dict.fromkeys(candidates, 0)
+    anchor_marks = ','.join('?' * len(anchor_courses))
+    candidate_marks = ','.join('?' * len(candidates))
+    for code, total in conn.execute(f'''
+        SELECT course_b, SUM(students) FROM co_enrollment
+        WHERE course_a IN ({anchor_marks}) AND course_b IN ({candidate_marks})
+        GROUP BY course_b
+    ''', (*anchor_courses, *candidates)):
+        scores[code] = total
+    return sorted(scores.items(), key=lambda item: -item[1])
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    db_name = sys.argv[1] if len(sys.argv) > 1 else DB_NAME
+    build_analytics(db_name)
+
+    conn = sqlite3.connect(db_name)
+    print("\nMost popular courses:")
+    for course_id, _, count in popular_courses(conn, limit=5):
+        print(f"  {course_id}: {count} students")
+        for term, other, shared in top_co_enrolled(conn, split_course_id(course_id)[1], limit=3):
+            print(f"      with {other} ({term}): {shared}")
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Per-student enrollment history over the scraped enrollment database.
+
+Scraped course ids fold the term into the id ("2501-MCL111" = 2025-26,
+semester 1). The import step decodes that prefix into year/semester columns
+of an `enrollment_history` table keyed (and therefore covered) by entry
+number, with a second covering index on the LDAP user id. A student's whole
+history, or every student under an entry-number prefix, is then one indexed
+range scan.
+
+Usage:
+    python utils/enrollment_history.py [courses.db] 2023EE10123
+    python utils/enrollment_history.py [courses.db] 2023EE1 --prefix
+"""
+
+import logging
+import re
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from utils.enrollment_analytics import DB_NAME, split_course_id
+
+logger = logging.getLogger(__name__)
+
+# Entry numbers start with the admission year, e.g. 2023EE10123
+ENTRY_YEAR_PATTERN = re.compile(r'^(\d{4})')
+
+
+def decode_term(term: str) -> Tuple[Optional[int], Optional[int]]:
+    """
+    Decode a term prefix into (academic year, semester).
+
+    "2501" -> (2025, 1); "2502" -> (2025, 2). Returns (None, None) for ids
+    scraped without a term prefix.
+    """
+    if len(term) != 4 or not term.isdigit():
+        return None, None
+    return 2000 + int(term[:2]), int(term[2:])
+
+
+def planner_semester(entry_number: str, year: int, semester: int) -> Optional[int]:
+    """
+    Map a (year, semester) term onto the student's planner semester (1..10).
+
+    Semester 1 of the admission year is planner semester 1. Summer terms
+    (semester 3) count towards the preceding even semester.
+    """
+    match = ENTRY_YEAR_PATTERN.match(entry_number or '')
+    if not match or year is None:
+        return None
+    return (year - int(match.group(1))) * 2 + min(semester, 2)
+
+
+def init_history_table(conn: sqlite3.Connection):
+    """Create the history table and its covering indexes"""
+    # The primary key doubles as the covering index for per-student lookups
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS enrollment_history (
+            entry_number TEXT NOT NULL,
+            year INTEGER NOT NULL,
+            semester INTEGER NOT NULL,
+            course_code TEXT NOT NULL,
+            student_id TEXT,
+            course_id TEXT NOT NULL,
+            PRIMARY KEY (entry_number, year, semester, course_code)
+        ) WITHOUT ROWID
+    ''')
+    conn.execute('''
+        CREATE INDEX IF NOT EXISTS idx_history_student_id
+        ON enrollment_history(student_id, year, semester, course_code)
+    ''')
+
+
+def import_history(db_name: str = DB_NAME) -> int:
+    """
+    Rebuild enrollment_history from the scraped enrollments.
+
+    Rows without an entry number or a decodable term are skipped.
+
+    Returns:
+        Number of history rows written
+    """
+    conn = sqlite3.connect(db_name)
+    init_history_table(conn)
+
+    rows = []
+    for entry_number, student_id, course_id in conn.execute('''
+        SELECT entry_number, student_id, course_id
+        FROM enrollments JOIN students USING (student_key)
+        WHERE entry_number IS NOT NULL
+    '''):
+        term, code = split_course_id(course_id)
+        year, semester = decode_term(term)
+        if year is not None:
+            rows.append((entry_number, year, semester, code, student_id, course_id))
+
+    with conn:
+        conn.execute('DELETE FROM enrollment_history')
+        conn.executemany(
+            'INSERT OR IGNORE INTO enrollment_history VALUES (?, ?, ?, ?, ?, ?)', rows
+        )
+    conn.close()
+
+    logger.info(f"Imported {len(rows)} enrollment history rows")
+    return len(rows)
+
+
+def _group_by_semester(entry_number: str, rows) -> Dict[int, List[str]]:
+    history: Dict[int, List[str]] = {}
+    for year, semester, code in rows:
+        sem = planner_semester(entry_number, year, semester)
+        if sem is not None:
+            history.setdefault(sem, []).append(code)
+    return history
+
+
+def student_history(conn: sqlite3.Connection, entry_number: str) -> Dict[int, List[str]]:
+    """
+    Courses a student has taken, by planner semester.
+
+    Shaped like UserData.completed_hul_sem / completed_DE_sem:
+    {semester: [course codes]}.
+    """
+    rows = conn.execute('''
+        SELECT year, semester, course_code FROM enrollment_history
+        WHERE entry_number = ?
+        ORDER BY year, semester, course_code
+    ''', (entry_number,)).fetchall()
+    return _group_by_semester(entry_number, rows)
+
+
+def student_history_by_user_id(conn: sqlite3.Connection, student_id: str) -> Dict[int, List[str]]:
+    """Same as student_history, looked up by LDAP user id"""
+    rows = conn.execute('''
+        SELECT entry_number, year, semester, course_code FROM enrollment_history
+        WHERE student_id = ?
+        ORDER BY year, semester, course_code
+    ''', (student_id,)).fetchall()
+    if not rows:
+        return {}
+    return _group_by_semester(rows[0][0], [row[1:] for row in rows])
+
+
+def histories_for_prefix(conn: sqlite3.Connection, prefix: str) -> Dict[str, Dict[int, List[str]]]:
+    """
+    Histories of every student whose entry number starts with prefix
+    (e.g. "2023EE1" for one batch of one programme), in one range scan.
+    """
+    if not prefix:
+        raise ValueError("Entry-number prefix must not be empty")
+    upper = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+    histories: Dict[str, Dict[int, List[str]]] = {}
+    for entry_number, year, semester, code in conn.execute('''
+        SELECT entry_number, year, semester, course_code FROM enrollment_history
+        WHERE entry_number >= ? AND entry_number < ?
+        ORDER BY entry_number, year, semester, course_code
+    ''', (prefix, upper)):
+        sem = planner_semester(entry_number, year, semester)
+        if sem is not None:
+            histories.setdefault(entry_number, {}).setdefault(sem, []).append(code)
+    return histories
+
+
+def user_data_kwargs(history: Dict[int, List[str]], department: dict) -> dict:
+    """
+    Split a history into UserData keyword arguments for a department.
+
+    HUL* courses go to completed_hul(_sem), the department's DE list to
+    completed_DE(_sem), everything else to completed_corecourses.
+    """
+    de_courses = set(department.get("courses", {}).get("DE", []))
+    kwargs = {
+        "completed_corecourses": [],
+        "completed_hul": [],
+        "completed_DE": [],
+        "completed_hul_sem": {},
+        "completed_DE_sem": {},
+        "current_semester": max(history, default=0) + 1,
+    }
+    for sem in sorted(history):
+        for code in history[sem]:
+            if code.startswith("HUL"):
+                kwargs["completed_hul"].append(code)
+                kwargs["completed_hul_sem"].setdefault(sem, []).append(code)
+            elif code in de_courses:
+                kwargs["completed_DE"].append(code)
+                kwargs["completed_DE_sem"].setdefault(sem, []).append(code)
+            else:
+                kwargs["completed_corecourses"].append(code)
+    return kwargs
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    args = [arg for arg in sys.argv[1:] if arg != "--prefix"]
+    db_name = args[0] if len(args) > 1 else DB_NAME
+    key = args[-1] if args else None
+
+    import_history(db_name)
+    if not key:
+        return
+
+    conn = sqlite3.connect(db_name)
+    if "--prefix" in sys.argv:
+        for entry_number, history in histories_for_prefix(conn, key).items():
+            print(f"{entry_number}: {history}")
+    else:
+        print(student_history(conn, key))
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
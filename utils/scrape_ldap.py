@@ -12,8 +12,18 @@ Usage:
 import aiohttp
 import asyncio
 from bs4 import BeautifulSoup
+from concurrent.futures import ProcessPoolExecutor
+import hashlib
+import json
+import lxml.html
+from lxml import etree
+import os
+import random
+import re
 import sqlite3
 import logging
+import queue
+import threading
 import time
 from datetime import datetime
 from typing import List, Dict, Optional
@@ -30,15 +40,601 @@ logger = logging.getLogger(__name__)
 BASE_URL = "https://ldapweb.iitd.ac.in/LDAP/courses/"
 DB_NAME = "courses.db"
 REQUEST_TIMEOUT = 30
-MAX_CONCURRENT_REQUESTS = 20  # Process 20 courses in parallel
+MAX_CONCURRENT_REQUESTS = 20  # Starting concurrency; adapted at runtime (AIMD)
+MIN_CONCURRENT_REQUESTS = 2  # Floor the adaptive limit never goes below
+LIMIT_PER_HOST = 32  # Connection cap per host on the shared TCPConnector (also the concurrency ceiling)
+AIMD_DECREASE = 0.7  # Multiplicative decrease on errors / latency spikes
+LATENCY_TOLERANCE = 3.0  # Latency EWMA above this multiple of the best seen counts as congestion
+MAX_RETRIES = 4  # Retries per request after the first attempt
+RETRY_BASE_DELAY = 0.5  # Seconds; doubled per attempt, with jitter
+RETRY_MAX_DELAY = 10.0
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+COURSE_QUEUE_SIZE = 200  # Courses waiting for a worker
+WRITE_QUEUE_SIZE = 100  # Parsed courses waiting for the DB writer (backpressure beyond this)
+WRITE_BATCH_COURSES = 50  # Courses committed together in one transaction
+PARSE_WORKERS = max(1, min(8, (os.cpu_count() or 2) - 1))  # HTML parsing processes
+
+
+STUDENT_FIELDS = ('entry_number', 'student_id', 'student_name', 'email', 'department')
+
+# Insert a student, or fill in / correct the stored details; a row is only
+# rewritten when some non-empty field actually differs
+UPSERT_STUDENT = f'''
+    INSERT INTO students (student_key, {', '.join(STUDENT_FIELDS)})
+    VALUES ({', '.join('?' * (len(STUDENT_FIELDS) + 1))})
+    ON CONFLICT(student_key) DO UPDATE SET
+        {', '.join(f'{field} = COALESCE(excluded.{field}, students.{field})' for field in STUDENT_FIELDS)}
+    WHERE {' OR '.join(f'COALESCE(excluded.{field}, students.{field}) IS NOT students.{field}'
+                       for field in STUDENT_FIELDS)}
+'''
+
+
+def student_key(student: Dict[str, str]) -> Optional[str]:
+    """Key of a parsed student: entry number, else LDAP user id, else name (None if none is known)"""
+    return student.get('entry_number') or student.get('student_id') or student.get('student_name')
+
+
+def merge_students(merged: Dict[str, Dict[str, Optional[str]]], student: Dict[str, str]) -> Optional[str]:
+    """Fold a student's details into merged (later non-empty values win); returns its key"""
+    key = student_key(student)
+    if key is not None:
+        details = merged.setdefault(key, dict.fromkeys(STUDENT_FIELDS))
+        for field in STUDENT_FIELDS:
+            details[field] = student.get(field) or details[field]
+    return key
+
+
+def write_courses(cursor: sqlite3.Cursor, batch: List[tuple]) -> int:
+    """
+    Write a batch of (course, students) pairs as upserts and enrollment diffs.
+    
+    Each student's details are upserted once per batch, and each course's
+    enrollments are diffed against the stored ones, so a rescrape only
+    writes the enrollments and student details that changed. The caller
+    owns the transaction.
+    
+    Returns:
+        Number of student and enrollment rows inserted, updated or deleted
+    """
+    scraped_at = datetime.now()
+    cursor.executemany('''
+        INSERT INTO courses (course_id, course_name, course_url, scraped_at)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT(course_id) DO UPDATE SET
+            course_name = excluded.course_name,
+            course_url = excluded.course_url,
+            scraped_at = excluded.scraped_at
+    ''', [
+        (course['course_id'], course['course_name'], course['course_url'], scraped_at)
+        for course, _ in batch
+    ])
+    
+    merged: Dict[str, Dict[str, Optional[str]]] = {}
+    enrolled: Dict[str, set] = {}
+    for course, students in batch:
+        keys = enrolled[course['course_id']] = set()
+        for student in students:
+            key = merge_students(merged, student)
+            if key is not None:
+                keys.add(key)
+    
+    cursor.executemany(UPSERT_STUDENT, [
+        (key, *(details[field] for field in STUDENT_FIELDS)) for key, details in merged.items()
+    ])
+    changes = cursor.rowcount
+    
+    added, dropped = [], []
+    for course_id, keys in enrolled.items():
+        stored = {key for key, in cursor.execute(
+            'SELECT student_key FROM enrollments WHERE course_id = ?', (course_id,)
+        )}
+        added.extend((course_id, key) for key in keys - stored)
+        dropped.extend((course_id, key) for key in stored - keys)
+    cursor.executemany('DELETE FROM enrollments WHERE course_id = ? AND student_key = ?', dropped)
+    changes += cursor.rowcount
+    cursor.executemany('INSERT INTO enrollments (course_id, student_key) VALUES (?, ?)', added)
+    return changes + cursor.rowcount
+
+
+def create_enrollment_tables(cursor: sqlite3.Cursor):
+    """Create the students and enrollments tables (normalized layout)"""
+    # One row per student; keyed by entry number, falling back to the LDAP
+    # user id or name for pages that list neither
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS students (
+            student_key TEXT PRIMARY KEY,
+            entry_number TEXT,
+            student_id TEXT,
+            student_name TEXT,
+            email TEXT,
+            department TEXT
+        ) WITHOUT ROWID
+    ''')
+    
+    # Who takes what; the primary key serves the per-course reads and diffs.
+    # No per-student index: enrollment_history keeps its own covering table
+    # for that, and an index on the key would scatter every insert
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS enrollments (
+            course_id TEXT NOT NULL,
+            student_key TEXT NOT NULL,
+            PRIMARY KEY (course_id, student_key),
+            FOREIGN KEY (course_id) REFERENCES courses(course_id),
+            FOREIGN KEY (student_key) REFERENCES students(student_key)
+        ) WITHOUT ROWID
+    ''')
+
+
+def migrate_enrollment_schema(conn: sqlite3.Connection) -> Optional[Dict[str, int]]:
+    """
+    Move a database from the old layout (one students row per course and
+    student) to students + enrollments, in one transaction.
+    
+    Duplicate students are merged (later non-empty details win); rows with
+    no entry number, user id or name are dropped, as the analytics already
+    ignored them.
+    
+    Returns:
+        Counts of old rows, students and enrollments; None if there was
+        nothing to migrate
+    """
+    columns = {row[1] for row in conn.execute('PRAGMA table_info(students)')}
+    if 'course_id' not in columns:
+        return None
+    
+    try:
+        conn.execute('BEGIN')
+        conn.execute('ALTER TABLE students RENAME TO students_legacy')
+        cursor = conn.cursor()
+        create_enrollment_tables(cursor)
+        
+        merged: Dict[str, Dict[str, Optional[str]]] = {}
+        enrollments = set()
+        legacy_rows = 0
+        for course_id, *values in conn.execute(f'''
+            SELECT course_id, {', '.join(STUDENT_FIELDS)} FROM students_legacy ORDER BY id
+        '''):
+            legacy_rows += 1
+            key = merge_students(merged, dict(zip(STUDENT_FIELDS, values)))
+            if key is not None:
+                enrollments.add((course_id, key))
+        
+        cursor.executemany(UPSERT_STUDENT, [
+            (key, *(details[field] for field in STUDENT_FIELDS)) for key, details in merged.items()
+        ])
+        cursor.executemany('INSERT INTO enrollments (course_id, student_key) VALUES (?, ?)',
+                           sorted(enrollments))
+        conn.execute('DROP TABLE students_legacy')
+        conn.commit()
+    except sqlite3.Error:
+        conn.rollback()
+        raise
+    
+    return {'rows': legacy_rows, 'students': len(merged), 'enrollments': len(enrollments)}
+
+
+def retry_delay(attempt: int, base: float = RETRY_BASE_DELAY, cap: float = RETRY_MAX_DELAY) -> float:
+    """Exponential backoff with jitter: half fixed, half random, so retries spread out"""
+    delay = min(cap, base * 2 ** (attempt - 1))
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+def students_hash(students: List[Dict[str, str]]) -> str:
+    """Order-independent content hash of a parsed student list"""
+    canonical = sorted(json.dumps(student, sort_keys=True) for student in students)
+    return hashlib.sha256("\n".join(canonical).encode()).hexdigest()
+
+
+# ============================================================================
+# HTML PARSING (runs in the parse worker pool, so everything here is
+# module-level and picklable)
+# ============================================================================
+
+def extract_course_id(href: str, text: str) -> Optional[str]:
+    """Extract course ID from href or text"""
+    # Priority 1: Try to extract from text (e.g., "2501-MCL111" or "2501-MCL111 (some text)")
+    # Format: 4 digits, dash, 2-4 letters, 3-4 digits
+    match = re.search(r'(\d{4}-[A-Z]{2,4}\d{3,4})', text)
+    if match:
+        return match.group(1)
+    
+    # Priority 2: Try old format without semester prefix (e.g., "CS101")
+    match = re.search(r'^([A-Z]{2,4}\d{3,4})', text)
+    if match:
+        return match.group(1)
+    
+    # Priority 3: Try to extract from href (e.g., /course/2501-MCL111 or course.php?id=2501-MCL111)
+    match = re.search(r'[?&/](?:id|course)[=/]([\w-]+)', href)
+    if match:
+        return match.group(1)
+    
+    # Priority 4: Use href path component as ID (filename without extension)
+    match = re.search(r'/([^/]+?)(?:\.\w+)?$', href)
+    if match:
+        return match.group(1)
+    
+    return None
+
+
+def _course_entry(href: str, course_name: str, base_url: str) -> Optional[Dict[str, str]]:
+    """Build a course dict from a link, or None if no course id can be found"""
+    course_id = extract_course_id(href, course_name)
+    if not course_id:
+        return None
+    # Use urljoin equivalent for aiohttp
+    if href.startswith('http'):
+        course_url = href
+    else:
+        course_url = base_url.rstrip('/') + '/' + href.lstrip('/')
+    return {
+        'course_id': course_id,
+        'course_name': course_name,
+        'course_url': course_url
+    }
+
+
+def _student_from_cells(texts: List[str]) -> Dict[str, str]:
+    """Map the cell texts of one table row onto student fields"""
+    student_data = {}
+    
+    # Common patterns for student data
+    for j, text in enumerate(texts):
+        if not text:
+            continue
+        
+        # Try to identify what each column contains
+        if j == 0:
+            student_data['student_name'] = text
+        elif j == 1:
+            student_data['entry_number'] = text
+        elif j == 2:
+            student_data['student_id'] = text
+        elif '@' in text:
+            student_data['email'] = text
+        elif len(text) <= 10 and any(dept in text.upper() for dept in ['CS', 'EE', 'ME', 'CE', 'CH']):
+            student_data['department'] = text
+    
+    return student_data
+
+
+def _lxml_text(element) -> str:
+    """Same text as BeautifulSoup's get_text(strip=True)"""
+    return ''.join(part.strip() for part in element.itertext())
+
+
+def _lxml_document(html: bytes):
+    try:
+        return lxml.html.fromstring(html)
+    except (etree.ParserError, ValueError):
+        return None
+
+
+def parse_course_list(html: bytes, base_url: str) -> List[Dict[str, str]]:
+    """
+    Extract courses from the listing page.
+    
+    Fast path: course links inside tables, read straight from the lxml tree.
+    If that finds nothing, fall back to the full BeautifulSoup pattern chain.
+    """
+    doc = _lxml_document(html)
+    courses = []
+    if doc is not None:
+        for link in doc.iterfind('.//table//a[@href]'):
+            href = link.get('href')
+            if href and 'course' in href.lower():
+                entry = _course_entry(href, _lxml_text(link), base_url)
+                if entry:
+                    courses.append(entry)
+    
+    if not courses:
+        courses = _parse_course_list_soup(BeautifulSoup(html, 'lxml'), base_url)
+    return courses
+
+
+def _parse_course_list_soup(soup: BeautifulSoup, base_url: str) -> List[Dict[str, str]]:
+    """Fallback course listing patterns on a BeautifulSoup tree"""
+    courses = []
+    
+    # Try multiple common patterns for course listings
+    # Pattern 1: Links in a table
+    for table in soup.find_all('table'):
+        for link in table.find_all('a', href=True):
+            href = link.get('href')
+            if href and 'course' in href.lower():
+                entry = _course_entry(href, link.get_text(strip=True), base_url)
+                if entry:
+                    courses.append(entry)
+    
+    # Pattern 2: Links in a list
+    if not courses:
+        for lst in soup.find_all(['ul', 'ol']):
+            for link in lst.find_all('a', href=True):
+                entry = _course_entry(link.get('href'), link.get_text(strip=True), base_url)
+                if entry:
+                    courses.append(entry)
+    
+    # Pattern 3: All links on the page (fallback)
+    if not courses:
+        for link in soup.find_all('a', href=True):
+            href = link.get('href')
+            # Skip navigation/external links
+            if any(skip in href.lower() for skip in ['javascript', 'mailto', '#', 'http://', 'https://']) and 'ldapweb' not in href.lower():
+                continue
+            course_name = link.get_text(strip=True)
+            if course_name:
+                entry = _course_entry(href, course_name, base_url)
+                if entry:
+                    courses.append(entry)
+    
+    return courses
+
+
+def parse_students(html: bytes) -> List[Dict[str, str]]:
+    """
+    Extract student rows from a course page.
+    
+    Fast path: table rows (header row skipped) read straight from the lxml
+    tree. If that finds nothing, fall back to the BeautifulSoup patterns.
+    """
+    doc = _lxml_document(html)
+    students = []
+    if doc is not None:
+        for table in doc.iterfind('.//table'):
+            # Skip header row
+            for row in table.xpath('.//tr')[1:]:
+                cells = row.xpath('.//td | .//th')
+                if cells:
+                    student_data = _student_from_cells([_lxml_text(cell) for cell in cells])
+                    if student_data:
+                        students.append(student_data)
+    
+    if not students:
+        students = _parse_students_soup(BeautifulSoup(html, 'lxml'))
+    return students
+
+
+def _parse_students_soup(soup: BeautifulSoup) -> List[Dict[str, str]]:
+    """Fallback student patterns on a BeautifulSoup tree"""
+    students = []
+    
+    # Try to find student information in tables
+    for table in soup.find_all('table'):
+        rows = table.find_all('tr')
+        
+        # Skip header row
+        for row in rows[1:]:
+            cells = row.find_all(['td', 'th'])
+            if len(cells) >= 1:
+                student_data = _student_from_cells([cell.get_text(strip=True) for cell in cells])
+                if student_data:
+                    students.append(student_data)
+    
+    # Try alternative patterns (e.g., lists)
+    if not students:
+        for lst in soup.find_all(['ul', 'ol']):
+            for item in lst.find_all('li'):
+                students.append({
+                    'student_name': item.get_text(strip=True),
+                    'student_id': None,
+                    'entry_number': None
+                })
+    
+    return students
+
+
+def parse_course_page(html: bytes) -> tuple[List[Dict[str, str]], str]:
+    """Parse a course page and hash its student list in one worker call"""
+    students = parse_students(html)
+    return students, students_hash(students)
+
+
+class DatabaseWriter:
+    """
+    Single writer thread owning the only write connection to the database.
+    
+    Scraper tasks hand parsed courses over through a bounded queue, so the
+    event loop never blocks on SQLite. The writer drains whatever is queued
+    (up to WRITE_BATCH_COURSES courses) and commits it as one transaction.
+    
+    Each queued item is (course, students, cache_entry). students is None when
+    the page did not change, in which case only the page cache and the run
+    checkpoint are updated.
+    
+    A batch that fails to write is rolled back and its courses recorded in
+    failed_courses (they are neither cached nor checkpointed, so the next run
+    fetches them again). If the thread itself dies, submit() and close()
+    raise instead of waiting on a queue nobody drains.
+    """
+    
+    _STOP = object()
+    
+    def __init__(self, db_name: str, queue_size: int = WRITE_QUEUE_SIZE,
+                 batch_courses: int = WRITE_BATCH_COURSES, run_id: Optional[int] = None):
+        self.db_name = db_name
+        self.run_id = run_id
+        self.batch_courses = batch_courses
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.thread = threading.Thread(target=self._run, name="db-writer", daemon=True)
+        self.courses_written = 0
+        self.rows_written = 0
+        self.transactions = 0
+        self.failed_courses: List[str] = []
+        self.error: Optional[BaseException] = None
+    
+    def start(self):
+        self.thread.start()
+    
+    def _check(self):
+        if self.error is not None:
+            raise RuntimeError(f"Database writer stopped: {self.error}") from self.error
+    
+    async def submit(self, course: Dict[str, str], students: Optional[List[Dict[str, str]]],
+                     cache_entry: Optional[Dict[str, str]] = None):
+        """Queue a course for writing; waits (off the loop) only when the queue is full"""
+        self._check()
+        item = (course, students, cache_entry)
+        try:
+            self.queue.put_nowait(item)
+        except queue.Full:
+            # Poll, so a writer that dies meanwhile can't leave this waiting for good
+            while True:
+                try:
+                    await asyncio.to_thread(self.queue.put, item, timeout=1.0)
+                    break
+                except queue.Full:
+                    self._check()
+    
+    def close(self):
+        """Flush everything still queued and stop the writer thread"""
+        while self.thread.is_alive():
+            try:
+                self.queue.put(self._STOP, timeout=1.0)
+                break
+            except queue.Full:
+                continue
+        self.thread.join()
+        self._check()
+    
+    def _run(self):
+        try:
+            self._drain()
+        except BaseException as e:
+            logger.exception("Database writer stopped")
+            self.error = e
+    
+    def _drain(self):
+        conn = sqlite3.connect(self.db_name)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        cursor = conn.cursor()
+        
+        stopping = False
+        while not stopping:
+            item = self.queue.get()
+            if item is self._STOP:
+                break
+            
+            # Group everything already waiting into the same transaction
+            batch = [item]
+            while len(batch) < self.batch_courses:
+                try:
+                    item = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is self._STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+            
+            try:
+                self._write_batch(cursor, batch)
+                conn.commit()
+                self.courses_written += len(batch)
+                self.transactions += 1
+                logger.debug(f"Committed {len(batch)} courses")
+            except Exception as e:
+                # One bad batch (a database error, a malformed course) must not
+                # stop the writer: skip it and keep draining
+                logger.error(f"Failed to write {len(batch)} courses: {e!r}")
+                conn.rollback()
+                self.failed_courses.extend(course.get('course_id', '?') for course, _, _ in batch)
+        
+        conn.close()
+    
+    def _write_batch(self, cursor: sqlite3.Cursor, batch: List[tuple]):
+        changed = [(course, students) for course, students, _ in batch if students is not None]
+        if changed:
+            self.rows_written += write_courses(cursor, changed)
+        
+        cursor.executemany('''
+            INSERT OR REPLACE INTO page_cache (course_id, etag, last_modified, content_hash, checked_at)
+            VALUES (?, ?, ?, ?, ?)
+        ''', [
+            (course['course_id'], entry.get('etag'), entry.get('last_modified'),
+             entry.get('content_hash'), datetime.now())
+            for course, _, entry in batch if entry is not None
+        ])
+        
+        if self.run_id is not None:
+            cursor.executemany(
+                'INSERT OR IGNORE INTO scrape_checkpoint (run_id, course_id) VALUES (?, ?)',
+                [(self.run_id, course['course_id']) for course, _, _ in batch]
+            )
+
+
+class AdaptiveLimiter:
+    """
+    AIMD limit on in-flight requests.
+    
+    A fast, successful response grows the limit by 1/limit (about +1 per
+    window of `limit` requests). An error, or a latency EWMA above
+    LATENCY_TOLERANCE x the best EWMA seen, multiplies it by AIMD_DECREASE,
+    at most once per latency interval so one burst counts as one signal.
+    """
+    
+    def __init__(self, initial: int = MAX_CONCURRENT_REQUESTS, minimum: int = MIN_CONCURRENT_REQUESTS,
+                 maximum: int = LIMIT_PER_HOST):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.limit = float(min(max(initial, minimum), maximum))
+        self.in_flight = 0
+        self.latency_ewma: Optional[float] = None
+        self.best_latency: Optional[float] = None
+        self.last_decrease = 0.0
+        self.decreases = 0
+        self.condition = asyncio.Condition()
+    
+    async def __aenter__(self):
+        async with self.condition:
+            await self.condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        async with self.condition:
+            self.in_flight -= 1
+            self.condition.notify_all()
+    
+    def record(self, latency: float, ok: bool):
+        """Feed one request outcome into the limit"""
+        if ok:
+            if self.latency_ewma is None:
+                self.latency_ewma = latency
+            else:
+                self.latency_ewma = 0.8 * self.latency_ewma + 0.2 * latency
+            if self.best_latency is None or self.latency_ewma < self.best_latency:
+                self.best_latency = self.latency_ewma
+        
+        congested = not ok or (
+            self.best_latency is not None
+            and self.latency_ewma > LATENCY_TOLERANCE * self.best_latency
+        )
+        
+        now = time.monotonic()
+        if congested:
+            if now - self.last_decrease >= (self.latency_ewma or 0.0):
+                self.limit = max(self.minimum, self.limit * AIMD_DECREASE)
+                self.last_decrease = now
+                self.decreases += 1
+        else:
+            self.limit = min(self.maximum, self.limit + 1 / self.limit)
 
 
 class CourseScraper:
     """Async scraper for LDAP course enrollment data"""
     
-    def __init__(self, db_name: str = DB_NAME):
+    def __init__(self, db_name: str = DB_NAME, base_url: str = BASE_URL,
+                 max_retries: int = MAX_RETRIES, request_timeout: float = REQUEST_TIMEOUT):
         self.db_name = db_name
-        self.semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+        self.base_url = base_url
+        self.max_retries = max_retries
+        self.request_timeout = request_timeout
+        self.failed_courses: List[str] = []
+        self.writer: Optional[DatabaseWriter] = None
+        self.page_cache: Dict[str, Dict[str, str]] = {}
+        self.parse_pool: Optional[ProcessPoolExecutor] = None
+        self.stats = self._empty_stats()
+        self.limiter = AdaptiveLimiter()
         self.init_database()
     
     def init_database(self):
@@ -57,48 +653,119 @@ class CourseScraper:
             )
         ''')
         
-        # Create students table
+        # Students and their enrollments (databases from before the split are
+        # migrated first; VACUUM then returns the old table's pages)
+        migrated = migrate_enrollment_schema(conn)
+        if migrated:
+            logger.info(f"Migrated {migrated['rows']} enrollment rows to "
+                        f"{migrated['students']} students / {migrated['enrollments']} enrollments")
+            conn.execute('VACUUM')
+        create_enrollment_tables(cursor)
+        
+        # HTTP validators and parsed-content hash per course page
         cursor.execute('''
-            CREATE TABLE IF NOT EXISTS students (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                course_id TEXT NOT NULL,
-                student_name TEXT,
-                student_id TEXT,
-                entry_number TEXT,
-                email TEXT,
-                department TEXT,
-                FOREIGN KEY (course_id) REFERENCES courses(course_id)
+            CREATE TABLE IF NOT EXISTS page_cache (
+                course_id TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                content_hash TEXT,
+                checked_at TIMESTAMP
             )
         ''')
         
-        # Create index for faster lookups
+        # Scrape runs and the courses each run has finished, for resuming
         cursor.execute('''
-            CREATE INDEX IF NOT EXISTS idx_course_id 
-            ON students(course_id)
+            CREATE TABLE IF NOT EXISTS scrape_runs (
+                run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                finished_at TIMESTAMP
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS scrape_checkpoint (
+                run_id INTEGER NOT NULL,
+                course_id TEXT NOT NULL,
+                PRIMARY KEY (run_id, course_id),
+                FOREIGN KEY (run_id) REFERENCES scrape_runs(run_id)
+            )
         ''')
         
         conn.commit()
         conn.close()
         logger.info("Database initialized successfully")
     
-    async def fetch_page(self, session: aiohttp.ClientSession, url: str) -> Optional[BeautifulSoup]:
-        """Fetch a page and return BeautifulSoup object"""
-        async with self.semaphore:
-            try:
-                logger.debug(f"Fetching: {url}")
-                async with session.get(url, timeout=aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)) as response:
-                    response.raise_for_status()
-                    html = await response.text()
-                    return BeautifulSoup(html, 'lxml')
-            except asyncio.TimeoutError:
-                logger.error(f"Timeout fetching {url}")
-                return None
-            except aiohttp.ClientError as e:
-                logger.error(f"Error fetching {url}: {e}")
-                return None
-            except Exception as e:
-                logger.error(f"Unexpected error fetching {url}: {e}")
-                return None
+    async def fetch(self, session: aiohttp.ClientSession, url: str,
+                    headers: Optional[Dict[str, str]] = None) -> tuple[Optional[int], Optional[bytes], Dict[str, str]]:
+        """
+        Fetch a page, optionally with conditional request headers.
+        
+        Timeouts, connection errors and RETRY_STATUSES are retried up to
+        max_retries times with jittered exponential backoff. Every attempt
+        reports its latency/outcome to the adaptive limiter.
+        
+        Returns:
+            (status, body, validators). body is the raw response bytes (parsing
+            happens in the worker pool); status is None on a failure worth
+            retrying later, the HTTP status of a permanent (non-retryable)
+            error, and body is None for 304 Not Modified and errors.
+            validators holds the response ETag/Last-Modified.
+        """
+        timeout = aiohttp.ClientTimeout(total=self.request_timeout)
+        last_error = None
+        
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self.stats['retries'] += 1
+                await asyncio.sleep(retry_delay(attempt))
+            
+            async with self.limiter:
+                started = time.monotonic()
+                try:
+                    logger.debug(f"Fetching: {url} (attempt {attempt + 1})")
+                    async with session.get(url, headers=headers, timeout=timeout) as response:
+                        validators = {
+                            'etag': response.headers.get('ETag'),
+                            'last_modified': response.headers.get('Last-Modified')
+                        }
+                        if response.status == 304:
+                            self.limiter.record(time.monotonic() - started, ok=True)
+                            return 304, None, validators
+                        if response.status in RETRY_STATUSES:
+                            self.limiter.record(time.monotonic() - started, ok=False)
+                            last_error = f"HTTP {response.status}"
+                            continue
+                        response.raise_for_status()
+                        body = await response.read()
+                        self.limiter.record(time.monotonic() - started, ok=True)
+                        return response.status, body, validators
+                except asyncio.TimeoutError:
+                    self.limiter.record(time.monotonic() - started, ok=False)
+                    last_error = "timeout"
+                except aiohttp.ClientResponseError as e:
+                    # Non-retryable HTTP error (e.g. 404)
+                    logger.error(f"Error fetching {url}: {e}")
+                    return e.status, None, {}
+                except aiohttp.ClientError as e:
+                    self.limiter.record(time.monotonic() - started, ok=False)
+                    last_error = str(e) or type(e).__name__
+                except Exception as e:
+                    logger.error(f"Unexpected error fetching {url}: {e}")
+                    return None, None, {}
+        
+        logger.error(f"Giving up on {url} after {self.max_retries + 1} attempts: {last_error}")
+        return None, None, {}
+    
+    async def parse(self, func, *args):
+        """Run a parse function in the worker pool, keeping CPU work off the event loop"""
+        if self.parse_pool is None:
+            self.parse_pool = ProcessPoolExecutor(max_workers=PARSE_WORKERS)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.parse_pool, func, *args)
+    
+    def close_parse_pool(self):
+        if self.parse_pool is not None:
+            self.parse_pool.shutdown()
+            self.parse_pool = None
     
     async def get_course_list(self, session: aiohttp.ClientSession) -> List[Dict[str, str]]:
         """
@@ -108,78 +775,13 @@ class CourseScraper:
             List of dictionaries containing course_id, course_name, and course_url
         """
         logger.info("Fetching course list...")
-        soup = await self.fetch_page(session, BASE_URL)
+        _, html, _ = await self.fetch(session, self.base_url)
         
-        if not soup:
+        if not html:
             logger.error("Failed to fetch course listing page")
             return []
         
-        courses = []
-        
-        # Try multiple common patterns for course listings
-        # Pattern 1: Links in a table
-        tables = soup.find_all('table')
-        for table in tables:
-            links = table.find_all('a', href=True)
-            for link in links:
-                href = link.get('href')
-                if href and 'course' in href.lower():
-                    course_name = link.get_text(strip=True)
-                    # Extract course ID from href or text
-                    course_id = self.extract_course_id(href, course_name)
-                    if course_id:
-                        # Use urljoin equivalent for aiohttp
-                        if href.startswith('http'):
-                            course_url = href
-                        else:
-                            course_url = BASE_URL.rstrip('/') + '/' + href.lstrip('/')
-                        courses.append({
-                            'course_id': course_id,
-                            'course_name': course_name,
-                            'course_url': course_url
-                        })
-        
-        # Pattern 2: Links in a list
-        if not courses:
-            lists = soup.find_all(['ul', 'ol'])
-            for lst in lists:
-                links = lst.find_all('a', href=True)
-                for link in links:
-                    href = link.get('href')
-                    course_name = link.get_text(strip=True)
-                    course_id = self.extract_course_id(href, course_name)
-                    if course_id:
-                        if href.startswith('http'):
-                            course_url = href
-                        else:
-                            course_url = BASE_URL.rstrip('/') + '/' + href.lstrip('/')
-                        courses.append({
-                            'course_id': course_id,
-                            'course_name': course_name,
-                            'course_url': course_url
-                        })
-        
-        # Pattern 3: All links on the page (fallback)
-        if not courses:
-            links = soup.find_all('a', href=True)
-            for link in links:
-                href = link.get('href')
-                # Skip navigation/external links
-                if any(skip in href.lower() for skip in ['javascript', 'mailto', '#', 'http://', 'https://']) and 'ldapweb' not in href.lower():
-                    continue
-                course_name = link.get_text(strip=True)
-                if course_name:
-                    course_id = self.extract_course_id(href, course_name)
-                    if course_id:
-                        if href.startswith('http'):
-                            course_url = href
-                        else:
-                            course_url = BASE_URL.rstrip('/') + '/' + href.lstrip('/')
-                        courses.append({
-                            'course_id': course_id,
-                            'course_name': course_name,
-                            'course_url': course_url
-                        })
+        courses = await self.parse(parse_course_list, html, self.base_url)
         
         logger.info(f"Found {len(courses)} courses")
         
@@ -193,30 +795,7 @@ class CourseScraper:
     
     def extract_course_id(self, href: str, text: str) -> Optional[str]:
         """Extract course ID from href or text"""
-        import re
-        
-        # Priority 1: Try to extract from text (e.g., "2501-MCL111" or "2501-MCL111 (some text)")
-        # Format: 4 digits, dash, 2-4 letters, 3-4 digits
-        match = re.search(r'(\d{4}-[A-Z]{2,4}\d{3,4})', text)
-        if match:
-            return match.group(1)
-        
-        # Priority 2: Try old format without semester prefix (e.g., "CS101")
-        match = re.search(r'^([A-Z]{2,4}\d{3,4})', text)
-        if match:
-            return match.group(1)
-        
-        # Priority 3: Try to extract from href (e.g., /course/2501-MCL111 or course.php?id=2501-MCL111)
-        match = re.search(r'[?&/](?:id|course)[=/]([\w-]+)', href)
-        if match:
-            return match.group(1)
-        
-        # Priority 4: Use href path component as ID (filename without extension)
-        match = re.search(r'/([^/]+?)(?:\.\w+)?$', href)
-        if match:
-            return match.group(1)
-        
-        return None
+        return extract_course_id(href, text)
     
     async def get_course_students(self, session: aiohttp.ClientSession, course_url: str) -> List[Dict[str, str]]:
         """
@@ -229,97 +808,24 @@ class CourseScraper:
             List of dictionaries containing student information
         """
         logger.debug(f"Fetching students from: {course_url}")
-        soup = await self.fetch_page(session, course_url)
+        _, html, _ = await self.fetch(session, course_url)
         
-        if not soup:
+        if not html:
             logger.error(f"Failed to fetch course page: {course_url}")
             return []
         
-        students = []
-        
-        # Try to find student information in tables
-        tables = soup.find_all('table')
-        for table in tables:
-            rows = table.find_all('tr')
-            
-            # Skip header row
-            for i, row in enumerate(rows[1:], 1):
-                cells = row.find_all(['td', 'th'])
-                if len(cells) >= 1:
-                    # Extract available information from cells
-                    student_data = {}
-                    
-                    # Common patterns for student data
-                    for j, cell in enumerate(cells):
-                        text = cell.get_text(strip=True)
-                        if not text:
-                            continue
-                        
-                        # Try to identify what each column contains
-                        if j == 0:
-                            student_data['student_name'] = text
-                        elif j == 1:
-                            student_data['entry_number'] = text
-                        elif j == 2:
-                            student_data['student_id'] = text
-                        elif '@' in text:
-                            student_data['email'] = text
-                        elif len(text) <= 10 and any(dept in text.upper() for dept in ['CS', 'EE', 'ME', 'CE', 'CH']):
-                            student_data['department'] = text
-                    
-                    if student_data:
-                        students.append(student_data)
-        
-        # Try alternative patterns (e.g., lists)
-        if not students:
-            lists = soup.find_all(['ul', 'ol'])
-            for lst in lists:
-                items = lst.find_all('li')
-                for item in items:
-                    text = item.get_text(strip=True)
-                    students.append({
-                        'student_name': text,
-                        'student_id': None,
-                        'entry_number': None
-                    })
-        
+        students = await self.parse(parse_students, html)
         logger.debug(f"Found {len(students)} students in {course_url}")
         return students
     
+
     def save_course(self, course: Dict[str, str], students: List[Dict[str, str]]):
-        """Save course and student data to database"""
+        """Save course and student data to database (synchronous, one-off writes)"""
         conn = sqlite3.connect(self.db_name)
         cursor = conn.cursor()
         
         try:
-            # Insert or update course
-            cursor.execute('''
-                INSERT OR REPLACE INTO courses (course_id, course_name, course_url, scraped_at)
-                VALUES (?, ?, ?, ?)
-            ''', (
-                course['course_id'],
-                course['course_name'],
-                course['course_url'],
-                datetime.now()
-            ))
-            
-            # Delete existing students for this course
-            cursor.execute('DELETE FROM students WHERE course_id = ?', (course['course_id'],))
-            
-            # Insert students
-            for student in students:
-                cursor.execute('''
-                    INSERT INTO students (course_id, student_name, student_id, entry_number, email, department)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                ''', (
-                    course['course_id'],
-                    student.get('student_name'),
-                    student.get('student_id'),
-                    student.get('entry_number'),
-                    student.get('email'),
-                    student.get('department')
-                ))
-            
+            write_courses(cursor, [(course, students)])
             conn.commit()
             logger.debug(f"Saved course {course['course_id']} with {len(students)} students")
         except sqlite3.Error as e:
@@ -329,17 +835,129 @@ class CourseScraper:
             conn.close()
     
     async def process_course(self, session: aiohttp.ClientSession, course: Dict[str, str], index: int, total: int) -> int:
-        """Process a single course: fetch students and save to database"""
+        """
+        Process a single course: conditionally fetch, parse, and save if changed.
+        
+        Returns:
+            Number of students written (0 when the page was unchanged)
+        """
         logger.info(f"Processing course {index}/{total}: {course['course_id']}")
+        course_id = course['course_id']
+        cached = self.page_cache.get(course_id, {})
+        
+        headers = {}
+        if cached.get('etag'):
+            headers['If-None-Match'] = cached['etag']
+        if cached.get('last_modified'):
+            headers['If-Modified-Since'] = cached['last_modified']
+        
+        status, html, validators = await self.fetch(session, course['course_url'], headers)
+        
+        if status is None:
+            # Not checkpointed, so a resumed run retries it
+            self.stats['failed'] += 1
+            self.failed_courses.append(course_id)
+            logger.error(f"Failed to fetch course page: {course['course_url']}")
+            return 0
+        
+        if html is None and status != 304:
+            # Permanent error (e.g. 404): checkpointed so a resumed run skips it
+            self.stats['failed'] += 1
+            self.failed_courses.append(course_id)
+            await self.writer.submit(course, None)
+            return 0
         
-        # Get students for this course
-        students = await self.get_course_students(session, course['course_url'])
+        if status == 304:
+            self.stats['not_modified'] += 1
+            await self.writer.submit(course, None, {**cached, **{k: v for k, v in validators.items() if v}})
+            return 0
         
-        # Save to database (synchronous operation)
-        self.save_course(course, students)
+        self.stats['fetched'] += 1
+        students, content_hash = await self.parse(parse_course_page, html)
+        cache_entry = {**validators, 'content_hash': content_hash}
+        
+        if content_hash == cached.get('content_hash'):
+            self.stats['unchanged'] += 1
+            await self.writer.submit(course, None, cache_entry)
+            return 0
+        
+        self.stats['changed'] += 1
+        # Hand over to the writer thread; only waits if the write queue is full
+        await self.writer.submit(course, students, cache_entry)
         
         return len(students)
     
+    @staticmethod
+    def _empty_stats() -> Dict[str, int]:
+        return {
+            'fetched': 0,        # 200 responses that were parsed
+            'not_modified': 0,   # 304 responses (no parse, no student write)
+            'unchanged': 0,      # fetched but same student list hash (no student write)
+            'changed': 0,        # new or changed student lists written
+            'resumed': 0,        # already done by the interrupted run being resumed
+            'failed': 0,
+            'retries': 0,
+        }
+    
+    def load_page_cache(self) -> Dict[str, Dict[str, str]]:
+        """Load stored validators and content hashes for every course"""
+        conn = sqlite3.connect(self.db_name)
+        rows = conn.execute(
+            'SELECT course_id, etag, last_modified, content_hash FROM page_cache'
+        ).fetchall()
+        conn.close()
+        return {
+            course_id: {'etag': etag, 'last_modified': last_modified, 'content_hash': content_hash}
+            for course_id, etag, last_modified, content_hash in rows
+        }
+    
+    def start_run(self) -> tuple[int, set]:
+        """
+        Resume the latest unfinished run, or start a new one.
+        
+        Returns:
+            (run_id, set of course_ids already completed in that run)
+        """
+        conn = sqlite3.connect(self.db_name)
+        cursor = conn.cursor()
+        cursor.execute('SELECT run_id FROM scrape_runs WHERE finished_at IS NULL ORDER BY run_id DESC LIMIT 1')
+        row = cursor.fetchone()
+        if row:
+            run_id = row[0]
+            cursor.execute('SELECT course_id FROM scrape_checkpoint WHERE run_id = ?', (run_id,))
+            done = {course_id for (course_id,) in cursor.fetchall()}
+            logger.info(f"Resuming run {run_id}: {len(done)} courses already done")
+        else:
+            cursor.execute('INSERT INTO scrape_runs (started_at) VALUES (?)', (datetime.now(),))
+            run_id = cursor.lastrowid
+            done = set()
+        conn.commit()
+        conn.close()
+        return run_id, done
+    
+    def finish_run(self, run_id: int):
+        """Mark a run complete and drop its checkpoint rows"""
+        conn = sqlite3.connect(self.db_name)
+        conn.execute('UPDATE scrape_runs SET finished_at = ? WHERE run_id = ?', (datetime.now(), run_id))
+        conn.execute('DELETE FROM scrape_checkpoint WHERE run_id = ?', (run_id,))
+        conn.commit()
+        conn.close()
+    
+    async def worker(self, session: aiohttp.ClientSession, course_queue: asyncio.Queue, total: int) -> int:
+        """Pull courses off the queue until the None sentinel; returns students written"""
+        written = 0
+        while True:
+            course = await course_queue.get()
+            if course is None:
+                return written
+            self.processed += 1
+            try:
+                written += await self.process_course(session, course, self.processed, total)
+            except Exception as e:
+                self.stats['failed'] += 1
+                self.failed_courses.append(course['course_id'])
+                logger.error(f"Error processing {course['course_id']}: {e}", exc_info=True)
+    
     async def scrape_all(self):
         """Main method to scrape all courses and students"""
         logger.info("Starting course scraping...")
@@ -350,32 +968,80 @@ class CourseScraper:
         ssl_context.check_hostname = False
         ssl_context.verify_mode = ssl.CERT_NONE
         
-        # Create aiohttp session with SSL context
-        connector = aiohttp.TCPConnector(ssl=ssl_context)
-        async with aiohttp.ClientSession(connector=connector) as session:
-            # Get list of all courses
-            courses = await self.get_course_list(session)
-            
-            if not courses:
-                logger.warning("No courses found. Please check the website structure.")
-                return
-            
-            # Process all courses in parallel (limited by semaphore)
-            tasks = [
-                self.process_course(session, course, i+1, len(courses))
-                for i, course in enumerate(courses)
-            ]
-            
-            # Gather all results
-            student_counts = await asyncio.gather(*tasks, return_exceptions=True)
-            
-            # Count total students (filter out exceptions)
-            total_students = sum(count for count in student_counts if isinstance(count, int))
+        self.stats = self._empty_stats()
+        self.failed_courses = []
+        self.processed = 0
+        self.limiter = AdaptiveLimiter()
+        self.page_cache = self.load_page_cache()
+        run_id, done = self.start_run()
+        
+        self.writer = DatabaseWriter(self.db_name, run_id=run_id)
+        self.writer.start()
+        finished = False
+        
+        try:
+            # One pooled connector for the whole run, capped per host
+            connector = aiohttp.TCPConnector(
+                ssl=ssl_context,
+                limit=LIMIT_PER_HOST,
+                limit_per_host=LIMIT_PER_HOST
+            )
+            async with aiohttp.ClientSession(connector=connector) as session:
+                # Get list of all courses
+                courses = await self.get_course_list(session)
+                
+                if not courses:
+                    logger.warning("No courses found. Please check the website structure.")
+                    return
+                
+                # Skip courses an interrupted run already finished
+                pending = [course for course in courses if course['course_id'] not in done]
+                self.stats['resumed'] = len(courses) - len(pending)
+                
+                # Fixed pool of workers fed through a bounded queue; the adaptive
+                # limiter decides how many of them may have a request in flight
+                course_queue = asyncio.Queue(maxsize=COURSE_QUEUE_SIZE)
+                workers = [
+                    asyncio.create_task(self.worker(session, course_queue, len(pending)))
+                    for _ in range(self.limiter.maximum)
+                ]
+                try:
+                    for course in pending:
+                        await course_queue.put(course)
+                    for _ in workers:
+                        await course_queue.put(None)
+                    total_students = sum(await asyncio.gather(*workers))
+                finally:
+                    for task in workers:
+                        task.cancel()
+                finished = True
+        finally:
+            # Flush pending writes (and checkpoints) even if scraping was interrupted
+            await asyncio.to_thread(self.writer.close)
+            self.close_parse_pool()
+        
+        # Every course was attempted: close the run, so the next one scrapes the
+        # whole catalog again (retrying this run's failures along the way). Only
+        # an interrupted run stays open to be resumed.
+        if finished:
+            self.finish_run(run_id)
         
         elapsed_time = time.time() - start_time
         logger.info(f"Scraping completed in {elapsed_time:.2f} seconds")
         logger.info(f"Total courses: {len(courses)}")
-        logger.info(f"Total students: {total_students}")
+        logger.info(f"Total students written: {total_students}")
+        logger.info(
+            "Pages: {fetched} fetched, {not_modified} not modified, {unchanged} unchanged, "
+            "{changed} changed, {resumed} resumed, {failed} failed, {retries} retries".format(**self.stats)
+        )
+        logger.info(f"Concurrency limit ended at {self.limiter.limit:.1f} "
+                    f"({self.limiter.decreases} decreases)")
+        if self.failed_courses:
+            logger.warning(f"Failed courses (retried by the next run): {', '.join(self.failed_courses)}")
+        if self.writer.failed_courses:
+            logger.warning(f"Courses not written (retried by the next run): "
+                           f"{', '.join(self.writer.failed_courses)}")
+        logger.info(f"DB writes: {self.writer.rows_written} rows in {self.writer.transactions} transactions")
         logger.info(f"Database: {self.db_name}")
     
     def print_stats(self):
@@ -389,14 +1055,30 @@ class CourseScraper:
         cursor.execute('SELECT COUNT(*) FROM students')
         student_count = cursor.fetchone()[0]
         
-        cursor.execute('''
-            SELECT course_id, course_name, COUNT(*) as student_count
-            FROM students
-            JOIN courses USING(course_id)
-            GROUP BY course_id
-            ORDER BY student_count DESC
-            LIMIT 5
-        ''')
+        cursor.execute('SELECT COUNT(*) FROM enrollments')
+        enrollment_count = cursor.fetchone()[0]
+        
+        # Use the precomputed aggregates from enrollment_analytics when present
+        cursor.execute("""
+            SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'course_popularity'
+        """)
+        if cursor.fetchone() and cursor.execute('SELECT 1 FROM course_popularity LIMIT 1').fetchone():
+            cursor.execute('''
+                SELECT course_id, course_name, students
+                FROM course_popularity
+                JOIN courses USING(course_id)
+                ORDER BY students DESC
+                LIMIT 5
+            ''')
+        else:
+            cursor.execute('''
+                SELECT course_id, course_name, COUNT(*) as student_count
+                FROM enrollments
+                JOIN courses USING(course_id)
+                GROUP BY course_id
+                ORDER BY student_count DESC
+                LIMIT 5
+            ''')
         top_courses = cursor.fetchall()
         
         conn.close()
@@ -406,6 +1088,7 @@ class CourseScraper:
         print("="*60)
         print(f"Total courses: {course_count}")
         print(f"Total students: {student_count}")
+        print(f"Total enrollments: {enrollment_count}")
         print("\nTop 5 courses by enrollment:")
         for course_id, course_name, count in top_courses:
             print(f"  {course_id}: {course_name} ({count} students)")
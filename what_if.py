@@ -0,0 +1,359 @@
+"""
+Cross-department what-if planning for a single student.
+
+Maps one student's completed courses onto several programme structures and
+plans the remaining semesters of each one concurrently in a process pool.
+Pool workers are started from a forkserver (the API process is multithreaded,
+so it never forks itself) and load the catalog once when they start, so the
+departments they plan share that load instead of each reading courses.json
+and the offering CSVs again.
+
+Usage:
+    python what_if.py --semester 4 --completed ELL101,PYL101,MTL100 [--departments EE1,EE3] [--preview]
+"""
+
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterable
+
+from catalog import get_catalog, latest_catalog
+from course_neighbours import load_neighbour_table
+from plan_cache import canonical_state, get_plan_cache, plan_key, relevant_codes
+from planner import build_selected_courses, degree_length, plan_degree
+from scheduler import Overloaded, current_priority, get_scheduler
+from solver import capture_solves, record_solve
+from user import UserData
+
+# Per-department solver limit; a what-if comparison should stay interactive
+TIME_LIMIT = 10.0
+
+_pool: ProcessPoolExecutor | None = None
+_pool_version: str | None = None  # catalog version the pool was started for
+_pool_lock = threading.Lock()
+# Requests currently submitting to / waiting on each pool (see planning_pool)
+_pool_users: dict[ProcessPoolExecutor, int] = {}
+# (catalog version, department code) -> plan_cache.relevant_codes, for the
+# latest catalog and those still pinned by requests that added to it
+_relevant: dict[tuple[str, str], frozenset] = {}
+_relevant_lock = threading.Lock()
+
+def student_for_department(completed: Iterable[str], department: dict, selected_courses: dict,
+                           current_semester: int, preferences: dict | None = None,
+                           min_credits: float = 15, max_credits: float = 24) -> UserData:
+    """
+    Map a flat list of completed courses onto one department's categories.
+
+    HUL* courses count as HUL, codes in the department's DE list as DE and
+    everything else as core; courses outside the programme then simply earn
+    no credit in calculate_credits_done.
+    """
+    de_courses = set(department.get("courses", {}).get("DE", []))
+    completed = list(dict.fromkeys(completed))
+    return UserData(
+        dept=department["code"],
+        current_semester=current_semester,
+        core_courses=selected_courses,
+        completed_corecourses=[c for c in completed if not c.startswith("HUL") and c not in de_courses],
+        completed_hul=[c for c in completed if c.startswith("HUL")],
+        completed_DE=[c for c in completed if c in de_courses],
+        min_credits=min_credits,
+        max_credits=max_credits,
+        preferences=dict(preferences or {}),
+    )
+
+
+def check_current_semester(department: dict, current_semester: int):
+    """
+    Check that the department's programme runs to current_semester.
+
+    Raises:
+        ValueError: for a semester outside 1..degree_length
+    """
+    last_semester = degree_length(department, UserData(dept=department["code"]))
+    if not 1 <= current_semester <= last_semester:
+        raise ValueError(f"Semester {current_semester} is outside {department['code']}'s "
+                         f"semesters 1-{last_semester}")
+
+
+def plan_for_department(dept_code: str, completed: list[str], current_semester: int,
+                        preferences: dict | None = None, time_limit: float | None = TIME_LIMIT,
+                        num_workers: int | None = 1, preview: bool = False,
+                        catalog_version: str | None = None) -> dict | None:
+    """
+    Plan one department for the student (runs inside a pool worker).
+
+    Returns:
+        plan_degree result, plus "wall_seconds" for the whole department and
+        "solve_stats" (the solver metrics of a pool worker have to be
+        recorded by the parent, see compare_departments); None if this
+        process's catalog isn't catalog_version
+    """
+    start = time.perf_counter()
+    catalog = get_catalog()
+    if catalog_version is not None and catalog.version != catalog_version:
+        return None
+    department = catalog.get_department(dept_code)
+
+    with capture_solves() as solve_stats:
+        selected_courses = build_selected_courses(department, catalog.courses, catalog.offerings)
+        user = student_for_department(completed, department, selected_courses,
+                                      current_semester, preferences)
+        neighbours = load_neighbour_table() if preferences else None
+        result = plan_degree(user, department, selected_courses, catalog.offerings,
+                             neighbours, time_limit, num_workers, shortest=True, preview=preview,
+                             slot_index=catalog.slot_index)
+
+    result["wall_seconds"] = round(time.perf_counter() - start, 3)
+    result["solve_stats"] = solve_stats
+    return result
+
+
+def department_plan_key(dept_code: str, completed: list[str], current_semester: int,
+                        preferences: dict | None, profile: dict) -> str:
+    """plan_cache key of the student's plan for one department."""
+    catalog = get_catalog()
+    department = catalog.get_department(dept_code)
+    relevant = _relevant.get((catalog.version, dept_code))
+    if relevant is None:
+        selected_courses = build_selected_courses(department, catalog.courses, catalog.offerings)
+        relevant = relevant_codes(selected_courses)
+        keep = {catalog.version, latest_catalog().version}
+        with _relevant_lock:
+            # Forget the catalogs reloads have replaced
+            for key in [key for key in _relevant if key[0] not in keep]:
+                del _relevant[key]
+            _relevant[(catalog.version, dept_code)] = relevant
+    user = student_for_department(completed, department, {}, current_semester, preferences)
+    return plan_key(canonical_state(user, relevant), catalog.version, profile)
+
+
+def rank_results(results: list[dict]) -> list[dict]:
+    """Feasible plans first, then fewest semesters, then fewest remaining credits."""
+    return sorted(results, key=lambda r: (
+        not r["feasible"],
+        r["semesters_needed"] if r["semesters_needed"] is not None else float("inf"),
+        r["remaining_credits"],
+        r["dept"],
+    ))
+
+
+@contextlib.contextmanager
+def planning_pool(catalog, max_workers: int | None = None):
+    """
+    Borrow the shared planning pool for one request, creating it on first use.
+
+    Workers come from a forkserver and load the catalog as they start (see
+    _start_worker). After a catalog reload the next borrower retires the old
+    pool and starts a new one, whose workers load the new catalog; a
+    retired pool is shut down once its last borrower is done, so plans
+    already submitted to it still finish.
+
+    Args:
+        catalog: The request's (pinned) catalog
+        max_workers: Pool size when the pool is first created
+
+    Yields:
+        The pool, or None if catalog isn't the one the pool was started for
+        (a reload landed mid-request; plan in-process instead)
+    """
+    global _pool, _pool_version
+    latest = latest_catalog()
+    with _pool_lock:
+        if _pool is not None and _pool_version != latest.version:
+            _retire(_pool)
+            _pool = None
+        if _pool is None:
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+            if context.get_start_method() == "forkserver":
+                # The server imports the planning modules once; workers fork from it
+                context.set_forkserver_preload(["what_if"])
+            _pool = ProcessPoolExecutor(max_workers=max_workers or os.cpu_count(), mp_context=context,
+                                        initializer=_start_worker)
+            _pool_version = latest.version
+            _pool_users[_pool] = 0
+        if _pool_version != catalog.version:
+            pool = None
+        else:
+            pool = _pool
+            _pool_users[pool] += 1
+    try:
+        yield pool
+    finally:
+        if pool is not None:
+            with _pool_lock:
+                _pool_users[pool] -= 1
+                if pool is not _pool:
+                    _retire(pool)
+
+
+def _start_worker():
+    """Pool worker initializer: load the catalog before the first plan arrives."""
+    latest_catalog()
+
+
+def _retire(pool: ProcessPoolExecutor):
+    """Shut down a replaced pool once nobody uses it any more (caller holds _pool_lock)."""
+    if _pool_users.get(pool, 0) == 0:
+        _pool_users.pop(pool, None)
+        pool.shutdown(wait=False)
+
+
+def shutdown_pool():
+    """Stop the planning pool (API shutdown, end of CLI run)."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool_users.pop(_pool, None)
+            _pool.shutdown(cancel_futures=True)
+            _pool = None
+
+
+def compare_departments(completed: list[str], current_semester: int,
+                        dept_codes: list[str] | None = None, preferences: dict | None = None,
+                        time_limit: float | None = TIME_LIMIT, parallel: bool = True,
+                        max_workers: int | None = None, preview: bool = False,
+                        use_cache: bool = True) -> list[dict]:
+    """
+    Plan the student against several departments and rank the outcomes.
+
+    Args:
+        completed: Course codes the student has completed
+        current_semester: Semester the student is about to start
+        dept_codes: Departments to compare (when None, all whose programme
+            runs to current_semester)
+        preferences: Optional elective preferences {code: weight}
+        time_limit: Per-department solver limit in seconds
+        parallel: Plan departments concurrently in the process pool
+        max_workers: Pool size when the pool is first created
+        preview: Greedy plans only, without the solver (milliseconds per
+            department, so planned in this process)
+        use_cache: Serve and store plans through the persistent plan cache
+            (cached results carry "cached": True)
+
+    Returns:
+        rank_results of the per-department plan_degree results
+
+    Raises:
+        FileNotFoundError: for an unknown department code
+        ValueError: current_semester is past the end of a requested department
+        scheduler.Overloaded: the installed solver scheduler turned the work away
+
+    With a solver scheduler installed, each department sent to the pool
+    first waits for a slot in the current priority class and is planned
+    with the time limit it grants (in-process solves go through
+    solve_plan's own slot).
+    """
+    catalog = get_catalog()
+    if dept_codes:
+        dept_codes = sorted(dept_codes)
+        for dept_code in dept_codes:
+            check_current_semester(catalog.get_department(dept_code), current_semester)
+    else:
+        dept_codes = []
+        for dept_code in sorted(catalog.departments):
+            try:
+                check_current_semester(catalog.get_department(dept_code), current_semester)
+            except ValueError:
+                continue
+            dept_codes.append(dept_code)
+
+    cache = get_plan_cache() if use_cache else None
+    profile = {"shortest": True, "preview": preview, "time_limit": time_limit}
+    keys, results, pending = {}, [], []
+    for dept_code in dept_codes:
+        cached = None
+        if cache is not None:
+            keys[dept_code] = department_plan_key(dept_code, completed, current_semester,
+                                                  preferences, profile)
+            cached = cache.get(keys[dept_code])
+        if cached is None:
+            pending.append(dept_code)
+        else:
+            results.append({**cached, "cached": True})
+
+    args = (list(completed), current_semester, preferences, time_limit)
+    use_pool = parallel and len(pending) > 1 and not preview
+    with planning_pool(catalog, max_workers) if use_pool else contextlib.nullcontext() as pool:
+        if pool is not None:
+            scheduler = get_scheduler()
+            futures = []
+            try:
+                for dept_code in pending:
+                    if scheduler is None:
+                        futures.append(pool.submit(plan_for_department, dept_code, *args,
+                                                   catalog_version=catalog.version))
+                        continue
+                    ticket = scheduler.acquire(current_priority(), time_limit)
+                    future = pool.submit(plan_for_department, dept_code, *args[:-1], ticket.time_limit,
+                                         catalog_version=catalog.version)
+                    future.add_done_callback(lambda _, ticket=ticket: scheduler.release(ticket))
+                    futures.append(future)
+            except Overloaded:
+                # The request fails as a whole: drop the departments already
+                # submitted that haven't started (cancelling releases their slots)
+                for future in futures:
+                    future.cancel()
+                raise
+            # A worker loads the catalog from the files when it starts; if
+            # they changed again before that, plan the department in-process
+            planned = [future.result() or plan_for_department(dept_code, *args, num_workers=None)
+                       for dept_code, future in zip(pending, futures)]
+        else:
+            # All cores without a scheduler (CLI); one per slot with one (see solve_plan)
+            planned = [plan_for_department(dept_code, *args, num_workers=None, preview=preview)
+                       for dept_code in pending]
+
+    for result in planned:
+        for stats in result.pop("solve_stats"):
+            record_solve(stats)
+        if cache is not None:
+            cache.put(keys[result["dept"]], result)
+        results.append({**result, "cached": False})
+    return rank_results(results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare a student's remaining plan across departments")
+    parser.add_argument("--completed", required=True, help="Comma-separated completed course codes")
+    parser.add_argument("--semester", type=int, required=True, help="Semester the student is about to start")
+    parser.add_argument("--departments", help="Comma-separated department codes (default: all)")
+    parser.add_argument("--workers", type=int, help="Pool size (default: CPU count)")
+    parser.add_argument("--serial", action="store_true", help="Plan departments one after another")
+    parser.add_argument("--preview", action="store_true", help="Greedy plans only, without the solver")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the persistent plan cache")
+    parser.add_argument("--json", action="store_true", help="Print the full results as JSON")
+    args = parser.parse_args()
+
+    completed = [code.strip() for code in args.completed.split(",") if code.strip()]
+    dept_codes = args.departments.split(",") if args.departments else None
+
+    start = time.perf_counter()
+    try:
+        results = compare_departments(completed, args.semester, dept_codes,
+                                      parallel=not args.serial, max_workers=args.workers,
+                                      preview=args.preview, use_cache=not args.no_cache)
+    finally:
+        shutdown_pool()
+    elapsed = time.perf_counter() - start
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'dept':6} {'status':15} {'done':>6} {'left':>6} {'sems':>5}  name")
+    for r in results:
+        sems = r["semesters_needed"] if r["semesters_needed"] is not None else "-"
+        print(f"{r['dept']:6} {r['status']:15} {r['credits_done']:6.1f} {r['remaining_credits']:6.1f} "
+              f"{sems:>5}  {r['name']}")
+    print(f"\n{len(results)} departments in {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main()